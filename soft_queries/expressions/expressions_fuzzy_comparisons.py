@@ -1,8 +1,10 @@
-from typing import Any, Tuple, Union
+from typing import Any, Callable, Tuple, Union
 
-from FuzzyMath import FuzzyNumber, FuzzyNumberFactory
+import numpy as np
+from FuzzyMath import FuzzyNumber, FuzzyNumberFactory, PossibilisticMembership
 from qgis.core import QgsExpression, QgsFeature, qgsfunction
 
+from ..processing.fuzzy_arrays import CompiledFuzzyNumber, compile_fuzzy_number
 from ..text_constants import TextConstants
 from .qgsexpressions_utils import error_message, load_help
 
@@ -27,6 +29,9 @@ def possibilistic_exceedance(
 ):
     _validateInputs(fn_1, fn_2)
 
+    if _isFuzzyNumberAndValue(fn_1, fn_2):
+        return _compiledPossibilisticMembership(fn_1, fn_2, CompiledFuzzyNumber.exceedance)
+
     fn_1, fn_2 = _returnAsFuzzyNumbers(fn_1, fn_2)
 
     return fn_1.exceedance(fn_2)
@@ -46,6 +51,9 @@ def possibilistic_undervaluation(
 ):
     _validateInputs(fn_1, fn_2)
 
+    if _isFuzzyNumberAndValue(fn_1, fn_2):
+        return _compiledPossibilisticMembership(fn_1, fn_2, CompiledFuzzyNumber.undervaluation)
+
     fn_1, fn_2 = _returnAsFuzzyNumbers(fn_1, fn_2)
 
     return fn_1.undervaluation(fn_2)
@@ -89,6 +97,20 @@ def possibilistic_strict_undervaluation(
     return fn_1.strict_undervaluation(fn_2)
 
 
+def _isFuzzyNumberAndValue(fn_1: FUZZY_NUMERICS, fn_2: FUZZY_NUMERICS) -> bool:
+    return isinstance(fn_1, FuzzyNumber) and isinstance(fn_2, (int, float))
+
+
+def _compiledPossibilisticMembership(
+    fn: FuzzyNumber,
+    value: Union[int, float],
+    function: Callable[[CompiledFuzzyNumber, np.ndarray], Tuple[np.ndarray, np.ndarray]],
+) -> PossibilisticMembership:
+    possibility, necessity = function(compile_fuzzy_number(fn), value)
+
+    return PossibilisticMembership(float(possibility), float(necessity))
+
+
 def _returnAsFuzzyNumbers(fn_1: FUZZY_NUMERICS, fn_2: FUZZY_NUMERICS) -> Tuple[FuzzyNumber, FuzzyNumber]:
     if isinstance(fn_1, (int, float)):
         fn_1 = FuzzyNumberFactory.crisp_number(fn_1)
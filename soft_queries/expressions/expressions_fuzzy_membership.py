@@ -5,6 +5,7 @@ from FuzzyMath.class_fuzzy_number import FuzzyNumber
 from FuzzyMath.class_membership_operations import FUZZY_AND_NAMES, FUZZY_OR_NAMES, fuzzyAnds, fuzzyOrs
 from qgis.core import QgsExpression, QgsFeature, qgsfunction
 
+from ..processing.fuzzy_arrays import compile_fuzzy_number
 from ..text_constants import TextConstants
 from .qgsexpressions_utils import error_message, load_help
 
@@ -117,4 +118,4 @@ def calculate_fuzzy_membership(
     if not isinstance(value, (int, float)):
         raise TypeError(prepare_error_message(value, "value", "float, int"))
 
-    return fn.membership(value)
+    return FuzzyMembership(float(compile_fuzzy_number(fn).membership(value)))
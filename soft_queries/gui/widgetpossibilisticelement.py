@@ -1,13 +1,15 @@
 from processing.gui.wrappers import WidgetWrapper
 from qgis.core import QgsMapLayerProxyModel, QgsRasterLayer
 from qgis.gui import QgsMapLayerComboBox
-from qgis.PyQt.QtWidgets import QFormLayout, QGroupBox, QVBoxLayout, QWidget
+from qgis.PyQt.QtWidgets import QCheckBox, QFormLayout, QGroupBox, QVBoxLayout, QWidget
 
 
 class PossibilisticElementWidget(QWidget):
 
     groupbox: QGroupBox
 
+    checkbox_two_band: QCheckBox
+
     maplayer_possibility: QgsMapLayerComboBox
     maplayer_necessity: QgsMapLayerComboBox
 
@@ -29,9 +31,12 @@ class PossibilisticElementWidget(QWidget):
         layout = QFormLayout(self)
         self.groupbox.setLayout(layout)
 
+        self.checkbox_two_band = QCheckBox("Two-band raster (band 1 possibility, band 2 necessity)", self)
+
         self.maplayer_possibility = QgsMapLayerComboBox(self)
         self.maplayer_necessity = QgsMapLayerComboBox(self)
 
+        layout.addRow(self.checkbox_two_band)
         layout.addRow("Possibility raster", self.maplayer_possibility)
         layout.addRow("Necessity raster", self.maplayer_necessity)
 
@@ -41,6 +46,8 @@ class PossibilisticElementWidget(QWidget):
         self.maplayer_possibility.layerChanged.connect(self.update_rasters)
         self.maplayer_necessity.layerChanged.connect(self.update_rasters)
 
+        self.checkbox_two_band.toggled.connect(self.maplayer_necessity.setDisabled)
+
         self.update_rasters()
 
     def update_rasters(self):
@@ -52,13 +59,23 @@ class PossibilisticElementWidget(QWidget):
         split_value = value.split(self.text_separator)
 
         self.raster_possibility = QgsRasterLayer(split_value[0])
-        self.raster_necessity = QgsRasterLayer(split_value[1])
+
+        # value without separator is two-band raster
+        self.checkbox_two_band.setChecked(len(split_value) == 1)
+
+        if len(split_value) == 1:
+            self.raster_necessity = self.raster_possibility
+        else:
+            self.raster_necessity = QgsRasterLayer(split_value[1])
+            self.maplayer_necessity.setLayer(self.raster_necessity)
 
         self.maplayer_possibility.setLayer(self.raster_possibility)
-        self.maplayer_necessity.setLayer(self.raster_necessity)
 
     def value(self):
 
+        if self.checkbox_two_band.isChecked():
+            return self.raster_possibility.dataProvider().dataSourceUri()
+
         string = (
             f"{self.raster_possibility.dataProvider().dataSourceUri()}"
             f"{self.text_separator}"
@@ -69,6 +86,9 @@ class PossibilisticElementWidget(QWidget):
 
     def value_as_dict(self):
 
+        if self.checkbox_two_band.isChecked():
+            return {"possibilistic": self.raster_possibility.dataProvider().dataSourceUri()}
+
         return {
             "possibility": self.raster_possibility.dataProvider().dataSourceUri(),
             "necessity": self.raster_necessity.dataProvider().dataSourceUri(),
@@ -34,6 +34,7 @@ from .expressions.expressions_possibilistic_membership import (
     possibility,
 )
 from .gui.FuzzyVariablesWidget import FuzzyVariablesWidget
+from .profiling import EXPRESSION_PROFILER, profile_expression_functions
 from .provider_soft_queries import SoftQueriesProvider
 from .text_constants import TextConstants
 from .utils import get_icon_path
@@ -84,6 +85,8 @@ class SoftQueriesPlugin:
             possibilistic_strict_undervaluation,
         ]
 
+        profile_expression_functions(self.exp_functions)
+
         self.register_exp_functions()
 
     def initProcessing(self):
@@ -114,6 +117,8 @@ class SoftQueriesPlugin:
 
         self.unregister_exp_functions()
 
+        EXPRESSION_PROFILER.stop()
+
     def add_action(
         self,
         icon_path,
@@ -0,0 +1,144 @@
+import math
+from typing import List, Optional
+
+import numpy as np
+from osgeo import gdal, ogr
+from qgis.core import QgsGeometry, QgsRasterLayer, QgsRectangle
+
+from .utils import RasterWindow, raster_windows, window_extent
+
+
+class AreaOfInterest:
+    """
+    Part of the grid of `raster` to process, pixels inside `extent` and `mask` polygon (both in CRS of the raster).
+    Only tiles intersecting the mask are processed, pixels outside of the mask are no data.
+
+    Windows of tiles are in the grid of the raster. If `crop`, outputs cover only `window` of the raster and tiles are
+    written shifted by its origin.
+    """
+
+    def __init__(
+        self,
+        raster: QgsRasterLayer,
+        extent: Optional[QgsRectangle] = None,
+        mask: Optional[QgsGeometry] = None,
+        crop: bool = False,
+    ) -> None:
+
+        self.raster = raster
+        self.mask = mask
+        self.crop = crop
+
+        area_extent = QgsRectangle(raster.extent())
+
+        if extent is not None:
+            area_extent = area_extent.intersect(extent)
+
+        if mask is not None:
+            area_extent = area_extent.intersect(mask.boundingBox())
+
+        self.window = self.extent_window(area_extent)
+
+        self.mask_engine = None
+        self.mask_dataset = None
+        self.mask_layer = None
+
+        if mask is not None:
+            self.mask_engine = QgsGeometry.createGeometryEngine(mask.constGet())
+            self.mask_engine.prepareGeometry()
+
+            # OGR layer with the mask, rasterized tile by tile
+            self.mask_dataset = ogr.GetDriverByName("Memory").CreateDataSource("")
+            self.mask_layer = self.mask_dataset.CreateLayer("mask")
+
+            feature = ogr.Feature(self.mask_layer.GetLayerDefn())
+            feature.SetGeometry(ogr.CreateGeometryFromWkb(bytes(mask.asWkb())))
+
+            self.mask_layer.CreateFeature(feature)
+
+    def extent_window(self, extent: QgsRectangle) -> RasterWindow:
+        """Smallest window of raster pixels covering `extent`, empty if the extent is outside of the raster."""
+
+        raster_extent = self.raster.extent()
+
+        pixel_width = self.raster.rasterUnitsPerPixelX()
+        pixel_height = self.raster.rasterUnitsPerPixelY()
+
+        if extent.isEmpty():
+            return RasterWindow(0, 0, 0, 0)
+
+        # tolerance, so extent on pixel borders does not include neighbouring pixels due to rounding errors
+        tolerance = 1e-6
+
+        col_min = max(0, math.floor((extent.xMinimum() - raster_extent.xMinimum()) / pixel_width + tolerance))
+        col_max = math.ceil((extent.xMaximum() - raster_extent.xMinimum()) / pixel_width - tolerance)
+        row_min = max(0, math.floor((raster_extent.yMaximum() - extent.yMaximum()) / pixel_height + tolerance))
+        row_max = math.ceil((raster_extent.yMaximum() - extent.yMinimum()) / pixel_height - tolerance)
+
+        col_max = min(self.raster.width(), col_max)
+        row_max = min(self.raster.height(), row_max)
+
+        return RasterWindow(col_min, row_min, max(0, col_max - col_min), max(0, row_max - row_min))
+
+    def is_empty(self) -> bool:
+        return self.window.size == 0
+
+    @property
+    def output_window(self) -> Optional[RasterWindow]:
+        """Window of the raster covered by outputs, None if outputs cover the whole raster."""
+
+        if self.crop:
+            return self.window
+
+        return None
+
+    def output_window_of(self, window: RasterWindow) -> RasterWindow:
+
+        if self.crop:
+            return RasterWindow(window.col - self.window.col, window.row - self.window.row, window.width, window.height)
+
+        return window
+
+    def intersects(self, window: RasterWindow) -> bool:
+
+        if self.mask_engine is None:
+            return True
+
+        return self.mask_engine.intersects(QgsGeometry.fromRect(window_extent(self.raster, window)).constGet())
+
+    def windows(self, tile_width: int, tile_height: int) -> List[RasterWindow]:
+        """Windows of tiles of the area that intersect the mask."""
+
+        windows = [
+            RasterWindow(window.col + self.window.col, window.row + self.window.row, window.width, window.height)
+            for window in raster_windows(self.window.width, self.window.height, tile_width, tile_height)
+        ]
+
+        return [window for window in windows if self.intersects(window)]
+
+    def outside_mask(self, window: RasterWindow) -> Optional[np.ndarray]:
+        """Pixels of the window whose centres are outside of the mask, None if the whole window is inside."""
+
+        if self.mask_engine is None:
+            return None
+
+        extent = window_extent(self.raster, window)
+
+        if self.mask_engine.contains(QgsGeometry.fromRect(extent).constGet()):
+            return None
+
+        dataset = gdal.GetDriverByName("MEM").Create("", window.width, window.height, 1, gdal.GDT_Byte)
+        dataset.SetGeoTransform(
+            [
+                extent.xMinimum(),
+                self.raster.rasterUnitsPerPixelX(),
+                0,
+                extent.yMaximum(),
+                0,
+                -self.raster.rasterUnitsPerPixelY(),
+            ]
+        )
+
+        gdal.RasterizeLayer(dataset, [1], self.mask_layer, burn_values=[1])
+
+        return dataset.GetRasterBand(1).ReadAsArray() == 0
@@ -0,0 +1,325 @@
+from decimal import Decimal
+from functools import lru_cache, reduce
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from FuzzyMath import FuzzyNumber, FuzzyNumberFactory, PossibilisticMembership
+from FuzzyMath import exceedance as fuzzy_exceedance
+from FuzzyMath import necessity_exceedance, necessity_undervaluation, possibility_exceedance, possibility_undervaluation
+from FuzzyMath import undervaluation as fuzzy_undervaluation
+
+
+def fuzzy_number_breakpoints(fuzzy_number: FuzzyNumber) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    alpha_levels = fuzzy_number.alpha_levels
+
+    alphas = np.array([float(alpha) for alpha in alpha_levels], dtype=np.float64)
+    mins = np.array([float(fuzzy_number.get_alpha_cut(alpha).min) for alpha in alpha_levels], dtype=np.float64)
+    maxs = np.array([float(fuzzy_number.get_alpha_cut(alpha).max) for alpha in alpha_levels], dtype=np.float64)
+
+    return alphas, mins, maxs
+
+
+class CompiledFuzzyNumber:
+    """
+    Fuzzy number with alpha cuts converted to float64 breakpoints of its left and right branch. Evaluates scalars or
+    arrays by interpolation instead of walking `Decimal` alpha cuts of `FuzzyNumber` for every value.
+    """
+
+    __slots__ = ("fuzzy_number", "alphas", "mins", "maxs", "min", "max", "kernel_min", "kernel_max")
+
+    def __init__(self, fuzzy_number: FuzzyNumber) -> None:
+
+        self.fuzzy_number = fuzzy_number
+
+        self.alphas, self.mins, self.maxs = fuzzy_number_breakpoints(fuzzy_number)
+
+        self.min = float(fuzzy_number.min)
+        self.max = float(fuzzy_number.max)
+        self.kernel_min = float(fuzzy_number.kernel_min)
+        self.kernel_max = float(fuzzy_number.kernel_max)
+
+    @property
+    def analytic_possibilistic(self) -> bool:
+        """Possibilistic values of fuzzy numbers with more alpha levels are evaluated by FuzzyMath for every value."""
+
+        return self.alphas.size == 2
+
+    def constant_between(self, value_min: float, value_max: float) -> bool:
+        """
+        Membership and possibilistic values are constant for all values from `value_min` to `value_max`, which holds
+        outside of support and inside kernel. Bounds are excluded, vertical edges make them differ.
+        """
+
+        if value_max < self.min or self.max < value_min:
+            return True
+
+        return self.kernel_min < value_min and value_max < self.kernel_max
+
+    def branches(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+
+        # both branches pick the highest alpha level whose alpha cut still contains the value, right branch is
+        # interpolated on negated values so that its breakpoints are increasing
+        left = np.interp(values, self.mins, self.alphas, left=0.0, right=1.0)
+        right = np.interp(-values, -self.maxs, self.alphas, left=0.0, right=1.0)
+
+        return left, right
+
+    def membership(self, values: np.ndarray) -> np.ndarray:
+
+        values = np.asarray(values, dtype=np.float64)
+
+        left, right = self.branches(values)
+
+        result = np.where(values < self.kernel_min, left, right)
+
+        result[(self.kernel_min <= values) & (values <= self.kernel_max)] = 1.0
+
+        return result
+
+    def exceedance(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Possibility and necessity that fuzzy number exceeds crisp `values`."""
+
+        values = np.asarray(values, dtype=np.float64)
+
+        if not self.analytic_possibilistic:
+            return _general_possibilistic_array(values, self.fuzzy_number, fuzzy_exceedance)
+
+        left, right = self.branches(values)
+
+        possibility = np.where(self.max <= values, 0.0, right)
+        necessity = np.where(self.kernel_min <= values, 0.0, 1.0 - left)
+
+        return possibility, necessity
+
+    def undervaluation(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Possibility and necessity that fuzzy number undervaluates crisp `values`."""
+
+        values = np.asarray(values, dtype=np.float64)
+
+        if not self.analytic_possibilistic:
+            return _general_possibilistic_array(values, self.fuzzy_number, fuzzy_undervaluation)
+
+        left, right = self.branches(values)
+
+        necessity_strict_exceedance = np.where(values <= self.min, 1.0, 1.0 - left)
+        possibility_strict_exceedance = np.where(self.max < values, 0.0, right)
+
+        return 1.0 - necessity_strict_exceedance, 1.0 - possibility_strict_exceedance
+
+    def crisp_exceedance(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Possibility and necessity that crisp `values` exceed fuzzy number, as FuzzyMath evaluates it with crisp number
+        as the first argument. Not a swap of `undervaluation`, the indices are not symmetric. Necessity is capped by
+        possibility for fuzzy numbers with more alpha levels, where FuzzyMath interpolation can exceed it.
+        """
+
+        values = np.asarray(values, dtype=np.float64)
+
+        if not self.analytic_possibilistic:
+            return _general_possibilistic_array(values, self.fuzzy_number, _crisp_exceedance)
+
+        left, _ = self.branches(values)
+
+        possibility = np.where(values <= self.min, 0.0, left)
+
+        return possibility, possibility.copy()
+
+    def crisp_undervaluation(self, values: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Possibility and necessity that crisp `values` undervaluate fuzzy number, as FuzzyMath evaluates it with crisp
+        number as the first argument. On the right branch FuzzyMath yields necessity above possibility, which it
+        rejects, necessity is capped by possibility there.
+        """
+
+        values = np.asarray(values, dtype=np.float64)
+
+        if not self.analytic_possibilistic:
+            return _general_possibilistic_array(values, self.fuzzy_number, _crisp_undervaluation)
+
+        _, right = self.branches(values)
+
+        possibility = np.where(values < self.kernel_max, 1.0, np.where(self.max < values, 0.0, right))
+        necessity = np.where(values < self.max, 1.0, 0.0)
+
+        return possibility, np.minimum(necessity, possibility)
+
+
+@lru_cache(maxsize=256)
+def compile_fuzzy_number(fuzzy_number: FuzzyNumber) -> CompiledFuzzyNumber:
+    return CompiledFuzzyNumber(fuzzy_number)
+
+
+def membership_array(values: np.ndarray, fuzzy_number: FuzzyNumber) -> np.ndarray:
+    return compile_fuzzy_number(fuzzy_number).membership(values)
+
+
+def exceedance_array(values: np.ndarray, fuzzy_number: FuzzyNumber) -> Tuple[np.ndarray, np.ndarray]:
+    return compile_fuzzy_number(fuzzy_number).exceedance(values)
+
+
+def undervaluation_array(values: np.ndarray, fuzzy_number: FuzzyNumber) -> Tuple[np.ndarray, np.ndarray]:
+    return compile_fuzzy_number(fuzzy_number).undervaluation(values)
+
+
+def _crisp_first(
+    possibility_function: Callable[[FuzzyNumber, FuzzyNumber], Decimal],
+    necessity_function: Callable[[FuzzyNumber, FuzzyNumber], Decimal],
+) -> Callable[[FuzzyNumber, FuzzyNumber], PossibilisticMembership]:
+    def function(fuzzy_number: FuzzyNumber, crisp_number: FuzzyNumber) -> PossibilisticMembership:
+        # FuzzyMath rejects its own result with necessity above possibility, that can happen for crisp first argument
+        possibility = possibility_function(crisp_number, fuzzy_number)
+        necessity = necessity_function(crisp_number, fuzzy_number)
+
+        return PossibilisticMembership(possibility, min(necessity, possibility))
+
+    return function
+
+
+_crisp_exceedance = _crisp_first(possibility_exceedance, necessity_exceedance)
+_crisp_undervaluation = _crisp_first(possibility_undervaluation, necessity_undervaluation)
+
+
+def _general_possibilistic_array(
+    values: np.ndarray,
+    fuzzy_number: FuzzyNumber,
+    function: Callable[[FuzzyNumber, FuzzyNumber], PossibilisticMembership],
+) -> Tuple[np.ndarray, np.ndarray]:
+    # alpha cut based evaluation from FuzzyMath, done once for every distinct value
+    unique_values, inverse = np.unique(values, return_inverse=True)
+
+    possibility = np.zeros(unique_values.shape, dtype=np.float64)
+    necessity = np.zeros(unique_values.shape, dtype=np.float64)
+
+    for i, value in enumerate(unique_values):
+        if np.isnan(value):
+            continue
+
+        pm = function(fuzzy_number, FuzzyNumberFactory.crisp_number(float(value)))
+
+        possibility[i] = pm.possibility
+        necessity[i] = pm.necessity
+
+    inverse = inverse.reshape(values.shape)
+
+    return possibility[inverse], necessity[inverse]
+
+
+def fuzzy_and_array(a: np.ndarray, b: np.ndarray, operation_type: str) -> np.ndarray:
+    if operation_type == "min":
+        return np.minimum(a, b)
+
+    elif operation_type == "product":
+        return a * b
+
+    elif operation_type == "drastic":
+        return np.where(a == 1, b, np.where(b == 1, a, 0.0))
+
+    elif operation_type == "Lukasiewicz":
+        return np.maximum(0.0, a + b - 1.0)
+
+    elif operation_type == "Nilpotent":
+        return np.where(a + b > 1, np.minimum(a, b), 0.0)
+
+    elif operation_type == "Hamacher":
+        numerator = a * b
+        denominator = a + b - numerator
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(denominator == 0, 0.0, numerator / denominator)
+
+    raise ValueError("Unknown fuzzy and type `{}`.".format(operation_type))
+
+
+def fuzzy_or_array(a: np.ndarray, b: np.ndarray, operation_type: str) -> np.ndarray:
+    if operation_type == "max":
+        return np.maximum(a, b)
+
+    elif operation_type == "product":
+        return a + b - a * b
+
+    elif operation_type == "drastic":
+        # mirrors `FuzzyOr.drastic` from FuzzyMath
+        return np.where(a == 0, b, np.where(b == 0, a, 0.0))
+
+    elif operation_type == "Lukasiewicz":
+        return np.minimum(1.0, a + b)
+
+    elif operation_type == "Nilpotent":
+        return np.where(a + b < 1, np.maximum(a, b), 1.0)
+
+    elif operation_type == "Hamacher":
+        return (a + b) / (1.0 + a * b)
+
+    raise ValueError("Unknown fuzzy or type `{}`.".format(operation_type))
+
+
+def possibilistic_and_array(
+    possibility_a: np.ndarray,
+    necessity_a: np.ndarray,
+    possibility_b: np.ndarray,
+    necessity_b: np.ndarray,
+    operation_type: str,
+) -> Tuple[np.ndarray, np.ndarray]:
+    return (
+        fuzzy_and_array(possibility_a, possibility_b, operation_type),
+        fuzzy_and_array(necessity_a, necessity_b, operation_type),
+    )
+
+
+def possibilistic_or_array(
+    possibility_a: np.ndarray,
+    necessity_a: np.ndarray,
+    possibility_b: np.ndarray,
+    necessity_b: np.ndarray,
+    operation_type: str,
+) -> Tuple[np.ndarray, np.ndarray]:
+    return (
+        fuzzy_or_array(possibility_a, possibility_b, operation_type),
+        fuzzy_or_array(necessity_a, necessity_b, operation_type),
+    )
+
+
+def fuzzy_and_arrays(
+    memberships: Sequence[np.ndarray], operation_type: str, weights: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """T-norm folded across all `memberships`, weighted memberships are `max(1 - weight, membership)`."""
+
+    if weights is not None:
+        memberships = [np.maximum(1.0 - weight, membership) for membership, weight in zip(memberships, weights)]
+
+    return reduce(lambda a, b: fuzzy_and_array(a, b, operation_type), memberships)
+
+
+def fuzzy_or_arrays(
+    memberships: Sequence[np.ndarray], operation_type: str, weights: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """T-conorm folded across all `memberships`, weighted memberships are `min(weight, membership)`."""
+
+    if weights is not None:
+        memberships = [np.minimum(weight, membership) for membership, weight in zip(memberships, weights)]
+
+    return reduce(lambda a, b: fuzzy_or_array(a, b, operation_type), memberships)
+
+
+def possibilistic_and_arrays(
+    possibilities: Sequence[np.ndarray],
+    necessities: Sequence[np.ndarray],
+    operation_type: str,
+    weights: Optional[Sequence[float]] = None,
+) -> List[np.ndarray]:
+    return [
+        fuzzy_and_arrays(possibilities, operation_type, weights),
+        fuzzy_and_arrays(necessities, operation_type, weights),
+    ]
+
+
+def possibilistic_or_arrays(
+    possibilities: Sequence[np.ndarray],
+    necessities: Sequence[np.ndarray],
+    operation_type: str,
+    weights: Optional[Sequence[float]] = None,
+) -> List[np.ndarray]:
+    return [
+        fuzzy_or_arrays(possibilities, operation_type, weights),
+        fuzzy_or_arrays(necessities, operation_type, weights),
+    ]
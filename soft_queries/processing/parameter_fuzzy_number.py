@@ -1,6 +1,10 @@
+from typing import Optional
+
 from FuzzyMath import FuzzyNumberFactory
 from qgis.core import QgsProcessingParameterDefinition
 
+from .fuzzy_arrays import CompiledFuzzyNumber, compile_fuzzy_number
+
 
 class ParameterFuzzyNumber(QgsProcessingParameterDefinition):
     def __init__(self, name="", description="", parent=None, optional=False):
@@ -41,3 +45,12 @@ class ParameterFuzzyNumber(QgsProcessingParameterDefinition):
                     float(values[2]),
                     float(values[3]),
                 )
+
+    @staticmethod
+    def valueToCompiledFuzzyNumber(value) -> Optional[CompiledFuzzyNumber]:
+        fuzzy_number = ParameterFuzzyNumber.valueToFuzzyNumber(value)
+
+        if fuzzy_number is None:
+            return None
+
+        return compile_fuzzy_number(fuzzy_number)
@@ -1,7 +1,9 @@
-from typing import Tuple
+from typing import List, Tuple
 
 from qgis.core import QgsProcessingParameterDefinition, QgsRasterLayer
 
+from .utils import NECESSITY_BAND, POSSIBILITY_BAND, verify_one_band
+
 
 class ParameterPossibilisticElement(QgsProcessingParameterDefinition):
     def __init__(self, name="", description="", parent=None, optional=False):
@@ -24,6 +26,11 @@ class ParameterPossibilisticElement(QgsProcessingParameterDefinition):
 
     @staticmethod
     def valueToRasters(value: str) -> Tuple[QgsRasterLayer, QgsRasterLayer]:
+        """
+        Possibility and necessity rasters, either two layer URIs joined by `::~::` or one URI of two-band raster (band 1
+        possibility, band 2 necessity) that is returned as the same layer twice.
+        """
+
         if value is None:
             return None
 
@@ -35,6 +42,42 @@ class ParameterPossibilisticElement(QgsProcessingParameterDefinition):
             split_value = value.split("::~::")
 
             raster_possibility = QgsRasterLayer(split_value[0])
+
+            if len(split_value) == 1:
+                return (raster_possibility, raster_possibility)
+
             raster_necessity = QgsRasterLayer(split_value[1])
 
             return (raster_possibility, raster_necessity)
+
+    @staticmethod
+    def valueToRasterBands(value: str) -> List[Tuple[QgsRasterLayer, int]]:
+        """Pairs of raster and band of possibility and necessity."""
+
+        rasters = ParameterPossibilisticElement.valueToRasters(value)
+
+        if rasters is None:
+            return None
+
+        raster_possibility, raster_necessity = rasters
+
+        if raster_possibility is raster_necessity:
+            return [(raster_possibility, POSSIBILITY_BAND), (raster_necessity, NECESSITY_BAND)]
+
+        return [(raster_possibility, 1), (raster_necessity, 1)]
+
+    @staticmethod
+    def verifyRasters(value: str) -> bool:
+        """Two-band raster has to have exactly two bands, separate rasters one band each."""
+
+        rasters = ParameterPossibilisticElement.valueToRasters(value)
+
+        if rasters is None:
+            return False
+
+        raster_possibility, raster_necessity = rasters
+
+        if raster_possibility is raster_necessity:
+            return raster_possibility.bandCount() == 2
+
+        return verify_one_band([raster_possibility, raster_necessity])
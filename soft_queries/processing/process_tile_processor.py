@@ -0,0 +1,280 @@
+import multiprocessing
+import shutil
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from pathlib import Path
+from typing import Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+from osgeo import gdal
+from qgis.core import (
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProcessingUtils,
+    QgsRasterDataProvider,
+)
+
+from .area_of_interest import AreaOfInterest
+from .tile_journal import TileJournal, tile_hash
+from .tile_processor import TileFunction, TileProcessor
+from .utils import (
+    OUTPUT_DATA_TYPES,
+    TILES_IN_FLIGHT_PER_THREAD,
+    OutputDataType,
+    RasterPart,
+    RasterWindow,
+    apply_scale_offset,
+    array_nodata_mask,
+    raster_file_path,
+)
+
+# datasets opened by worker process, kept open for all windows the process handles
+_WORKER_DATASETS: Dict[str, gdal.Dataset] = {}
+
+# tile function of worker process, installed once by the pool initializer instead of being pickled with every window
+_WORKER_FUNCTION: Optional[TileFunction] = None
+
+
+def init_worker(function: TileFunction) -> None:
+
+    global _WORKER_FUNCTION
+
+    _WORKER_FUNCTION = function
+
+
+def python_executable() -> str:
+    """Python interpreter for worker processes, inside QGIS `sys.executable` can be the QGIS binary itself."""
+
+    executable = Path(sys.executable)
+
+    if executable.name.lower().startswith("python"):
+        return executable.as_posix()
+
+    prefix = Path(sys.exec_prefix)
+
+    for candidate in [
+        prefix / "python.exe",
+        prefix / "python3.exe",
+        prefix / "bin" / "python3",
+        prefix / "bin" / "python",
+    ]:
+        if candidate.exists():
+            return candidate.as_posix()
+
+    return shutil.which("python3") or executable.as_posix()
+
+
+def read_window(sources: List[Tuple[str, int]], window: RasterWindow) -> Tuple[List[np.ndarray], np.ndarray]:
+    """Values of `window` of all `sources` and mask of pixels that are no data in any of them."""
+
+    values = []
+    nodata_mask = np.zeros((window.height, window.width), dtype=bool)
+
+    for path, band in sources:
+        if path not in _WORKER_DATASETS:
+            _WORKER_DATASETS[path] = gdal.Open(path)
+
+        raster_band = _WORKER_DATASETS[path].GetRasterBand(band)
+
+        part_values = raster_band.ReadAsArray(window.col, window.row, window.width, window.height)
+
+        nodata_mask |= array_nodata_mask(part_values, raster_band.GetNoDataValue())
+
+        # mask bands and per dataset masks are honoured by QGIS providers as well
+        if not raster_band.GetMaskFlags() & gdal.GMF_ALL_VALID:
+            mask_values = raster_band.GetMaskBand().ReadAsArray(window.col, window.row, window.width, window.height)
+            nodata_mask |= mask_values == 0
+
+        # quantized rasters are read as their real values, same as QGIS providers do
+        values.append(apply_scale_offset(part_values, raster_band.GetScale(), raster_band.GetOffset()))
+
+    return values, nodata_mask
+
+
+def process_window(
+    sources: List[Tuple[str, int]],
+    slot_path: str,
+    slot_shape: Tuple[int, int, int],
+    window: RasterWindow,
+    incremental: bool = False,
+    known_hash: Optional[str] = None,
+) -> Tuple[RasterWindow, Optional[str], bool, float, float]:
+    """
+    Stores results and no data mask of `window` into memory mapped slot, results first and the mask as the last layer.
+    Returns the window, hash of its input values if `incremental`, whether the results were computed and time spent
+    reading and computing the window.
+    """
+
+    read_start = time.perf_counter()
+
+    values, nodata_mask = read_window(sources, window)
+
+    compute_start = time.perf_counter()
+
+    window_hash = tile_hash(values) if incremental else None
+
+    if window_hash is not None and window_hash == known_hash:
+        return window, window_hash, False, compute_start - read_start, time.perf_counter() - compute_start
+
+    slot = np.memmap(slot_path, dtype=np.float64, mode="r+", shape=slot_shape)
+
+    for i, result in enumerate(_WORKER_FUNCTION(values)):
+        slot[i, : window.height, : window.width] = result
+
+    slot[-1, : window.height, : window.width] = nodata_mask
+
+    slot.flush()
+    del slot
+
+    return window, window_hash, True, compute_start - read_start, time.perf_counter() - compute_start
+
+
+class ProcessTileProcessor(TileProcessor):
+    """
+    Computes tiles in worker processes that read the sources with GDAL and store results with no data mask into memory
+    mapped slots, one per tile in flight. The parent process writes every window from its slot into the outputs as soon
+    as it is computed, in the order of windows.
+
+    `function` has to be picklable (a module level function or `functools.partial` of one).
+    """
+
+    def __init__(
+        self,
+        inputs: List[RasterPart],
+        outputs: List[QgsRasterDataProvider],
+        function: TileFunction,
+        nodata_value: float,
+        processes: int = 1,
+        raster_band: int = 1,
+        output_data_type: OutputDataType = OUTPUT_DATA_TYPES[0],
+        output_bands: Optional[List[int]] = None,
+        journal: Optional[TileJournal] = None,
+        area_of_interest: Optional[AreaOfInterest] = None,
+        output_results: Optional[List[int]] = None,
+    ) -> None:
+
+        super().__init__(
+            inputs,
+            outputs,
+            function,
+            nodata_value,
+            processes,
+            raster_band,
+            output_data_type,
+            output_bands,
+            journal,
+            area_of_interest,
+            output_results,
+        )
+
+        self.sources = []
+
+        for raster_part in inputs:
+            path = raster_file_path(raster_part.input_raster)
+
+            if not path:
+                raise QgsProcessingException(
+                    "Processing in separate processes requires rasters readable by GDAL, `{}` is not.".format(
+                        raster_part.input_raster.source()
+                    )
+                )
+
+            self.sources.append((path, raster_part.raster_band))
+
+    def process_windows(self, windows: List[RasterWindow], feedback: QgsProcessingFeedback) -> bool:
+
+        if not windows:
+            return True
+
+        result_count = max(self.output_results) + 1
+
+        # every tile in flight has its own slot sized to the largest window, so scratch storage does not grow with
+        # the raster size and slots are reused once their tile is written
+        slot_shape = (
+            result_count + 1,
+            max(window.height for window in windows),
+            max(window.width for window in windows),
+        )
+
+        total = sum(window.size for window in windows)
+        processed = 0
+
+        incremental = self.journal is not None and self.journal.incremental
+
+        context = multiprocessing.get_context("spawn")
+        context.set_executable(python_executable())
+
+        with tempfile.TemporaryDirectory(dir=QgsProcessingUtils.tempFolder()) as temp_dir:
+
+            free_slots: Deque[str] = deque()
+
+            for i in range(TILES_IN_FLIGHT_PER_THREAD * self.threads):
+                slot_path = (Path(temp_dir) / "slot_{}.dat".format(i)).as_posix()
+
+                np.memmap(slot_path, dtype=np.float64, mode="w+", shape=slot_shape).flush()
+
+                free_slots.append(slot_path)
+
+            # tiles are written in the order of windows as soon as they are computed, same as by threads
+            pending: Deque[Tuple[str, Future]] = deque()
+            windows_iter = iter(windows)
+
+            with ProcessPoolExecutor(
+                max_workers=self.threads, mp_context=context, initializer=init_worker, initargs=(self.function,)
+            ) as executor:
+
+                def submit_next() -> None:
+                    window = next(windows_iter, None)
+
+                    if window is not None:
+                        slot_path = free_slots.popleft()
+
+                        future = executor.submit(
+                            process_window,
+                            self.sources,
+                            slot_path,
+                            slot_shape,
+                            window,
+                            incremental,
+                            self.journal.hash_of(window) if incremental else None,
+                        )
+
+                        pending.append((slot_path, future))
+
+                for _ in range(len(free_slots)):
+                    submit_next()
+
+                while pending:
+                    if feedback.isCanceled():
+                        executor.shutdown(wait=True, cancel_futures=True)
+                        return False
+
+                    slot_path, future = pending.popleft()
+
+                    window, window_hash, window_computed, read_time, compute_time = future.result()
+
+                    self.statistics.add_compute(read_time, compute_time)
+
+                    if window_computed:
+                        slot = np.memmap(slot_path, dtype=np.float64, mode="r", shape=slot_shape)
+
+                        window_slot = np.array(slot[:, : window.height, : window.width])
+
+                        del slot
+
+                        self.write(window, list(window_slot[:-1]), window_slot[-1] != 0, window_hash)
+
+                    else:
+                        self.write(window, None, np.zeros((window.height, window.width), dtype=bool), window_hash)
+
+                    free_slots.append(slot_path)
+
+                    submit_next()
+
+                    processed += window.size
+                    feedback.setProgress(int(100.0 * processed / total))
+
+        return True
@@ -0,0 +1,669 @@
+import os
+from typing import Dict, List, Optional, Tuple, Type
+
+from qgis.core import (
+    QgsCoordinateTransform,
+    QgsCsException,
+    QgsGeometry,
+    QgsProcessing,
+    QgsProcessingAlgorithm,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProcessingOutputString,
+    QgsProcessingParameterBoolean,
+    QgsProcessingParameterDefinition,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterExtent,
+    QgsProcessingParameterFeatureSource,
+    QgsProcessingParameterNumber,
+    QgsProcessingParameterRasterDestination,
+    QgsRasterDataProvider,
+    QgsRasterLayer,
+)
+
+from .area_of_interest import AreaOfInterest
+from .process_tile_processor import ProcessTileProcessor
+from .tile_journal import WORKING_COPY_SUFFIX, TileJournal, fingerprint, raster_fingerprint
+from .tile_processor import TileProcessor
+from .tile_statistics import TileStatistics
+from .utils import (
+    BIGTIFF_MODES,
+    COMPRESSIONS,
+    NECESSITY_BAND,
+    OUTPUT_BLOCK_SIZE,
+    OUTPUT_DATA_TYPES,
+    POSSIBILISTIC_BAND_DESCRIPTIONS,
+    POSSIBILITY_BAND,
+    RESAMPLING_METHODS,
+    WORKING_COPY_CREATION_OPTIONS,
+    OutputDataType,
+    RasterOutputOptions,
+    RasterWindow,
+    build_overviews,
+    convert_to_cog,
+    copy_raster,
+    create_multiband_raster,
+    create_raster,
+    create_raster_writer,
+    is_geotiff,
+    open_raster_for_update,
+    plan_threads,
+    plan_tile_size,
+    raster_windows,
+    set_raster_band_descriptions,
+    set_raster_scale_offset,
+    settings_memory_budget_mb,
+    settings_threads,
+)
+
+
+class SoftQueriesRasterAlgorithm(QgsProcessingAlgorithm):
+
+    TILE_WIDTH = "TILE_WIDTH"
+    TILE_HEIGHT = "TILE_HEIGHT"
+    MEMORY_BUDGET = "MEMORY_BUDGET"
+    THREADS = "THREADS"
+    BACKEND = "BACKEND"
+    OUTPUT_DATA_TYPE = "OUTPUT_DATA_TYPE"
+    COMPRESSION = "COMPRESSION"
+    TILED = "TILED"
+    BIGTIFF = "BIGTIFF"
+    COG = "COG"
+    OVERVIEWS = "OVERVIEWS"
+    RESAMPLING = "RESAMPLING"
+    CHECKPOINT = "CHECKPOINT"
+    INCREMENTAL = "INCREMENTAL"
+    EXTENT = "EXTENT"
+    MASK = "MASK"
+    CROP = "CROP"
+
+    OUTPUT_POSSIBILITY = "OUTPUT_POSSIBILITY"
+    OUTPUT_NECESSITY = "OUTPUT_NECESSITY"
+    OUTPUT_POSSIBILISTIC = "OUTPUT_POSSIBILISTIC"
+
+    OUTPUT_STATISTICS = "OUTPUT_STATISTICS"
+
+    # parameters that do not change the results, so changing them does not invalidate journal, tile size of resumed
+    # run that depends on them is taken from the journal
+    performance_parameters = [MEMORY_BUDGET, THREADS, BACKEND]
+
+    backends_enum = ["Threads", "Processes"]
+
+    backends = {"Threads": TileProcessor, "Processes": ProcessTileProcessor}
+
+    def addAdvancedParameter(self, parameter: QgsProcessingParameterDefinition) -> bool:
+
+        parameter.setFlags(parameter.flags() | QgsProcessingParameterDefinition.FlagAdvanced)
+
+        return self.addParameter(parameter)
+
+    def addRasterProcessingParameters(self) -> None:
+
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.OUTPUT_DATA_TYPE,
+                "Output data type",
+                [output_data_type.name for output_data_type in OUTPUT_DATA_TYPES],
+                defaultValue=0,
+            )
+        )
+
+        self.addAdvancedParameter(
+            QgsProcessingParameterEnum(
+                self.COMPRESSION,
+                "Output compression",
+                COMPRESSIONS,
+                defaultValue=COMPRESSIONS.index("DEFLATE"),
+            )
+        )
+
+        self.addAdvancedParameter(QgsProcessingParameterBoolean(self.TILED, "Tiled output", defaultValue=True))
+
+        self.addAdvancedParameter(
+            QgsProcessingParameterEnum(self.BIGTIFF, "BigTIFF output", BIGTIFF_MODES, defaultValue=0)
+        )
+
+        self.addAdvancedParameter(
+            QgsProcessingParameterBoolean(self.COG, "Cloud Optimized GeoTIFF output", defaultValue=False)
+        )
+
+        self.addAdvancedParameter(QgsProcessingParameterBoolean(self.OVERVIEWS, "Build overviews", defaultValue=True))
+
+        self.addAdvancedParameter(
+            QgsProcessingParameterNumber(
+                self.TILE_WIDTH,
+                "Tile width in pixels (0 - derived from raster block size)",
+                QgsProcessingParameterNumber.Integer,
+                defaultValue=0,
+                minValue=0,
+            )
+        )
+
+        self.addAdvancedParameter(
+            QgsProcessingParameterNumber(
+                self.TILE_HEIGHT,
+                "Tile height in pixels (0 - derived from raster block size)",
+                QgsProcessingParameterNumber.Integer,
+                defaultValue=0,
+                minValue=0,
+            )
+        )
+
+        self.addAdvancedParameter(
+            QgsProcessingParameterNumber(
+                self.MEMORY_BUDGET,
+                "Memory budget for all processed tiles (MB)",
+                QgsProcessingParameterNumber.Integer,
+                defaultValue=settings_memory_budget_mb(),
+                minValue=1,
+            )
+        )
+
+        self.addAdvancedParameter(
+            QgsProcessingParameterNumber(
+                self.THREADS,
+                "Number of threads or processes (0 - number of CPUs)",
+                QgsProcessingParameterNumber.Integer,
+                defaultValue=settings_threads(),
+                minValue=0,
+            )
+        )
+
+        self.addOutput(QgsProcessingOutputString(self.OUTPUT_STATISTICS, "Tile processing statistics (JSON)"))
+
+    def addBackendParameter(self) -> None:
+
+        self.addAdvancedParameter(
+            QgsProcessingParameterEnum(
+                self.BACKEND,
+                "Execution backend",
+                self.backends_enum,
+                defaultValue=0,
+            )
+        )
+
+    def addResamplingParameter(self) -> None:
+
+        self.addAdvancedParameter(
+            QgsProcessingParameterEnum(
+                self.RESAMPLING,
+                "Resampling of inputs not aligned with the first input",
+                list(RESAMPLING_METHODS.keys()),
+                defaultValue=0,
+            )
+        )
+
+    def addAreaOfInterestParameters(self) -> None:
+
+        self.addParameter(QgsProcessingParameterExtent(self.EXTENT, "Extent of interest", optional=True))
+
+        self.addParameter(
+            QgsProcessingParameterFeatureSource(
+                self.MASK,
+                "Mask layer (process only inside polygons)",
+                [QgsProcessing.TypeVectorPolygon],
+                optional=True,
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterBoolean(
+                self.CROP, "Crop outputs to extent of interest and mask layer", defaultValue=False
+            )
+        )
+
+    def addPossibilisticOutputParameters(self) -> None:
+        """Separate possibility and necessity rasters and two-band raster with both, only specified ones are written."""
+
+        self.addParameter(
+            QgsProcessingParameterRasterDestination(
+                self.OUTPUT_POSSIBILITY, "Output raster layer - possibility", optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterDestination(
+                self.OUTPUT_NECESSITY, "Output raster layer - necessity", optional=True
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterDestination(
+                self.OUTPUT_POSSIBILISTIC,
+                "Output raster layer - possibilistic (band 1 possibility, band 2 necessity)",
+                optional=True,
+                createByDefault=False,
+            )
+        )
+
+    def addTileJournalParameters(self) -> None:
+
+        self.addAdvancedParameter(
+            QgsProcessingParameterBoolean(
+                self.CHECKPOINT,
+                "Resumable run (journal of written tiles next to the output)",
+                defaultValue=False,
+            )
+        )
+
+        incremental = QgsProcessingParameterBoolean(
+            self.INCREMENTAL,
+            "Incremental update of existing output (rewrite only tiles with changed inputs)",
+            defaultValue=False,
+        )
+
+        incremental.setHelp(
+            "Uncompressed GeoTIFF output without COG layout is updated in place, canceled run leaves it partially "
+            "updated. Other outputs are updated through uncompressed GeoTIFF working copy `<output>{}` that is kept "
+            "next to the output together with the journal, after complete run with changed tiles the output is "
+            "recreated from it with the selected compression, overviews and COG layout. Canceled run leaves such "
+            "output untouched.".format(WORKING_COPY_SUFFIX)
+        )
+
+        self.addAdvancedParameter(incremental)
+
+    def parameterAsTileSize(
+        self, parameters, context, raster: QgsRasterLayer, streams: int, threads: int = 1
+    ) -> Tuple[int, int]:
+
+        tile_width = self.parameterAsInt(parameters, self.TILE_WIDTH, context)
+        tile_height = self.parameterAsInt(parameters, self.TILE_HEIGHT, context)
+        memory_budget = self.parameterAsInt(parameters, self.MEMORY_BUDGET, context)
+
+        output_block_size = None
+
+        # working copy of incremental run is always tiled
+        if self.parameterAsRasterOutputOptions(parameters, context).tiled or self.parameterAsBoolean(
+            parameters, self.INCREMENTAL, context
+        ):
+            output_block_size = (OUTPUT_BLOCK_SIZE, OUTPUT_BLOCK_SIZE)
+
+        return plan_tile_size(
+            raster,
+            streams,
+            memory_budget,
+            tile_width,
+            tile_height,
+            threads=threads,
+            output_block_size=output_block_size,
+        )
+
+    def parameterAsThreads(self, parameters, context) -> int:
+
+        threads = self.parameterAsInt(parameters, self.THREADS, context)
+
+        if threads <= 0:
+            threads = os.cpu_count() or 1
+
+        return threads
+
+    def parameterAsRasterWindows(
+        self,
+        parameters,
+        context,
+        raster: QgsRasterLayer,
+        streams: int,
+        threads: int = 1,
+        area_of_interest: Optional[AreaOfInterest] = None,
+        tile_size: Optional[Tuple[int, int]] = None,
+    ) -> List[RasterWindow]:
+
+        if tile_size is None:
+            tile_size = self.parameterAsTileSize(parameters, context, raster, streams, threads)
+
+        tile_width, tile_height = tile_size
+
+        if area_of_interest is not None:
+            return area_of_interest.windows(tile_width, tile_height)
+
+        return raster_windows(raster.width(), raster.height(), tile_width, tile_height)
+
+    def parameterAsTilePlan(
+        self,
+        parameters,
+        context,
+        raster: QgsRasterLayer,
+        streams: int,
+        feedback: QgsProcessingFeedback,
+        area_of_interest: Optional[AreaOfInterest] = None,
+        journal: Optional[TileJournal] = None,
+    ) -> Tuple[List[RasterWindow], int]:
+        """
+        Windows and number of threads for processing `streams` input and output rasters, such that all tiles held at
+        once fit into the memory budget. Number of threads is reduced if even the smallest tiles would not fit. Only
+        windows intersecting `area_of_interest` are returned, if specified. Resumed `journal` keeps tile size of the run
+        that started it, as its windows are keyed by it.
+        """
+
+        threads = self.parameterAsThreads(parameters, context)
+        memory_budget = self.parameterAsInt(parameters, self.MEMORY_BUDGET, context)
+
+        tile_width = self.parameterAsInt(parameters, self.TILE_WIDTH, context)
+        tile_height = self.parameterAsInt(parameters, self.TILE_HEIGHT, context)
+
+        tile_size = None
+
+        if journal is not None and journal.resumed and journal.tile_size is not None:
+            tile_size = journal.tile_size
+            tile_width, tile_height = tile_size
+
+        planned_threads = plan_threads(raster, streams, memory_budget, threads, tile_width, tile_height)
+
+        if planned_threads < threads:
+            feedback.pushInfo(
+                "Number of threads reduced from {} to {} to fit into memory budget of {} MB.".format(
+                    threads, planned_threads, memory_budget
+                )
+            )
+
+        if tile_size is None:
+            tile_size = self.parameterAsTileSize(parameters, context, raster, streams, planned_threads)
+
+        if journal is not None:
+            journal.record_tile_size(tile_size)
+
+        windows = self.parameterAsRasterWindows(
+            parameters, context, raster, streams, planned_threads, area_of_interest, tile_size
+        )
+
+        return windows, planned_threads
+
+    def parameterAsAreaOfInterest(self, parameters, context, raster: QgsRasterLayer) -> AreaOfInterest:
+        """Part of the grid of `raster` inside extent of interest and mask layer, the whole raster if not set."""
+
+        extent = self.parameterAsExtent(parameters, self.EXTENT, context, raster.crs())
+
+        if extent.isNull():
+            extent = None
+
+        mask = None
+
+        source = self.parameterAsSource(parameters, self.MASK, context)
+
+        if source is not None:
+            mask = QgsGeometry.unaryUnion(
+                [feature.geometry() for feature in source.getFeatures() if feature.hasGeometry()]
+            )
+
+            if mask.isEmpty():
+                raise QgsProcessingException("Mask layer does not contain any polygon.")
+
+            try:
+                mask.transform(QgsCoordinateTransform(source.sourceCrs(), raster.crs(), context.transformContext()))
+            except QgsCsException as e:
+                raise QgsProcessingException("Mask cannot be transformed into CRS of the raster: {}".format(e))
+
+        area_of_interest = AreaOfInterest(raster, extent, mask, self.parameterAsBoolean(parameters, self.CROP, context))
+
+        if area_of_interest.is_empty():
+            raise QgsProcessingException("Extent of interest and mask layer do not intersect the raster.")
+
+        return area_of_interest
+
+    def parameterAsPossibilisticOutputs(self, parameters, context) -> Dict[str, str]:
+        """Paths of specified possibilistic outputs by their names."""
+
+        outputs = {}
+
+        for name in [self.OUTPUT_POSSIBILITY, self.OUTPUT_NECESSITY, self.OUTPUT_POSSIBILISTIC]:
+            path = self.parameterAsOutputLayer(parameters, name, context)
+
+            if path:
+                outputs[name] = path
+
+        return outputs
+
+    def parameterAsTileProcessorClass(self, parameters, context) -> Type[TileProcessor]:
+
+        backend = self.backends_enum[self.parameterAsEnum(parameters, self.BACKEND, context)]
+
+        return self.backends[backend]
+
+    def parameterAsResamplingMethod(self, parameters, context) -> QgsRasterDataProvider.ResamplingMethod:
+
+        return list(RESAMPLING_METHODS.values())[self.parameterAsEnum(parameters, self.RESAMPLING, context)]
+
+    def parameterAsOutputDataType(self, parameters, context) -> OutputDataType:
+
+        return OUTPUT_DATA_TYPES[self.parameterAsEnum(parameters, self.OUTPUT_DATA_TYPE, context)]
+
+    def parameterAsRasterOutputOptions(self, parameters, context) -> RasterOutputOptions:
+
+        return RasterOutputOptions(
+            COMPRESSIONS[self.parameterAsEnum(parameters, self.COMPRESSION, context)],
+            self.parameterAsBoolean(parameters, self.TILED, context),
+            BIGTIFF_MODES[self.parameterAsEnum(parameters, self.BIGTIFF, context)],
+            self.parameterAsBoolean(parameters, self.COG, context),
+            self.parameterAsBoolean(parameters, self.OVERVIEWS, context),
+        )
+
+    def parameterAsTileJournal(
+        self, parameters, context, output_paths: List[str], input_rasters: List[QgsRasterLayer]
+    ) -> Optional[TileJournal]:
+
+        incremental = self.parameterAsBoolean(parameters, self.INCREMENTAL, context)
+
+        if not incremental and not self.parameterAsBoolean(parameters, self.CHECKPOINT, context):
+            return None
+
+        parameters_values = {}
+
+        for parameter in self.parameterDefinitions():
+
+            # incremental journal is valid for both, resumable and not resumable runs
+            if parameter.isDestination() or parameter.name() in self.performance_parameters + [self.CHECKPOINT]:
+                continue
+
+            value = parameters.get(parameter.name(), parameter.defaultValue())
+
+            # objects (layers, feature source definitions, properties) are hashed by their definition, not by str()
+            # that contains memory address
+            parameters_values[parameter.name()] = parameter.valueAsPythonString(value, context)
+
+        # changes of input files are detected by hashes of tiles in incremental run
+        inputs_fingerprint = [raster_fingerprint(raster, file_stats=not incremental) for raster in input_rasters]
+
+        output_options = self.parameterAsRasterOutputOptions(parameters, context)
+
+        return TileJournal(
+            output_paths,
+            fingerprint(self.name(), parameters_values, inputs_fingerprint),
+            incremental=incremental,
+            in_place=output_options.updatable_in_place and all(is_geotiff(path) for path in output_paths),
+        )
+
+    def createOutputRaster(
+        self,
+        path_raster: str,
+        template_raster: QgsRasterLayer,
+        output_data_type: OutputDataType,
+        creation_options: List[str],
+        nodata_value: float,
+        journal: Optional[TileJournal] = None,
+        output_window: Optional[RasterWindow] = None,
+        band_count: int = 1,
+    ) -> QgsRasterDataProvider:
+        """
+        Creates output raster covering `output_window` of the template (the whole template if None), or opens existing
+        partial output if `journal` continues previous run. Incremental run writes into working copy of the output.
+        """
+
+        if journal is not None:
+            path_raster = journal.raster_path(path_raster)
+
+            if journal.incremental and not journal.in_place:
+                creation_options = WORKING_COPY_CREATION_OPTIONS
+
+        if journal is not None and journal.resumed:
+            raster_dp = open_raster_for_update(path_raster)
+        else:
+            raster_writer = create_raster_writer(path_raster, creation_options)
+
+            if band_count > 1:
+                raster_dp = create_multiband_raster(
+                    raster_writer, template_raster, band_count, output_data_type.data_type, output_window
+                )
+            else:
+                raster_dp = create_raster(raster_writer, template_raster, output_data_type.data_type, output_window)
+
+        if not raster_dp:
+            raise QgsProcessingException("Data provider for raster `{}` not created.".format(path_raster))
+
+        if not raster_dp.isValid():
+            raise QgsProcessingException("Data provider for raster `{}` not valid.".format(path_raster))
+
+        for band in range(1, band_count + 1):
+            raster_dp.setNoDataValue(band, nodata_value)
+
+        return raster_dp
+
+    def createPossibilisticOutputs(
+        self,
+        outputs: Dict[str, str],
+        template_raster: QgsRasterLayer,
+        output_data_type: OutputDataType,
+        creation_options: List[str],
+        nodata_value: float,
+        journal: Optional[TileJournal] = None,
+        output_window: Optional[RasterWindow] = None,
+    ) -> Tuple[List[QgsRasterDataProvider], List[int], List[int]]:
+        """
+        Creates `outputs` from `parameterAsPossibilisticOutputs`. Returns outputs, bands and indices of results
+        (0 possibility, 1 necessity) for the tile processor, two-band raster is listed once for each of its bands.
+        """
+
+        raster_dps = []
+        output_bands = []
+        output_results = []
+
+        for name, path in outputs.items():
+
+            if name == self.OUTPUT_POSSIBILISTIC:
+                raster_dp = self.createOutputRaster(
+                    path, template_raster, output_data_type, creation_options, nodata_value, journal, output_window, 2
+                )
+
+                raster_dps += [raster_dp, raster_dp]
+                output_bands += [POSSIBILITY_BAND, NECESSITY_BAND]
+                output_results += [0, 1]
+
+            else:
+                raster_dp = self.createOutputRaster(
+                    path, template_raster, output_data_type, creation_options, nodata_value, journal, output_window
+                )
+
+                raster_dps.append(raster_dp)
+                output_bands.append(1)
+                output_results.append(0 if name == self.OUTPUT_POSSIBILITY else 1)
+
+        return raster_dps, output_bands, output_results
+
+    def journalRasterWindows(
+        self, journal: Optional[TileJournal], windows: List[RasterWindow], feedback: QgsProcessingFeedback
+    ) -> List[RasterWindow]:
+
+        if journal is None or not journal.resumed:
+            return windows
+
+        if journal.incremental:
+            feedback.pushInfo("Updating existing outputs, only tiles with changed inputs are rewritten.")
+
+            return windows
+
+        remaining_windows = journal.remaining(windows)
+
+        feedback.pushInfo(
+            "Continuing previous run, {} of {} tiles are already written.".format(
+                len(windows) - len(remaining_windows), len(windows)
+            )
+        )
+
+        return remaining_windows
+
+    def finishTileJournal(
+        self, journal: Optional[TileJournal], completed: bool, feedback: QgsProcessingFeedback
+    ) -> bool:
+        """Returns False if outputs are kept partial for the next run. Has to be called after processor checkpoint."""
+
+        if journal is None:
+            return True
+
+        if not completed:
+            feedback.pushInfo(
+                "Processing stopped, rerun with the same parameters continues from journal `{}`.".format(journal.path)
+            )
+
+            return False
+
+        if journal.incremental and journal.resumed:
+            feedback.pushInfo("{} tiles with unchanged inputs were not rewritten.".format(journal.unchanged_count))
+
+        if not journal.changed:
+            feedback.pushInfo("No tile was rewritten, outputs are kept as they are.")
+
+        journal.finish()
+
+        return True
+
+    def reportTileStatistics(self, statistics: TileStatistics, feedback: QgsProcessingFeedback) -> str:
+        """Pushes summary of `statistics` into `feedback`, returns them as JSON for the results of the algorithm."""
+
+        for line in statistics.summary():
+            feedback.pushInfo(line)
+
+        return statistics.to_json()
+
+    def finalizeOutputRaster(
+        self,
+        path_raster: str,
+        output_data_type: OutputDataType,
+        output_options: RasterOutputOptions,
+        journal: Optional[TileJournal] = None,
+    ) -> None:
+        """
+        Has to be called after data provider writing into the raster is deleted. Output of incremental run is recreated
+        from its working copy, unless it was updated in place. Output of incremental run without rewritten tiles is
+        kept as it is.
+        """
+
+        if journal is not None and not journal.changed:
+            return
+
+        if journal is not None and journal.incremental and not journal.in_place:
+            copy_raster(
+                journal.raster_path(path_raster),
+                path_raster,
+                output_options.creation_options(output_data_type.data_type),
+            )
+
+        if output_data_type.quantized:
+            set_raster_scale_offset(path_raster, output_data_type.scale, 0.0)
+
+        if output_options.cog and is_geotiff(path_raster):
+            # COG driver builds the overviews itself
+            convert_to_cog(path_raster, output_options.cog_creation_options(output_data_type.data_type))
+
+        elif output_options.overviews:
+            build_overviews(path_raster)
+
+    def finalizePossibilisticOutputs(
+        self,
+        outputs: Dict[str, str],
+        output_data_type: OutputDataType,
+        output_options: RasterOutputOptions,
+        journal: Optional[TileJournal] = None,
+    ) -> None:
+
+        if journal is not None and not journal.changed:
+            return
+
+        if self.OUTPUT_POSSIBILISTIC in outputs:
+            path = outputs[self.OUTPUT_POSSIBILISTIC]
+
+            # descriptions are copied with working copy of incremental run
+            set_raster_band_descriptions(
+                journal.raster_path(path) if journal is not None else path, POSSIBILISTIC_BAND_DESCRIPTIONS
+            )
+
+        for path in outputs.values():
+            self.finalizeOutputRaster(path, output_data_type, output_options, journal)
@@ -0,0 +1,320 @@
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+from qgis.core import (
+    QgsExpression,
+    QgsExpressionNode,
+    QgsExpressionNodeColumnRef,
+    QgsExpressionNodeFunction,
+    QgsExpressionNodeLiteral,
+    QgsExpressionNodeUnaryOperator,
+)
+
+from ..database.class_db import FuzzyDatabase
+from .fuzzy_arrays import (
+    CompiledFuzzyNumber,
+    compile_fuzzy_number,
+    fuzzy_and_array,
+    fuzzy_or_array,
+    possibilistic_and_array,
+    possibilistic_or_array,
+)
+from .parameter_fuzzy_number import ParameterFuzzyNumber
+
+# types of values flowing through compiled expression
+VALUES = "values"
+FUZZY = "fuzzy membership"
+POSSIBILISTIC = "possibilistic membership"
+FUZZY_NUMBER = "fuzzy number"
+STRING = "string"
+
+
+@dataclass
+class CompiledNode:
+    """Node of compiled expression, `evaluate` gets values of all used rasters for a tile."""
+
+    result_type: str
+    evaluate: Callable[[List[np.ndarray]], Any]
+    constant: bool = False
+
+
+def constant_node(result_type: str, value: Any) -> CompiledNode:
+    return CompiledNode(result_type, lambda values: value, True)
+
+
+class RasterExpression:
+    """
+    Soft query expression over raster layers, using the names of the plugin's expression functions, compiled into
+    a graph evaluated tile by tile in memory. Rasters are referenced by layer names (as fields in QGIS expressions).
+    """
+
+    def __init__(self, expression: str, raster_names: List[str]) -> None:
+
+        self.expression = QgsExpression(expression)
+
+        if self.expression.hasParserError():
+            raise ValueError("Cannot parse expression: {}".format(self.expression.parserErrorString()))
+
+        self.raster_names = raster_names
+
+        # names of rasters used by expression, in order of their inputs
+        self.variables: List[str] = []
+
+        self.root = self.compile(self.expression.rootNode())
+
+        if self.root.result_type not in [VALUES, FUZZY, POSSIBILISTIC]:
+            raise ValueError("Expression has to result in raster values, not `{}`.".format(self.root.result_type))
+
+        if not self.variables:
+            raise ValueError("Expression does not use any raster.")
+
+    @property
+    def outputs_count(self) -> int:
+        return 2 if self.root.result_type == POSSIBILISTIC else 1
+
+    def __call__(self, values: List[np.ndarray]) -> List[np.ndarray]:
+
+        shape = values[0].shape
+
+        result = self.root.evaluate(values)
+
+        if self.root.result_type != POSSIBILISTIC:
+            result = [result]
+
+        return [np.broadcast_to(np.asarray(part, dtype=np.float64), shape) for part in result]
+
+    def compile(self, node: QgsExpressionNode) -> CompiledNode:
+
+        if isinstance(node, QgsExpressionNodeLiteral):
+            value = node.value()
+
+            if isinstance(value, str):
+                return constant_node(STRING, value)
+
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return constant_node(VALUES, float(value))
+
+            raise ValueError("Unsupported literal `{}`.".format(value))
+
+        if isinstance(node, QgsExpressionNodeUnaryOperator) and node.op() == QgsExpressionNodeUnaryOperator.uoMinus:
+            operand = self.compile(node.operand())
+
+            if operand.result_type != VALUES or not operand.constant:
+                raise ValueError("Unary minus is supported only for numbers.")
+
+            return constant_node(VALUES, -operand.evaluate(None))
+
+        if isinstance(node, QgsExpressionNodeColumnRef):
+            return self.compile_raster(node.name())
+
+        if isinstance(node, QgsExpressionNodeFunction):
+            function_name = QgsExpression.Functions()[node.fnIndex()].name()
+
+            if function_name not in FUNCTIONS:
+                raise ValueError("Function `{}` is not supported in raster expressions.".format(function_name))
+
+            args = [self.compile(arg) for arg in node.args().list()] if node.args() else []
+
+            return FUNCTIONS[function_name](function_name, args)
+
+        raise ValueError("Unsupported part of expression `{}`.".format(node.dump()))
+
+    def compile_raster(self, name: str) -> CompiledNode:
+
+        if name not in self.raster_names:
+            raise ValueError("Raster `{}` is not among input rasters [{}].".format(name, ", ".join(self.raster_names)))
+
+        if name not in self.variables:
+            self.variables.append(name)
+
+        index = self.variables.index(name)
+
+        return CompiledNode(VALUES, lambda values: values[index].astype(np.float64))
+
+
+def check_args(function_name: str, args: List[CompiledNode], types: List[str], constant: bool = False) -> None:
+
+    if len(args) != len(types):
+        raise ValueError("Function `{}` expects {} arguments, got {}.".format(function_name, len(types), len(args)))
+
+    for i, (arg, arg_type) in enumerate(zip(args, types)):
+
+        if arg.result_type != arg_type:
+            raise ValueError(
+                "Argument {} of function `{}` has to be {}, not {}.".format(
+                    i + 1, function_name, arg_type, arg.result_type
+                )
+            )
+
+        if constant and not arg.constant:
+            raise ValueError("Arguments of function `{}` have to be constants.".format(function_name))
+
+
+def compile_fuzzy_number_factory(fn_type: str, count: int) -> Callable[[str, List[CompiledNode]], CompiledNode]:
+    def compile_function(function_name: str, args: List[CompiledNode]) -> CompiledNode:
+
+        check_args(function_name, args, [VALUES] * count, constant=True)
+
+        value = "{};{}".format(fn_type, "|".join(str(arg.evaluate(None)) for arg in args))
+
+        try:
+            fuzzy_number = ParameterFuzzyNumber.valueToCompiledFuzzyNumber(value)
+        except ValueError as e:
+            raise ValueError("Cannot create Fuzzy Number in function `{}`: {}".format(function_name, e))
+
+        return constant_node(FUZZY_NUMBER, fuzzy_number)
+
+    return compile_function
+
+
+def compile_get_fuzzy_number_from_db(function_name: str, args: List[CompiledNode]) -> CompiledNode:
+
+    check_args(function_name, args, [STRING], constant=True)
+
+    variable_name = args[0].evaluate(None)
+
+    fuzzy_number = FuzzyDatabase().get_fuzzy_variable(variable_name)
+
+    if fuzzy_number is None:
+        raise ValueError("Fuzzy variable `{}` does not exist in database.".format(variable_name))
+
+    return constant_node(FUZZY_NUMBER, compile_fuzzy_number(fuzzy_number))
+
+
+def compile_calculate_fuzzy_membership(function_name: str, args: List[CompiledNode]) -> CompiledNode:
+
+    check_args(function_name, args, [VALUES, FUZZY_NUMBER])
+
+    values, fuzzy_number = args
+
+    return CompiledNode(FUZZY, lambda v: fuzzy_number.evaluate(v).membership(values.evaluate(v)))
+
+
+def compile_fuzzy_membership(function_name: str, args: List[CompiledNode]) -> CompiledNode:
+
+    check_args(function_name, args, [VALUES])
+
+    return CompiledNode(FUZZY, args[0].evaluate, args[0].constant)
+
+
+def compile_membership(function_name: str, args: List[CompiledNode]) -> CompiledNode:
+
+    # shorthand `membership(raster, fuzzy_number)` for `calculate_fuzzy_membership`
+    if len(args) == 2:
+        return compile_calculate_fuzzy_membership(function_name, args)
+
+    check_args(function_name, args, [FUZZY])
+
+    return CompiledNode(VALUES, args[0].evaluate, args[0].constant)
+
+
+def compile_operation_type(
+    function_name: str, operation_type: CompiledNode, operation: Callable[[np.ndarray, np.ndarray, str], Any]
+) -> str:
+
+    operation_type = operation_type.evaluate(None)
+
+    try:
+        operation(np.zeros(1), np.zeros(1), operation_type)
+    except ValueError:
+        raise ValueError("`type` value `{}` is not allowed in function `{}`.".format(operation_type, function_name))
+
+    return operation_type
+
+
+def compile_fuzzy_operation(
+    operation: Callable[[np.ndarray, np.ndarray, str], np.ndarray],
+) -> Callable[[str, List[CompiledNode]], CompiledNode]:
+    def compile_function(function_name: str, args: List[CompiledNode]) -> CompiledNode:
+
+        check_args(function_name, args, [FUZZY, FUZZY, STRING])
+
+        a, b, operation_type = args
+
+        operation_type = compile_operation_type(function_name, operation_type, operation)
+
+        return CompiledNode(FUZZY, lambda v: operation(a.evaluate(v), b.evaluate(v), operation_type))
+
+    return compile_function
+
+
+def compile_possibilistic_operation(
+    operation: Callable[[np.ndarray, np.ndarray, np.ndarray, np.ndarray, str], Any],
+) -> Callable[[str, List[CompiledNode]], CompiledNode]:
+    def compile_function(function_name: str, args: List[CompiledNode]) -> CompiledNode:
+
+        check_args(function_name, args, [POSSIBILISTIC, POSSIBILISTIC, STRING])
+
+        a, b, operation_type = args
+
+        operation_type = compile_operation_type(function_name, operation_type, lambda x, y, t: operation(x, x, y, y, t))
+
+        return CompiledNode(POSSIBILISTIC, lambda v: operation(*a.evaluate(v), *b.evaluate(v), operation_type))
+
+    return compile_function
+
+
+def compile_possibilistic_membership(function_name: str, args: List[CompiledNode]) -> CompiledNode:
+
+    check_args(function_name, args, [VALUES, VALUES])
+
+    possibility, necessity = args
+
+    return CompiledNode(POSSIBILISTIC, lambda v: (possibility.evaluate(v), necessity.evaluate(v)))
+
+
+def compile_possibilistic_part(index: int) -> Callable[[str, List[CompiledNode]], CompiledNode]:
+    def compile_function(function_name: str, args: List[CompiledNode]) -> CompiledNode:
+
+        check_args(function_name, args, [POSSIBILISTIC])
+
+        return CompiledNode(VALUES, lambda v: args[0].evaluate(v)[index])
+
+    return compile_function
+
+
+def compile_possibilistic_comparison(exceedance: bool) -> Callable[[str, List[CompiledNode]], CompiledNode]:
+    def compile_function(function_name: str, args: List[CompiledNode]) -> CompiledNode:
+
+        if len(args) == 2 and args[0].result_type == FUZZY_NUMBER:
+            check_args(function_name, args, [FUZZY_NUMBER, VALUES])
+            fuzzy_number, values = args
+
+            if exceedance:
+                comparison = CompiledFuzzyNumber.exceedance
+            else:
+                comparison = CompiledFuzzyNumber.undervaluation
+
+        else:
+            check_args(function_name, args, [VALUES, FUZZY_NUMBER])
+            values, fuzzy_number = args
+
+            # crisp values on the left have their own indices, swapping the arguments would change necessity
+            if exceedance:
+                comparison = CompiledFuzzyNumber.crisp_exceedance
+            else:
+                comparison = CompiledFuzzyNumber.crisp_undervaluation
+
+        return CompiledNode(POSSIBILISTIC, lambda v: comparison(fuzzy_number.evaluate(v), values.evaluate(v)))
+
+    return compile_function
+
+
+FUNCTIONS: Dict[str, Callable[[str, List[CompiledNode]], CompiledNode]] = {
+    "fuzzy_number_triangular": compile_fuzzy_number_factory("triangular", 3),
+    "fuzzy_number_trapezoidal": compile_fuzzy_number_factory("trapezoidal", 4),
+    "get_fuzzy_number_from_db": compile_get_fuzzy_number_from_db,
+    "fuzzy_membership": compile_fuzzy_membership,
+    "membership": compile_membership,
+    "calculate_fuzzy_membership": compile_calculate_fuzzy_membership,
+    "fuzzy_and": compile_fuzzy_operation(fuzzy_and_array),
+    "fuzzy_or": compile_fuzzy_operation(fuzzy_or_array),
+    "possibilistic_membership": compile_possibilistic_membership,
+    "possibility": compile_possibilistic_part(0),
+    "necessity": compile_possibilistic_part(1),
+    "possibilistic_and": compile_possibilistic_operation(possibilistic_and_array),
+    "possibilistic_or": compile_possibilistic_operation(possibilistic_or_array),
+    "possibilistic_exceedance": compile_possibilistic_comparison(exceedance=True),
+    "possibilistic_undervaluation": compile_possibilistic_comparison(exceedance=False),
+}
@@ -0,0 +1,120 @@
+from typing import List, Optional
+
+import numpy as np
+from qgis.core import (
+    Qgis,
+    QgsContrastEnhancement,
+    QgsRasterBlock,
+    QgsRasterBlockFeedback,
+    QgsRasterInterface,
+    QgsRasterLayer,
+    QgsRasterNuller,
+    QgsRectangle,
+    QgsSingleBandGrayRenderer,
+)
+
+from .tile_processor import TileFunction
+from .utils import array_to_block, read_nulled_block
+
+# no data of evaluated blocks, memberships are never NaN
+RASTER_INTERFACE_NODATA = np.nan
+
+
+class TileFunctionRasterInterface(QgsRasterInterface):
+    """
+    Raster pipe interface that evaluates tile `function` (the same kernels that Processing tools use) on blocks of
+    `source_band` of its input. Only the blocks requested by the renderer, for the visible extent and resolution, are
+    evaluated. Every result of the function is one Float64 band named by `band_names`.
+    """
+
+    def __init__(
+        self,
+        function: TileFunction,
+        band_names: List[str],
+        source_band: int = 1,
+        input: Optional[QgsRasterInterface] = None,
+    ) -> None:
+
+        super().__init__(input)
+
+        self.function = function
+        self.band_names = band_names
+        self.source_band = source_band
+
+    def clone(self) -> "TileFunctionRasterInterface":
+
+        return TileFunctionRasterInterface(self.function, self.band_names, self.source_band)
+
+    def bandCount(self) -> int:
+
+        return len(self.band_names)
+
+    def dataType(self, bandNo: int) -> Qgis.DataType:
+
+        return Qgis.Float64
+
+    def generateBandName(self, bandNumber: int) -> str:
+
+        return self.band_names[bandNumber - 1]
+
+    def block(
+        self,
+        bandNo: int,
+        extent: QgsRectangle,
+        width: int,
+        height: int,
+        feedback: Optional[QgsRasterBlockFeedback] = None,
+    ) -> QgsRasterBlock:
+
+        if self.input() is None or not 0 < bandNo <= self.bandCount():
+            return QgsRasterBlock()
+
+        # no data pixels of inputs without no data value are read as sentinel values, not pixel by pixel from bitmap
+        nuller = QgsRasterNuller()
+        nuller.setInput(self.input())
+
+        source = read_nulled_block(nuller, self.source_band, extent, width, height, feedback)
+
+        if source is None:
+            return QgsRasterBlock()
+
+        values, nodata_mask = source
+
+        result = self.function([values])[bandNo - 1]
+
+        return array_to_block(np.broadcast_to(result, values.shape), nodata_mask, RASTER_INTERFACE_NODATA)
+
+
+def tile_function_raster_layer(
+    raster_layer: QgsRasterLayer,
+    function: TileFunction,
+    band_names: List[str],
+    name: str,
+    source_band: int = 1,
+) -> QgsRasterLayer:
+    """
+    New layer over the source of `raster_layer` with `TileFunctionRasterInterface` inserted into its pipe right after
+    the data provider, rendered in grays from 0 to 1. The pipe is not stored in projects, the layer is for exploration.
+    """
+
+    layer = QgsRasterLayer(raster_layer.source(), name, raster_layer.providerType())
+
+    if not layer.isValid():
+        raise ValueError("Cannot open raster `{}`.".format(raster_layer.source()))
+
+    interface = TileFunctionRasterInterface(function, band_names, source_band)
+
+    if not layer.pipe().insert(1, interface):
+        raise ValueError("Cannot insert evaluation into the raster pipe of `{}`.".format(name))
+
+    contrast_enhancement = QgsContrastEnhancement(Qgis.Float64)
+    contrast_enhancement.setMinimumValue(0)
+    contrast_enhancement.setMaximumValue(1)
+    contrast_enhancement.setContrastEnhancementAlgorithm(QgsContrastEnhancement.StretchToMinimumMaximum)
+
+    renderer = QgsSingleBandGrayRenderer(interface, 1)
+    renderer.setContrastEnhancement(contrast_enhancement)
+
+    layer.setRenderer(renderer)
+
+    return layer
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from qgis.core import QgsRasterLayer
+
+from .utils import RasterWindow, raster_file_path
+
+# suffix of journal file next to the first output
+JOURNAL_SUFFIX = ".journal"
+
+# suffix of plain GeoTIFF working copy next to every output that cannot be updated in place, incremental runs rewrite
+# tiles there and the output is recreated from it, so compressed tiles and COG layout are never updated in place
+WORKING_COPY_SUFFIX = ".incremental.tif"
+
+# seconds between commits of written windows, every commit flushes the outputs to disk
+JOURNAL_COMMIT_INTERVAL = 30.0
+
+
+def window_key(window: RasterWindow) -> Tuple[int, int, int, int]:
+    return (window.col, window.row, window.width, window.height)
+
+
+def raster_fingerprint(raster: QgsRasterLayer, file_stats: bool = True) -> Dict[str, Any]:
+    """Identification of raster source and grid, file based rasters also by size and modification time of the file."""
+
+    fingerprint: Dict[str, Any] = {
+        "source": raster.source(),
+        "crs": raster.crs().toWkt(),
+        "extent": raster.extent().asWktPolygon(),
+        "width": raster.width(),
+        "height": raster.height(),
+    }
+
+    path = raster_file_path(raster)
+
+    if file_stats and path and os.path.exists(path):
+        stat = os.stat(path)
+        fingerprint.update({"size": stat.st_size, "modified": stat.st_mtime_ns})
+
+    return fingerprint
+
+
+def fingerprint(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def tile_hash(values: List[np.ndarray]) -> str:
+    """Content hash of values of all inputs of one tile."""
+
+    tile_hasher = hashlib.blake2b(digest_size=16)
+
+    for part_values in values:
+        tile_hasher.update("{}{}".format(part_values.dtype.str, part_values.shape).encode("utf-8"))
+        tile_hasher.update(np.ascontiguousarray(part_values).tobytes())
+
+    return tile_hasher.hexdigest()
+
+
+class TileJournal:
+    """
+    Sidecar journal of tile windows written into outputs, stored as JSON lines in `<first output>.journal`. The first
+    line holds fingerprint of inputs and parameters and tile size of the run, every other line one written window.
+    Windows are committed to the journal only after the outputs were flushed, so the journal never lists a window that
+    is not on disk.
+
+    Journal of `incremental` run stores also content hash of inputs of every window and is kept after the run, the next
+    run then rewrites only windows whose inputs changed. Tiles are rewritten directly in the outputs if `in_place`,
+    otherwise in their working copies.
+    """
+
+    def __init__(
+        self,
+        output_paths: List[str],
+        fingerprint: str,
+        commit_interval: float = JOURNAL_COMMIT_INTERVAL,
+        incremental: bool = False,
+        in_place: bool = False,
+    ):
+
+        self.output_paths = output_paths
+        self.path = output_paths[0] + JOURNAL_SUFFIX
+        self.fingerprint = fingerprint
+        self.commit_interval = commit_interval
+        self.incremental = incremental
+        self.in_place = in_place
+
+        # written windows with hashes of their inputs
+        self.completed: Dict[Tuple[int, int, int, int], Optional[str]] = {}
+        self.pending: List[Tuple[Tuple[int, int, int, int], Optional[str]]] = []
+        self.last_commit = time.monotonic()
+
+        # windows of this run that were written and that were not rewritten, because their inputs did not change
+        self.written_count = 0
+        self.unchanged_count = 0
+
+        # windows are keyed by their position and size, so resumed run has to use tiles of the same size
+        self.tile_size: Optional[Tuple[int, int]] = None
+
+        self.resumed = self.load()
+
+        if not self.resumed:
+            self.start()
+
+    def load(self) -> bool:
+        """Loads completed windows, if journal with the same fingerprint exists together with all the outputs."""
+
+        if not os.path.exists(self.path) or not all(
+            os.path.exists(self.raster_path(path)) for path in self.output_paths
+        ):
+            return False
+
+        with open(self.path, encoding="utf-8") as file:
+
+            try:
+                header = json.loads(file.readline())
+            except ValueError:
+                return False
+
+            if not isinstance(header, dict) or header.get("fingerprint") != self.fingerprint:
+                return False
+
+            if header.get("tile_size"):
+                self.tile_size = tuple(header["tile_size"])
+
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                    self.completed[tuple(entry["window"])] = entry.get("hash")
+                except (ValueError, KeyError, TypeError):
+                    # last line can be incomplete if the process died while writing it
+                    break
+
+        return True
+
+    def raster_path(self, output_path: str) -> str:
+        """Raster that tiles of `output_path` are written into, its working copy in incremental run not in place."""
+
+        if self.incremental and not self.in_place:
+            return output_path + WORKING_COPY_SUFFIX
+
+        return output_path
+
+    def start(self) -> None:
+
+        self.completed.clear()
+
+        self.write_entries({})
+
+    def record_tile_size(self, tile_size: Tuple[int, int]) -> None:
+        """Stores `tile_size` of the run in the header, resumed run reuses it."""
+
+        if self.tile_size != tuple(tile_size):
+            self.tile_size = tuple(tile_size)
+            self.write_entries(self.completed)
+
+    def write_entries(self, entries: Dict[Tuple[int, int, int, int], Optional[str]]) -> None:
+        """Replaces the journal by header and `entries`."""
+
+        temp_path = self.path + ".tmp"
+
+        header: Dict[str, Any] = {"fingerprint": self.fingerprint}
+
+        if self.tile_size is not None:
+            header["tile_size"] = self.tile_size
+
+        with open(temp_path, "w", encoding="utf-8") as file:
+            file.write(json.dumps(header) + "\n")
+
+            for key, key_hash in entries.items():
+                file.write(self.entry_line(key, key_hash))
+
+        os.replace(temp_path, self.path)
+
+    @staticmethod
+    def entry_line(key: Tuple[int, int, int, int], key_hash: Optional[str]) -> str:
+
+        entry: Dict[str, Any] = {"window": key}
+
+        if key_hash is not None:
+            entry["hash"] = key_hash
+
+        return json.dumps(entry) + "\n"
+
+    def remaining(self, windows: List[RasterWindow]) -> List[RasterWindow]:
+
+        # in incremental run all windows are read, unchanged ones are skipped by their hash
+        if self.incremental:
+            return windows
+
+        return [window for window in windows if window_key(window) not in self.completed]
+
+    def hash_of(self, window: RasterWindow) -> Optional[str]:
+        return self.completed.get(window_key(window))
+
+    def unchanged(self, window: RasterWindow, window_hash: Optional[str]) -> bool:
+        return self.incremental and window_hash is not None and self.hash_of(window) == window_hash
+
+    def add(self, window: RasterWindow, window_hash: Optional[str] = None) -> None:
+        self.pending.append((window_key(window), window_hash))
+        self.written_count += 1
+
+    @property
+    def changed(self) -> bool:
+        """Outputs were written in this run, resumed incremental run with unchanged inputs writes nothing."""
+
+        return not (self.incremental and self.resumed) or self.written_count > 0
+
+    def commit_due(self) -> bool:
+        return bool(self.pending) and time.monotonic() - self.last_commit >= self.commit_interval
+
+    def commit(self) -> None:
+        """Has to be called after the outputs were flushed."""
+
+        if self.pending:
+            with open(self.path, "a", encoding="utf-8") as file:
+                for key, key_hash in self.pending:
+                    file.write(self.entry_line(key, key_hash))
+
+                file.flush()
+                os.fsync(file.fileno())
+
+            self.completed.update(self.pending)
+            self.pending.clear()
+
+        self.last_commit = time.monotonic()
+
+    def finish(self) -> None:
+        """After complete run journal of incremental run is compacted to one line per window, otherwise removed."""
+
+        if self.incremental:
+            self.write_entries(self.completed)
+        else:
+            self.remove()
+
+    def remove(self) -> None:
+
+        if os.path.exists(self.path):
+            os.remove(self.path)
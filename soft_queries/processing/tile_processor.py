@@ -0,0 +1,288 @@
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, List, Optional, Tuple
+
+import numpy as np
+from qgis.core import QgsProcessingFeedback, QgsRasterDataProvider
+
+from .area_of_interest import AreaOfInterest
+from .fuzzy_arrays import CompiledFuzzyNumber
+from .tile_journal import TileJournal, tile_hash
+from .tile_statistics import TileStatistics
+from .utils import (
+    OUTPUT_DATA_TYPES,
+    TILES_IN_FLIGHT_PER_THREAD,
+    OutputDataType,
+    RasterPart,
+    RasterWindow,
+    array_nodata_mask,
+    array_to_block,
+    flush_raster_provider,
+    writeBlock,
+)
+
+TileFunction = Callable[[List[np.ndarray]], List[np.ndarray]]
+
+
+class LookupTableFunction:
+    """
+    Tile function of a single integer input evaluated by `function` once for every value from `value_min` to
+    `value_max`, tiles are then mapped through the precomputed tables. Values outside of the range (or non integer
+    values) are evaluated by `function` directly.
+    """
+
+    def __init__(self, function: TileFunction, value_min: int, value_max: int) -> None:
+
+        self.function = function
+        self.value_min = int(value_min)
+        self.value_max = int(value_max)
+
+        self.tables = function([np.arange(self.value_min, self.value_max + 1, dtype=np.float64)])
+
+    def __call__(self, values: List[np.ndarray]) -> List[np.ndarray]:
+
+        tile_values = values[0]
+
+        if tile_values.dtype.kind not in "iu":
+            return self.function(values)
+
+        indices = tile_values.astype(np.int64) - self.value_min
+
+        inside = (0 <= indices) & (indices <= self.value_max - self.value_min)
+
+        results = [table[np.where(inside, indices, 0)] for table in self.tables]
+
+        if not inside.all():
+            outside_results = self.function([tile_values[~inside]])
+
+            for result, outside_result in zip(results, outside_results):
+                result[~inside] = outside_result
+
+        return results
+
+
+class ConstantTileFunction:
+    """
+    Tile function of a single input that depends on values only through `fuzzy_number`. Tiles whose valid values all
+    lie where the fuzzy number is constant (below or above its support, or inside its kernel) are filled with the
+    result for one of the values, without per pixel evaluation.
+    """
+
+    def __init__(self, function: TileFunction, fuzzy_number: CompiledFuzzyNumber, nodata_value: float) -> None:
+
+        self.function = function
+        self.fuzzy_number = fuzzy_number
+        self.nodata_value = nodata_value
+
+    def __call__(self, values: List[np.ndarray]) -> List[np.ndarray]:
+
+        tile_values = values[0]
+
+        valid = ~array_nodata_mask(tile_values, self.nodata_value)
+
+        if not valid.any():
+            # only no data, results are masked
+            return [np.zeros(tile_values.shape) for _ in self.function([tile_values[:0]])]
+
+        # reduced over valid values only, infinite initial values cannot be cast to integer types
+        valid_values = tile_values[valid]
+
+        value_min = valid_values.min()
+        value_max = valid_values.max()
+
+        if not self.fuzzy_number.constant_between(float(value_min), float(value_max)):
+            return self.function(values)
+
+        results = self.function([np.array([value_min], dtype=np.float64)])
+
+        return [np.full(tile_values.shape, result[0], dtype=np.float64) for result in results]
+
+
+class TileProcessor:
+    """
+    Reads the same window from all `inputs`, evaluates `function` on their values and writes results to `outputs`.
+
+    Tiles are computed on a pool of `threads` threads, but written strictly in the order of `windows` by the calling
+    thread, so the outputs are identical to serial processing. Results are stored as `output_data_type`, `nodata_value`
+    has to be a valid no data value of that type. Results are written into `output_bands` of `outputs` if specified,
+    otherwise into `raster_band`. Every output receives the result at its index in `output_results`, if specified, so
+    one result can be written into several outputs. Written windows are recorded into `journal`, if specified, windows
+    of incremental journal whose input values did not change are not computed nor written. Pixels outside of the mask
+    of `area_of_interest` are written as no data, shifted into cropped outputs. Time spent reading, computing and
+    writing tiles is collected in `statistics`.
+    """
+
+    def __init__(
+        self,
+        inputs: List[RasterPart],
+        outputs: List[QgsRasterDataProvider],
+        function: TileFunction,
+        nodata_value: float,
+        threads: int = 1,
+        raster_band: int = 1,
+        output_data_type: OutputDataType = OUTPUT_DATA_TYPES[0],
+        output_bands: Optional[List[int]] = None,
+        journal: Optional[TileJournal] = None,
+        area_of_interest: Optional[AreaOfInterest] = None,
+        output_results: Optional[List[int]] = None,
+    ) -> None:
+
+        self.inputs = inputs
+        self.outputs = outputs
+        self.function = function
+        self.nodata_value = nodata_value
+        self.threads = max(1, threads)
+        self.raster_band = raster_band
+        self.output_data_type = output_data_type
+        self.output_bands = output_bands or [raster_band] * len(outputs)
+        self.journal = journal
+        self.area_of_interest = area_of_interest
+        self.output_results = output_results or list(range(len(outputs)))
+        self.statistics = TileStatistics(self.threads)
+
+    def compute(self, window: RasterWindow) -> Tuple[Optional[List[np.ndarray]], np.ndarray, Optional[str]]:
+        """Results are None if journal of incremental run has the window written from the same input values."""
+
+        read_start = time.perf_counter()
+
+        values = []
+        nodata_mask = np.zeros((window.height, window.width), dtype=bool)
+
+        for raster_part in self.inputs:
+            part_values, part_mask = raster_part.read(window)
+
+            values.append(part_values)
+            nodata_mask |= part_mask
+
+        compute_start = time.perf_counter()
+
+        window_hash = None
+        results = None
+
+        if self.journal is not None and self.journal.incremental:
+            window_hash = tile_hash(values)
+
+        if window_hash is None or not self.journal.unchanged(window, window_hash):
+            results = self.function(values)
+
+        self.statistics.add_compute(compute_start - read_start, time.perf_counter() - compute_start)
+
+        return results, nodata_mask, window_hash
+
+    def write(
+        self,
+        window: RasterWindow,
+        results: Optional[List[np.ndarray]],
+        nodata_mask: np.ndarray,
+        window_hash: Optional[str] = None,
+    ) -> None:
+
+        if results is None:
+            self.journal.unchanged_count += 1
+            self.statistics.add_write(window, 0.0, written=False)
+            return
+
+        write_start = time.perf_counter()
+
+        output_window = window
+
+        if self.area_of_interest is not None:
+            outside_mask = self.area_of_interest.outside_mask(window)
+
+            if outside_mask is not None:
+                nodata_mask = nodata_mask | outside_mask
+
+            output_window = self.area_of_interest.output_window_of(window)
+
+        for output, output_band, result_index in zip(self.outputs, self.output_bands, self.output_results):
+            result = results[result_index]
+
+            raster_block = array_to_block(
+                self.output_data_type.encode(result, nodata_mask),
+                nodata_mask,
+                self.nodata_value,
+                self.output_data_type.data_type,
+            )
+
+            writeBlock(output, raster_block, output_window, output_band)
+
+        if self.journal is not None:
+            self.journal.add(window, window_hash)
+
+            if self.journal.commit_due():
+                self.checkpoint()
+
+        self.statistics.add_write(window, time.perf_counter() - write_start)
+
+    def checkpoint(self) -> None:
+        """Flushes the outputs and commits windows written since the last checkpoint into the journal."""
+
+        if self.journal is None:
+            return
+
+        # multiband outputs repeat the same data provider
+        for output in {id(output): output for output in self.outputs}.values():
+            flush_raster_provider(output)
+
+        self.journal.commit()
+
+    def run(self, windows: List[RasterWindow], feedback: QgsProcessingFeedback) -> bool:
+        """Processes `windows`, returns False if canceled."""
+
+        self.statistics.start()
+
+        try:
+            return self.process_windows(windows, feedback)
+        finally:
+            self.statistics.stop()
+
+    def process_windows(self, windows: List[RasterWindow], feedback: QgsProcessingFeedback) -> bool:
+
+        total = sum(window.size for window in windows)
+        processed = 0
+
+        if self.threads == 1:
+            for window in windows:
+                if feedback.isCanceled():
+                    return False
+
+                self.write(window, *self.compute(window))
+
+                processed += window.size
+                feedback.setProgress(int(100.0 * processed / total) if total else 0)
+
+            return True
+
+        # number of tiles in flight is bounded, so memory does not grow with the raster size
+        pending: Deque[Tuple[RasterWindow, Future]] = deque()
+        windows_iter = iter(windows)
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+
+            def submit_next() -> None:
+                window = next(windows_iter, None)
+
+                if window is not None:
+                    pending.append((window, executor.submit(self.compute, window)))
+
+            for _ in range(TILES_IN_FLIGHT_PER_THREAD * self.threads):
+                submit_next()
+
+            while pending:
+                if feedback.isCanceled():
+                    for _, future in pending:
+                        future.cancel()
+
+                    return False
+
+                window, future = pending.popleft()
+
+                self.write(window, *future.result())
+
+                submit_next()
+
+                processed += window.size
+                feedback.setProgress(int(100.0 * processed / total) if total else 0)
+
+        return True
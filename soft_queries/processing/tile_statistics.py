@@ -0,0 +1,99 @@
+import json
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .utils import RasterWindow
+
+
+class TileStatistics:
+    """
+    Time spent reading, computing and writing tiles during a run of tile processor. Reading and computing runs in
+    parallel, so their times are summed over all threads (or processes) and can exceed the wall time of the run.
+    Writing happens in a single thread and includes flushing of outputs at journal checkpoints.
+    """
+
+    def __init__(self, threads: int = 1) -> None:
+
+        self.threads = threads
+
+        self.tiles = 0
+        self.unchanged_tiles = 0
+        self.pixels = 0
+
+        self.read_time = 0.0
+        self.compute_time = 0.0
+        self.write_time = 0.0
+        self.wall_time = 0.0
+
+        self.started: Optional[float] = None
+        self.lock = threading.Lock()
+
+    def start(self) -> None:
+        self.started = time.perf_counter()
+
+    def stop(self) -> None:
+
+        if self.started is not None:
+            self.wall_time += time.perf_counter() - self.started
+            self.started = None
+
+    def add_compute(self, read_time: float, compute_time: float) -> None:
+
+        with self.lock:
+            self.read_time += read_time
+            self.compute_time += compute_time
+
+    def add_write(self, window: RasterWindow, write_time: float, written: bool = True) -> None:
+
+        with self.lock:
+            self.tiles += 1
+            self.pixels += window.size
+            self.write_time += write_time
+
+            if not written:
+                self.unchanged_tiles += 1
+
+    @property
+    def pixels_per_second(self) -> float:
+        return self.pixels / self.wall_time if self.wall_time > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+
+        return {
+            "tiles": self.tiles,
+            "unchanged_tiles": self.unchanged_tiles,
+            "pixels": self.pixels,
+            "threads": self.threads,
+            "wall_time": round(self.wall_time, 6),
+            "read_time": round(self.read_time, 6),
+            "compute_time": round(self.compute_time, 6),
+            "write_time": round(self.write_time, 6),
+            "pixels_per_second": round(self.pixels_per_second, 1),
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict())
+
+    def summary(self) -> List[str]:
+
+        total_time = self.read_time + self.compute_time + self.write_time
+
+        def share(part_time: float) -> float:
+            return 100.0 * part_time / total_time if total_time > 0 else 0.0
+
+        return [
+            "Processed {} tiles ({} pixels) in {:.3f} s, {:.0f} pixels/s.".format(
+                self.tiles, self.pixels, self.wall_time, self.pixels_per_second
+            ),
+            "Reading {:.3f} s ({:.0f} %), computing {:.3f} s ({:.0f} %), writing {:.3f} s ({:.0f} %), "
+            "reading and computing summed over {} threads.".format(
+                self.read_time,
+                share(self.read_time),
+                self.compute_time,
+                share(self.compute_time),
+                self.write_time,
+                share(self.write_time),
+                self.threads,
+            ),
+        ]
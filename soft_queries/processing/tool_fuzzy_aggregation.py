@@ -0,0 +1,219 @@
+from functools import partial
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+from qgis.core import (
+    QgsProcessing,
+    QgsProcessingFeedback,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterMultipleLayers,
+    QgsProcessingParameterRasterDestination,
+    QgsProcessingParameterString,
+)
+
+from .fuzzy_arrays import fuzzy_and_arrays, fuzzy_or_arrays
+from .raster_algorithm import SoftQueriesRasterAlgorithm
+from .tile_processor import TileProcessor
+from .utils import (
+    RasterPart,
+    parse_weights,
+    verify_crs_equal,
+    verify_extent_equal,
+    verify_one_band,
+    verify_size_equal,
+)
+
+
+def fuzzy_aggregation_tile(
+    operation: Callable[[Sequence[np.ndarray], str, Optional[Sequence[float]]], np.ndarray],
+    operation_type: str,
+    weights: Optional[List[float]],
+    values: List[np.ndarray],
+) -> List[np.ndarray]:
+    return [operation([part_values.astype(np.float64) for part_values in values], operation_type, weights)]
+
+
+class FuzzyAggregationAlgorithm(SoftQueriesRasterAlgorithm):
+    FUZZY_RASTERS = "FUZZY_RASTERS"
+    WEIGHTS = "WEIGHTS"
+    OPERATION = "OPERATION"
+    OPERATION_TYPE = "OPERATION_TYPE"
+
+    OUTPUT_FUZZY_MEMBERSHIP = "OUTPUT_FUZZY_MEMBERSHIP"
+
+    operations_enum = ["And", "Or"]
+
+    operations = {"And": fuzzy_and_arrays, "Or": fuzzy_or_arrays}
+
+    operations_types_enum = [
+        "min/max",
+        "product",
+        "drastic",
+        "Lukasiewicz",
+        "Nilpotent",
+        "Hamacher",
+    ]
+
+    def name(self):
+        return "fuzzyaggregation"
+
+    def displayName(self):
+        return "Fuzzy Aggregation"
+
+    def createInstance(self):
+        return FuzzyAggregationAlgorithm()
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(
+            QgsProcessingParameterMultipleLayers(self.FUZZY_RASTERS, "Raster Layers", QgsProcessing.TypeRaster)
+        )
+
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.OPERATION,
+                "Operation to use",
+                self.operations_enum,
+                defaultValue=self.operations_enum[0],
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.OPERATION_TYPE,
+                "Operation type",
+                self.operations_types_enum,
+                defaultValue=self.operations_types_enum[0],
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.WEIGHTS,
+                "Weights of raster layers (separated by comma, from [0, 1])",
+                optional=True,
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterDestination(
+                self.OUTPUT_FUZZY_MEMBERSHIP, "Output raster layer - fuzzy membership"
+            )
+        )
+
+        self.addAreaOfInterestParameters()
+        self.addRasterProcessingParameters()
+
+    def checkParameterValues(self, parameters, context):
+        rasters = self.parameterAsLayerList(parameters, self.FUZZY_RASTERS, context)
+
+        if len(rasters) < 2:
+            msg = "At least two input rasters are required."
+
+            return False, msg
+
+        if not verify_one_band(rasters):
+            msg = "Input rasters can have only one band. One of them has other band number."
+
+            return False, msg
+
+        if not verify_crs_equal(rasters):
+            msg = "CRS of input rasters have to be equal. Right now they are not."
+
+            return False, msg
+
+        if not verify_size_equal(rasters):
+            msg = "Sizes of input rasters have to be equal. Right now they are not."
+
+            return False, msg
+
+        if not verify_extent_equal(rasters):
+            msg = "Extents of input rasters have to be equal. Right now they are not."
+
+            return False, msg
+
+        try:
+            parse_weights(self.parameterAsString(parameters, self.WEIGHTS, context), len(rasters))
+        except ValueError as e:
+            return False, str(e)
+
+        return super().checkParameterValues(parameters, context)
+
+    def processAlgorithm(self, parameters, context, feedback: QgsProcessingFeedback):
+        raster_band = 1
+
+        operation_name = self.parameterAsEnumString(parameters, self.OPERATION, context)
+        operation = self.operations[operation_name]
+
+        operation_type = self.parameterAsEnumString(parameters, self.OPERATION_TYPE, context)
+
+        if "/" in operation_type:
+            if operation == self.operations["And"]:
+                operation_type = operation_type.split("/")[0]
+            else:
+                operation_type = operation_type.split("/")[1]
+
+        fuzzy_input_rasters = self.parameterAsLayerList(parameters, self.FUZZY_RASTERS, context)
+
+        weights = parse_weights(self.parameterAsString(parameters, self.WEIGHTS, context), len(fuzzy_input_rasters))
+
+        feedback.pushInfo(
+            "Processing operation `{}` with type of operation `{}` on {} rasters.".format(
+                operation_name, operation_type, len(fuzzy_input_rasters)
+            )
+        )
+
+        fuzzy_input_raster_1 = fuzzy_input_rasters[0]
+
+        fuzzy_input_nodata = fuzzy_input_raster_1.dataProvider().sourceNoDataValue(raster_band)
+
+        output_data_type = self.parameterAsOutputDataType(parameters, context)
+
+        output_options = self.parameterAsRasterOutputOptions(parameters, context)
+
+        creation_options = output_options.creation_options(output_data_type.data_type)
+
+        output_nodata = output_data_type.nodata_value(fuzzy_input_nodata)
+
+        path_fuzzy_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_FUZZY_MEMBERSHIP, context)
+
+        area_of_interest = self.parameterAsAreaOfInterest(parameters, context, fuzzy_input_raster_1)
+
+        output_fuzzy_raster_dp = self.createOutputRaster(
+            path_fuzzy_raster,
+            fuzzy_input_raster_1,
+            output_data_type,
+            creation_options,
+            output_nodata,
+            output_window=area_of_interest.output_window,
+        )
+
+        windows, threads = self.parameterAsTilePlan(
+            parameters,
+            context,
+            fuzzy_input_raster_1,
+            streams=len(fuzzy_input_rasters) + 1,
+            feedback=feedback,
+            area_of_interest=area_of_interest,
+        )
+
+        processor = TileProcessor(
+            [RasterPart(fuzzy_input_raster, raster_band, threads) for fuzzy_input_raster in fuzzy_input_rasters],
+            [output_fuzzy_raster_dp],
+            partial(fuzzy_aggregation_tile, operation, operation_type, weights),
+            output_nodata,
+            threads,
+            output_data_type=output_data_type,
+            area_of_interest=area_of_interest,
+        )
+
+        completed = processor.run(windows, feedback)
+
+        statistics = self.reportTileStatistics(processor.statistics, feedback)
+
+        del processor, output_fuzzy_raster_dp
+
+        # partial output of canceled run is not finalized
+        if completed:
+            self.finalizeOutputRaster(path_fuzzy_raster, output_data_type, output_options)
+
+        return {self.OUTPUT_FUZZY_MEMBERSHIP: path_fuzzy_raster, self.OUTPUT_STATISTICS: statistics}
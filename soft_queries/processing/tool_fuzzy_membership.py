@@ -1,16 +1,25 @@
+from functools import partial
+from typing import List
+
+import numpy as np
 from qgis.core import (
-    QgsProcessingAlgorithm,
-    QgsProcessingException,
     QgsProcessingFeedback,
     QgsProcessingParameterRasterDestination,
     QgsProcessingParameterRasterLayer,
 )
 
+from .fuzzy_arrays import CompiledFuzzyNumber
 from .parameter_fuzzy_number import ParameterFuzzyNumber
-from .utils import RasterPart, create_raster, create_raster_writer, verify_one_band, writeBlock
+from .raster_algorithm import SoftQueriesRasterAlgorithm
+from .tile_processor import ConstantTileFunction, LookupTableFunction
+from .utils import RasterPart, integer_value_range, verify_one_band
+
+
+def fuzzy_membership_tile(fuzzy_number: CompiledFuzzyNumber, values: List[np.ndarray]) -> List[np.ndarray]:
+    return [fuzzy_number.membership(values[0])]
 
 
-class FuzzyMembershipAlgorithm(QgsProcessingAlgorithm):
+class FuzzyMembershipAlgorithm(SoftQueriesRasterAlgorithm):
 
     FUZZYNUMBER = "FUZZY_NUMBER"
     RASTER = "RASTER"
@@ -37,6 +46,11 @@ class FuzzyMembershipAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
+        self.addAreaOfInterestParameters()
+        self.addRasterProcessingParameters()
+        self.addBackendParameter()
+        self.addTileJournalParameters()
+
     def checkParameterValues(self, parameters, context):
 
         input_raster = self.parameterAsRasterLayer(parameters, self.RASTER, context)
@@ -55,7 +69,7 @@ class FuzzyMembershipAlgorithm(QgsProcessingAlgorithm):
 
         raster_band = 1
 
-        fuzzy_number = ParameterFuzzyNumber.valueToFuzzyNumber(parameters[self.FUZZYNUMBER])
+        fuzzy_number = ParameterFuzzyNumber.valueToCompiledFuzzyNumber(parameters[self.FUZZYNUMBER])
 
         input_raster = self.parameterAsRasterLayer(parameters, self.RASTER, context)
 
@@ -63,53 +77,76 @@ class FuzzyMembershipAlgorithm(QgsProcessingAlgorithm):
 
         input_raster_nodata = input_raster_dp.sourceNoDataValue(raster_band)
 
-        path_fuzzy_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_FUZZY_MEMBERSHIP, context)
-
-        fuzzy_raster_writer = create_raster_writer(path_fuzzy_raster)
+        output_data_type = self.parameterAsOutputDataType(parameters, context)
 
-        fuzzy_raster_dp = create_raster(fuzzy_raster_writer, input_raster)
+        output_options = self.parameterAsRasterOutputOptions(parameters, context)
 
-        if not fuzzy_raster_dp:
-            raise QgsProcessingException("Data provider for fuzzy raster not created.")
+        creation_options = output_options.creation_options(output_data_type.data_type)
 
-        if not fuzzy_raster_dp.isValid():
-            raise QgsProcessingException("Data provider for fuzzy raster not valid.")
+        output_nodata = output_data_type.nodata_value(input_raster_nodata)
 
-        fuzzy_raster_dp.setNoDataValue(raster_band, input_raster_nodata)
+        path_fuzzy_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_FUZZY_MEMBERSHIP, context)
 
-        total = 100.0 / (input_raster.height()) if input_raster.height() else 0
+        area_of_interest = self.parameterAsAreaOfInterest(parameters, context, input_raster)
 
-        r_input_data = RasterPart(input_raster, raster_band)
+        journal = self.parameterAsTileJournal(parameters, context, [path_fuzzy_raster], [input_raster])
 
-        new_block = r_input_data.create_empty_block()
+        fuzzy_raster_dp = self.createOutputRaster(
+            path_fuzzy_raster,
+            input_raster,
+            output_data_type,
+            creation_options,
+            output_nodata,
+            journal,
+            area_of_interest.output_window,
+        )
 
-        count = 0
+        windows, threads = self.parameterAsTilePlan(
+            parameters,
+            context,
+            input_raster,
+            streams=2,
+            feedback=feedback,
+            area_of_interest=area_of_interest,
+            journal=journal,
+        )
 
-        while r_input_data.correct:
+        windows = self.journalRasterWindows(journal, windows, feedback)
 
-            if feedback.isCanceled():
-                break
+        tile_function = partial(fuzzy_membership_tile, fuzzy_number)
 
-            for i in range(r_input_data.data_range):
+        value_range = integer_value_range(input_raster, raster_band)
 
-                if r_input_data.isNoData(i):
+        if value_range:
+            feedback.pushInfo("Using lookup table for integer values from {} to {}.".format(*value_range))
 
-                    new_block.setIsNoData(i)
+            tile_function = LookupTableFunction(tile_function, *value_range)
 
-                else:
+        else:
+            tile_function = ConstantTileFunction(tile_function, fuzzy_number, input_raster_nodata)
 
-                    new_block.setValue(i, fuzzy_number.membership(r_input_data.value(i)).membership)
+        tile_processor_class = self.parameterAsTileProcessorClass(parameters, context)
 
-            writeBlock(fuzzy_raster_dp, new_block, r_input_data)
+        processor = tile_processor_class(
+            [RasterPart(input_raster, raster_band, threads)],
+            [fuzzy_raster_dp],
+            tile_function,
+            output_nodata,
+            threads,
+            output_data_type=output_data_type,
+            area_of_interest=area_of_interest,
+            journal=journal,
+        )
 
-            r_input_data.nextData()
+        completed = processor.run(windows, feedback)
 
-            if r_input_data.correct:
+        processor.checkpoint()
 
-                new_block = r_input_data.create_empty_block()
+        statistics = self.reportTileStatistics(processor.statistics, feedback)
 
-            feedback.setProgress(int(count * total))
+        del processor, fuzzy_raster_dp
 
-            count += 1
+        if self.finishTileJournal(journal, completed, feedback):
+            self.finalizeOutputRaster(path_fuzzy_raster, output_data_type, output_options, journal)
 
-        return {self.OUTPUT_FUZZY_MEMBERSHIP: path_fuzzy_raster}
+        return {self.OUTPUT_FUZZY_MEMBERSHIP: path_fuzzy_raster, self.OUTPUT_STATISTICS: statistics}
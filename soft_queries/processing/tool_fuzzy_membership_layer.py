@@ -0,0 +1,119 @@
+from functools import partial
+
+from qgis.core import (
+    QgsProcessingAlgorithm,
+    QgsProcessingContext,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProcessingOutputRasterLayer,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterRasterLayer,
+    QgsProcessingParameterString,
+)
+
+from .parameter_fuzzy_number import ParameterFuzzyNumber
+from .raster_interface import tile_function_raster_layer
+from .tile_processor import LookupTableFunction
+from .tool_fuzzy_membership import fuzzy_membership_tile
+from .tool_possibilistic_membership import PossibilisticMembershipAlgorithm, possibilistic_membership_tile
+from .utils import integer_value_range, verify_one_band
+
+
+class FuzzyMembershipLayerAlgorithm(QgsProcessingAlgorithm):
+
+    FUZZYNUMBER = "FUZZY_NUMBER"
+    RASTER = "RASTER"
+    OPERATION = "OPERATION"
+    LAYER_NAME = "LAYER_NAME"
+    OUTPUT = "OUTPUT"
+
+    operation_enum = [
+        "Fuzzy membership",
+        "Raster values exceeds Fuzzy Number",
+        "Raster values undervaluates Fuzzy Number",
+    ]
+
+    def name(self):
+        return "fuzzymembershiplayer"
+
+    def displayName(self):
+        return "Fuzzy Membership (On-the-fly Layer)"
+
+    def createInstance(self):
+        return FuzzyMembershipLayerAlgorithm()
+
+    def flags(self):
+        # layer with custom pipe has to be created in the main thread
+        return super().flags() | QgsProcessingAlgorithm.FlagNoThreading
+
+    def initAlgorithm(self, config=None):
+
+        self.addParameter(ParameterFuzzyNumber(self.FUZZYNUMBER, "Fuzzy Number"))
+
+        self.addParameter(QgsProcessingParameterRasterLayer(self.RASTER, "Raster layer"))
+
+        self.addParameter(
+            QgsProcessingParameterEnum(self.OPERATION, "Operation to use", self.operation_enum, defaultValue=0)
+        )
+
+        self.addParameter(QgsProcessingParameterString(self.LAYER_NAME, "Layer name", optional=True))
+
+        self.addOutput(QgsProcessingOutputRasterLayer(self.OUTPUT, "On-the-fly layer"))
+
+    def checkParameterValues(self, parameters, context):
+
+        input_raster = self.parameterAsRasterLayer(parameters, self.RASTER, context)
+
+        rasters = [input_raster]
+
+        if not verify_one_band(rasters):
+
+            msg = "Input raster can have only one band."
+
+            return False, msg
+
+        return super().checkParameterValues(parameters, context)
+
+    def processAlgorithm(self, parameters, context: QgsProcessingContext, feedback: QgsProcessingFeedback):
+
+        raster_band = 1
+
+        fuzzy_number = ParameterFuzzyNumber.valueToCompiledFuzzyNumber(parameters[self.FUZZYNUMBER])
+
+        operation = self.parameterAsEnum(parameters, self.OPERATION, context)
+
+        input_raster = self.parameterAsRasterLayer(parameters, self.RASTER, context)
+
+        if operation == 0:
+            tile_function = partial(fuzzy_membership_tile, fuzzy_number)
+            band_names = ["Fuzzy membership"]
+
+        else:
+            operation_function = PossibilisticMembershipAlgorithm.functions_operation_enum[operation - 1]
+            tile_function = partial(possibilistic_membership_tile, operation_function, fuzzy_number)
+            band_names = ["Possibility", "Necessity"]
+
+        value_range = integer_value_range(input_raster, raster_band)
+
+        if value_range:
+            feedback.pushInfo("Using lookup table for integer values from {} to {}.".format(*value_range))
+
+            tile_function = LookupTableFunction(tile_function, *value_range)
+
+        layer_name = self.parameterAsString(parameters, self.LAYER_NAME, context)
+
+        if not layer_name:
+            layer_name = "{} - {}".format(input_raster.name(), self.operation_enum[operation])
+
+        try:
+            layer = tile_function_raster_layer(input_raster, tile_function, band_names, layer_name, raster_band)
+        except ValueError as e:
+            raise QgsProcessingException(str(e))
+
+        context.temporaryLayerStore().addMapLayer(layer)
+
+        context.addLayerToLoadOnCompletion(
+            layer.id(), QgsProcessingContext.LayerDetails(layer_name, context.project(), self.OUTPUT)
+        )
+
+        return {self.OUTPUT: layer.id()}
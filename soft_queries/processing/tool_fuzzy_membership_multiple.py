@@ -0,0 +1,229 @@
+from functools import partial
+from typing import List, Tuple
+
+import numpy as np
+from qgis.core import (
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProcessingParameterRasterDestination,
+    QgsProcessingParameterRasterLayer,
+    QgsProcessingParameterString,
+)
+
+from ..database.class_db import FuzzyDatabase
+from .fuzzy_arrays import CompiledFuzzyNumber, compile_fuzzy_number
+from .parameter_fuzzy_number import ParameterFuzzyNumber
+from .raster_algorithm import SoftQueriesRasterAlgorithm
+from .tile_processor import LookupTableFunction
+from .utils import (
+    RasterPart,
+    integer_value_range,
+    set_raster_band_descriptions,
+    verify_one_band,
+)
+
+
+def fuzzy_membership_multiple_tile(
+    fuzzy_numbers: List[CompiledFuzzyNumber], values: List[np.ndarray]
+) -> List[np.ndarray]:
+    return [fuzzy_number.membership(values[0]) for fuzzy_number in fuzzy_numbers]
+
+
+class FuzzyMembershipMultipleAlgorithm(SoftQueriesRasterAlgorithm):
+
+    FUZZY_NUMBERS = "FUZZY_NUMBERS"
+    FUZZY_VARIABLES = "FUZZY_VARIABLES"
+    RASTER = "RASTER"
+    OUTPUT_FUZZY_MEMBERSHIPS = "OUTPUT_FUZZY_MEMBERSHIPS"
+
+    def name(self):
+        return "fuzzymembershipmultiple"
+
+    def displayName(self):
+        return "Fuzzy Membership (Multiple Terms)"
+
+    def createInstance(self):
+        return FuzzyMembershipMultipleAlgorithm()
+
+    def initAlgorithm(self, config=None):
+
+        self.addParameter(QgsProcessingParameterRasterLayer(self.RASTER, "Raster layer"))
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.FUZZY_NUMBERS,
+                "Fuzzy Numbers (one per line, e.g. `triangular;1|2|3`)",
+                multiLine=True,
+                optional=True,
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.FUZZY_VARIABLES,
+                "Fuzzy variables from database (separated by comma)",
+                optional=True,
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterDestination(
+                self.OUTPUT_FUZZY_MEMBERSHIPS, "Output raster layer - fuzzy memberships (band per term)"
+            )
+        )
+
+        self.addAreaOfInterestParameters()
+        self.addRasterProcessingParameters()
+        self.addBackendParameter()
+
+    def parameterAsFuzzyTerms(self, parameters, context) -> List[Tuple[str, CompiledFuzzyNumber]]:
+
+        terms = []
+
+        fuzzy_numbers = self.parameterAsString(parameters, self.FUZZY_NUMBERS, context)
+
+        for line in fuzzy_numbers.splitlines():
+            line = line.strip()
+
+            if not line:
+                continue
+
+            try:
+                fuzzy_number = ParameterFuzzyNumber.valueToCompiledFuzzyNumber(line)
+            except (IndexError, ValueError):
+                fuzzy_number = None
+
+            if fuzzy_number is None:
+                raise QgsProcessingException("Cannot create Fuzzy Number from `{}`.".format(line))
+
+            terms.append((line, fuzzy_number))
+
+        fuzzy_variables = self.parameterAsString(parameters, self.FUZZY_VARIABLES, context)
+
+        if fuzzy_variables.strip():
+            fdb = FuzzyDatabase()
+
+            for variable_name in fuzzy_variables.split(","):
+                variable_name = variable_name.strip()
+
+                fuzzy_number = fdb.get_fuzzy_variable(variable_name)
+
+                if fuzzy_number is None:
+                    raise QgsProcessingException(
+                        "Fuzzy variable `{}` does not exist in database.".format(variable_name)
+                    )
+
+                terms.append((variable_name, compile_fuzzy_number(fuzzy_number)))
+
+        return terms
+
+    def checkParameterValues(self, parameters, context):
+
+        input_raster = self.parameterAsRasterLayer(parameters, self.RASTER, context)
+
+        rasters = [input_raster]
+
+        if not verify_one_band(rasters):
+
+            msg = "Input raster can have only one band."
+
+            return False, msg
+
+        try:
+            terms = self.parameterAsFuzzyTerms(parameters, context)
+        except QgsProcessingException as e:
+            return False, str(e)
+
+        if not terms:
+
+            msg = "At least one Fuzzy Number or fuzzy variable has to be specified."
+
+            return False, msg
+
+        return super().checkParameterValues(parameters, context)
+
+    def processAlgorithm(self, parameters, context, feedback: QgsProcessingFeedback):
+
+        raster_band = 1
+
+        terms = self.parameterAsFuzzyTerms(parameters, context)
+
+        term_names = [name for name, _ in terms]
+        fuzzy_numbers = [fuzzy_number for _, fuzzy_number in terms]
+
+        input_raster = self.parameterAsRasterLayer(parameters, self.RASTER, context)
+
+        input_raster_dp = input_raster.dataProvider()
+
+        input_raster_nodata = input_raster_dp.sourceNoDataValue(raster_band)
+
+        output_data_type = self.parameterAsOutputDataType(parameters, context)
+
+        output_options = self.parameterAsRasterOutputOptions(parameters, context)
+
+        creation_options = output_options.creation_options(output_data_type.data_type)
+
+        output_nodata = output_data_type.nodata_value(input_raster_nodata)
+
+        path_fuzzy_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_FUZZY_MEMBERSHIPS, context)
+
+        area_of_interest = self.parameterAsAreaOfInterest(parameters, context, input_raster)
+
+        fuzzy_raster_dp = self.createOutputRaster(
+            path_fuzzy_raster,
+            input_raster,
+            output_data_type,
+            creation_options,
+            output_nodata,
+            output_window=area_of_interest.output_window,
+            band_count=len(fuzzy_numbers),
+        )
+
+        output_bands = list(range(1, len(fuzzy_numbers) + 1))
+
+        feedback.pushInfo("Evaluating {} terms: {}.".format(len(term_names), ", ".join(term_names)))
+
+        windows, threads = self.parameterAsTilePlan(
+            parameters,
+            context,
+            input_raster,
+            streams=1 + len(fuzzy_numbers),
+            feedback=feedback,
+            area_of_interest=area_of_interest,
+        )
+
+        tile_function = partial(fuzzy_membership_multiple_tile, fuzzy_numbers)
+
+        value_range = integer_value_range(input_raster, raster_band)
+
+        if value_range:
+            feedback.pushInfo("Using lookup table for integer values from {} to {}.".format(*value_range))
+
+            tile_function = LookupTableFunction(tile_function, *value_range)
+
+        tile_processor_class = self.parameterAsTileProcessorClass(parameters, context)
+
+        processor = tile_processor_class(
+            [RasterPart(input_raster, raster_band, threads)],
+            [fuzzy_raster_dp] * len(fuzzy_numbers),
+            tile_function,
+            output_nodata,
+            threads,
+            output_data_type=output_data_type,
+            area_of_interest=area_of_interest,
+            output_bands=output_bands,
+        )
+
+        completed = processor.run(windows, feedback)
+
+        statistics = self.reportTileStatistics(processor.statistics, feedback)
+
+        del processor, fuzzy_raster_dp
+
+        # partial output of canceled run is not finalized
+        if completed:
+            set_raster_band_descriptions(path_fuzzy_raster, term_names)
+
+            self.finalizeOutputRaster(path_fuzzy_raster, output_data_type, output_options)
+
+        return {self.OUTPUT_FUZZY_MEMBERSHIPS: path_fuzzy_raster, self.OUTPUT_STATISTICS: statistics}
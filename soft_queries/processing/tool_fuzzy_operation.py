@@ -1,26 +1,22 @@
-from FuzzyMath.class_membership_operations import FuzzyAnd, FuzzyMembership, FuzzyOr
+import numpy as np
 from qgis.core import (
-    QgsProcessingAlgorithm,
-    QgsProcessingException,
     QgsProcessingFeedback,
     QgsProcessingParameterEnum,
     QgsProcessingParameterRasterDestination,
     QgsProcessingParameterRasterLayer,
 )
 
+from .fuzzy_arrays import fuzzy_and_array, fuzzy_or_array
+from .raster_algorithm import SoftQueriesRasterAlgorithm
+from .tile_processor import TileProcessor
 from .utils import (
     RasterPart,
-    create_raster,
-    create_raster_writer,
-    verify_crs_equal,
-    verify_extent_equal,
+    verify_grid_equal,
     verify_one_band,
-    verify_size_equal,
-    writeBlock,
 )
 
 
-class FuzzyOperationAlgorithm(QgsProcessingAlgorithm):
+class FuzzyOperationAlgorithm(SoftQueriesRasterAlgorithm):
     FUZZY_RASTER_1 = "FUZZY_RASTER_1"
     FUZZY_RASTER_2 = "FUZZY_RASTER_2"
     OPERATION = "OPERATION"
@@ -30,7 +26,7 @@ class FuzzyOperationAlgorithm(QgsProcessingAlgorithm):
 
     operations_enum = ["And", "Or"]
 
-    operations = {"And": FuzzyAnd.fuzzyAnd, "Or": FuzzyOr.fuzzyOr}
+    operations = {"And": fuzzy_and_array, "Or": fuzzy_or_array}
 
     operations_types_enum = [
         "min/max",
@@ -79,6 +75,11 @@ class FuzzyOperationAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
+        self.addAreaOfInterestParameters()
+        self.addRasterProcessingParameters()
+        self.addResamplingParameter()
+        self.addTileJournalParameters()
+
     def checkParameterValues(self, parameters, context):
         fuzzy_input_raster_1 = self.parameterAsRasterLayer(parameters, self.FUZZY_RASTER_1, context)
         fuzzy_input_raster_2 = self.parameterAsRasterLayer(parameters, self.FUZZY_RASTER_2, context)
@@ -90,36 +91,13 @@ class FuzzyOperationAlgorithm(QgsProcessingAlgorithm):
 
             return False, msg
 
-        if not verify_crs_equal(rasters):
-            msg = "CRS of input rasters have to be equal. Right now they are not." "{} = {}".format(
-                fuzzy_input_raster_1.crs().authid(),
-                fuzzy_input_raster_2.crs().authid(),
-            )
-
-            return False, msg
-
-        if not verify_size_equal(rasters):
-            msg = "Sizes of input rasters have to be equal. Right now they are not " "({}, {}) = ({}, {})".format(
-                fuzzy_input_raster_1.height(),
-                fuzzy_input_raster_1.width(),
-                fuzzy_input_raster_2.height(),
-                fuzzy_input_raster_2.width(),
-            )
-
-            return False, msg
-
-        if not verify_extent_equal(rasters):
-            msg = "Extents of input rasters have to be equal. Right now they are not."
-
-            return False, msg
-
         return super().checkParameterValues(parameters, context)
 
     def processAlgorithm(self, parameters, context, feedback: QgsProcessingFeedback):
         raster_band = 1
 
-        fuzzy_operation = self.parameterAsEnumString(parameters, self.OPERATION, context)
-        fuzzy_operation = self.operations[fuzzy_operation]
+        operation_name = self.parameterAsEnumString(parameters, self.OPERATION, context)
+        fuzzy_operation = self.operations[operation_name]
 
         operation_type = self.parameterAsEnumString(parameters, self.OPERATION_TYPE, context)
 
@@ -130,7 +108,7 @@ class FuzzyOperationAlgorithm(QgsProcessingAlgorithm):
                 operation_type = operation_type.split("/")[1]
 
         feedback.pushInfo(
-            "Processing operation `{}` with type of operation `{}`.".format(fuzzy_operation.__name__, operation_type)
+            "Processing operation `{}` with type of operation `{}`.".format(operation_name, operation_type)
         )
 
         fuzzy_input_raster_1 = self.parameterAsRasterLayer(parameters, self.FUZZY_RASTER_1, context)
@@ -140,56 +118,77 @@ class FuzzyOperationAlgorithm(QgsProcessingAlgorithm):
 
         fuzzy_input_nodata = fuzzy_input_raster_1_dp.sourceNoDataValue(raster_band)
 
-        path_fuzzy_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_FUZZY_MEMBERSHIP, context)
+        output_data_type = self.parameterAsOutputDataType(parameters, context)
 
-        output_fuzzy_raster_writer = create_raster_writer(path_fuzzy_raster)
+        output_options = self.parameterAsRasterOutputOptions(parameters, context)
 
-        output_fuzzy_raster_dp = create_raster(output_fuzzy_raster_writer, fuzzy_input_raster_1)
+        creation_options = output_options.creation_options(output_data_type.data_type)
 
-        if not output_fuzzy_raster_dp:
-            raise QgsProcessingException("Data provider for fuzzy raster not created.")
+        output_nodata = output_data_type.nodata_value(fuzzy_input_nodata)
 
-        if not output_fuzzy_raster_dp.isValid():
-            raise QgsProcessingException("Data provider for fuzzy raster not valid.")
+        path_fuzzy_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_FUZZY_MEMBERSHIP, context)
 
-        output_fuzzy_raster_dp.setNoDataValue(raster_band, fuzzy_input_nodata)
+        rasters = [fuzzy_input_raster_1, fuzzy_input_raster_2]
 
-        total = 100.0 / (fuzzy_input_raster_1.height()) if fuzzy_input_raster_1.height() else 0
+        area_of_interest = self.parameterAsAreaOfInterest(parameters, context, fuzzy_input_raster_1)
 
-        r_fuzzy_1 = RasterPart(fuzzy_input_raster_1, raster_band)
-        r_fuzzy_2 = RasterPart(fuzzy_input_raster_2, raster_band)
+        journal = self.parameterAsTileJournal(parameters, context, [path_fuzzy_raster], rasters)
 
-        new_block = r_fuzzy_1.create_empty_block()
+        output_fuzzy_raster_dp = self.createOutputRaster(
+            path_fuzzy_raster,
+            fuzzy_input_raster_1,
+            output_data_type,
+            creation_options,
+            output_nodata,
+            journal,
+            area_of_interest.output_window,
+        )
 
-        count = 0
+        resampling_method = self.parameterAsResamplingMethod(parameters, context)
 
-        while r_fuzzy_1.correct and r_fuzzy_2.correct:
-            if feedback.isCanceled():
-                break
+        transform_context = context.transformContext()
 
-            for i in range(r_fuzzy_1.data_range):
-                if r_fuzzy_1.isNoData(i) or r_fuzzy_2.isNoData(i):
-                    new_block.setIsNoData(i)
+        if not verify_grid_equal(rasters):
+            feedback.pushInfo("Inputs are read into the grid of the first raster, reprojected and resampled.")
 
-                else:
-                    fm = fuzzy_operation(
-                        FuzzyMembership(r_fuzzy_1.value(i)),
-                        FuzzyMembership(r_fuzzy_2.value(i)),
-                        operation_type,
-                    )
+        windows, threads = self.parameterAsTilePlan(
+            parameters,
+            context,
+            fuzzy_input_raster_1,
+            streams=3,
+            feedback=feedback,
+            area_of_interest=area_of_interest,
+            journal=journal,
+        )
 
-                    new_block.setValue(i, fm.membership)
+        windows = self.journalRasterWindows(journal, windows, feedback)
+
+        def fuzzy_operation_values(values):
+            return [fuzzy_operation(values[0].astype(np.float64), values[1].astype(np.float64), operation_type)]
+
+        processor = TileProcessor(
+            [
+                RasterPart(raster, raster_band, threads, fuzzy_input_raster_1, resampling_method, transform_context)
+                for raster in rasters
+            ],
+            [output_fuzzy_raster_dp],
+            fuzzy_operation_values,
+            output_nodata,
+            threads,
+            output_data_type=output_data_type,
+            area_of_interest=area_of_interest,
+            journal=journal,
+        )
 
-            writeBlock(output_fuzzy_raster_dp, new_block, r_fuzzy_1)
+        completed = processor.run(windows, feedback)
 
-            r_fuzzy_1.nextData()
-            r_fuzzy_2.nextData()
+        processor.checkpoint()
 
-            if r_fuzzy_1.correct and r_fuzzy_2.correct:
-                new_block = r_fuzzy_1.create_empty_block()
+        statistics = self.reportTileStatistics(processor.statistics, feedback)
 
-            feedback.setProgress(int(count * total))
+        del processor, output_fuzzy_raster_dp
 
-            count += 1
+        if self.finishTileJournal(journal, completed, feedback):
+            self.finalizeOutputRaster(path_fuzzy_raster, output_data_type, output_options, journal)
 
-        return {self.OUTPUT_FUZZY_MEMBERSHIP: path_fuzzy_raster}
+        return {self.OUTPUT_FUZZY_MEMBERSHIP: path_fuzzy_raster, self.OUTPUT_STATISTICS: statistics}
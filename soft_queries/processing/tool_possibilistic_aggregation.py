@@ -0,0 +1,288 @@
+from functools import partial
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from qgis.core import (
+    QgsProcessing,
+    QgsProcessingFeedback,
+    QgsProcessingParameterEnum,
+    QgsProcessingParameterMultipleLayers,
+    QgsProcessingParameterString,
+    QgsRasterLayer,
+)
+
+from .fuzzy_arrays import possibilistic_and_arrays, possibilistic_or_arrays
+from .raster_algorithm import SoftQueriesRasterAlgorithm
+from .tile_processor import TileProcessor
+from .utils import (
+    NECESSITY_BAND,
+    POSSIBILITY_BAND,
+    RasterPart,
+    parse_weights,
+    verify_crs_equal,
+    verify_extent_equal,
+    verify_one_band,
+    verify_size_equal,
+)
+
+
+def possibilistic_aggregation_tile(
+    operation: Callable[[Sequence[np.ndarray], Sequence[np.ndarray], str, Optional[Sequence[float]]], List[np.ndarray]],
+    operation_type: str,
+    weights: Optional[List[float]],
+    values: List[np.ndarray],
+) -> List[np.ndarray]:
+    values = [part_values.astype(np.float64) for part_values in values]
+
+    # inputs are all possibilities followed by all necessities
+    count = len(values) // 2
+
+    return operation(values[:count], values[count:], operation_type, weights)
+
+
+class PossibilisticAggregationAlgorithm(SoftQueriesRasterAlgorithm):
+    POSSIBILITY_RASTERS = "POSSIBILITY_RASTERS"
+    NECESSITY_RASTERS = "NECESSITY_RASTERS"
+    WEIGHTS = "WEIGHTS"
+    OPERATION = "OPERATION"
+    OPERATION_TYPE = "OPERATION_TYPE"
+
+    operations_enum = ["And", "Or"]
+
+    operations = {
+        "And": possibilistic_and_arrays,
+        "Or": possibilistic_or_arrays,
+    }
+
+    operations_types_enum = [
+        "min/max",
+        "product",
+        "drastic",
+        "Lukasiewicz",
+        "Nilpotent",
+        "Hamacher",
+    ]
+
+    def name(self):
+        return "possibilisticaggregation"
+
+    def displayName(self):
+        return "Possibilistic Aggregation"
+
+    def createInstance(self):
+        return PossibilisticAggregationAlgorithm()
+
+    def initAlgorithm(self, config=None):
+        self.addParameter(
+            QgsProcessingParameterMultipleLayers(
+                self.POSSIBILITY_RASTERS,
+                "Possibility Raster Layers (or two-band possibilistic rasters)",
+                QgsProcessing.TypeRaster,
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterMultipleLayers(
+                self.NECESSITY_RASTERS,
+                "Necessity Raster Layers (in the same order, empty for two-band possibilistic rasters)",
+                QgsProcessing.TypeRaster,
+                optional=True,
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.OPERATION,
+                "Operation to use",
+                self.operations_enum,
+                defaultValue=self.operations_enum[0],
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterEnum(
+                self.OPERATION_TYPE,
+                "Operation type",
+                self.operations_types_enum,
+                defaultValue=self.operations_types_enum[0],
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterString(
+                self.WEIGHTS,
+                "Weights of possibilistic layers (separated by comma, from [0, 1])",
+                optional=True,
+            )
+        )
+
+        self.addPossibilisticOutputParameters()
+
+        self.addAreaOfInterestParameters()
+        self.addRasterProcessingParameters()
+
+    def parameterAsRasterBands(self, parameters, context) -> List[Tuple[QgsRasterLayer, int]]:
+        """Pairs of raster and band, possibilities of all inputs followed by their necessities."""
+
+        rasters_possibility = self.parameterAsLayerList(parameters, self.POSSIBILITY_RASTERS, context)
+        rasters_necessity = self.parameterAsLayerList(parameters, self.NECESSITY_RASTERS, context)
+
+        if not rasters_necessity:
+            return [(raster, POSSIBILITY_BAND) for raster in rasters_possibility] + [
+                (raster, NECESSITY_BAND) for raster in rasters_possibility
+            ]
+
+        return [(raster, 1) for raster in rasters_possibility + rasters_necessity]
+
+    def checkParameterValues(self, parameters, context):
+        rasters_possibility = self.parameterAsLayerList(parameters, self.POSSIBILITY_RASTERS, context)
+        rasters_necessity = self.parameterAsLayerList(parameters, self.NECESSITY_RASTERS, context)
+
+        if not rasters_necessity:
+            if not all(raster.bandCount() == 2 for raster in rasters_possibility):
+                msg = (
+                    "Without necessity rasters all possibilistic inputs have to be two-band rasters "
+                    "(possibility, necessity)."
+                )
+
+                return False, msg
+
+        elif len(rasters_possibility) != len(rasters_necessity):
+            msg = "Number of possibility rasters ({}) and necessity rasters ({}) has to be equal.".format(
+                len(rasters_possibility), len(rasters_necessity)
+            )
+
+            return False, msg
+
+        elif not verify_one_band(rasters_possibility + rasters_necessity):
+            msg = "Input rasters can have only one band. One of them has other band number."
+
+            return False, msg
+
+        if len(rasters_possibility) < 2:
+            msg = "At least two possibilistic inputs are required."
+
+            return False, msg
+
+        rasters = rasters_possibility + rasters_necessity
+
+        if not verify_crs_equal(rasters):
+            msg = "CRS of input rasters have to be equal. Right now they are not."
+
+            return False, msg
+
+        if not verify_size_equal(rasters):
+            msg = "Sizes of input rasters have to be equal. Right now they are not."
+
+            return False, msg
+
+        if not verify_extent_equal(rasters):
+            msg = "Extents of input rasters have to be equal. Right now they are not."
+
+            return False, msg
+
+        if not self.parameterAsPossibilisticOutputs(parameters, context):
+            msg = "At least one output has to be specified."
+
+            return False, msg
+
+        try:
+            parse_weights(self.parameterAsString(parameters, self.WEIGHTS, context), len(rasters_possibility))
+        except ValueError as e:
+            return False, str(e)
+
+        return super().checkParameterValues(parameters, context)
+
+    def processAlgorithm(self, parameters, context, feedback: QgsProcessingFeedback):
+        raster_bands = self.parameterAsRasterBands(parameters, context)
+
+        # each input contributes possibility and necessity
+        count = len(raster_bands) // 2
+
+        operation_name = self.parameterAsEnumString(parameters, self.OPERATION, context)
+        operation = self.operations[operation_name]
+
+        operation_type = self.parameterAsEnumString(parameters, self.OPERATION_TYPE, context)
+
+        if "/" in operation_type:
+            if operation == self.operations["And"]:
+                operation_type = operation_type.split("/")[0]
+            else:
+                operation_type = operation_type.split("/")[1]
+
+        weights = parse_weights(self.parameterAsString(parameters, self.WEIGHTS, context), count)
+
+        feedback.pushInfo(
+            "Processing operation `{}` with type of operation `{}` on {} possibilistic rasters.".format(
+                operation_name, operation_type, count
+            )
+        )
+
+        raster_1_possibility, raster_1_possibility_band = raster_bands[0]
+
+        fuzzy_input_nodata = raster_1_possibility.dataProvider().sourceNoDataValue(raster_1_possibility_band)
+
+        output_data_type = self.parameterAsOutputDataType(parameters, context)
+
+        output_options = self.parameterAsRasterOutputOptions(parameters, context)
+
+        creation_options = output_options.creation_options(output_data_type.data_type)
+
+        output_nodata = output_data_type.nodata_value(fuzzy_input_nodata)
+
+        outputs = self.parameterAsPossibilisticOutputs(parameters, context)
+
+        area_of_interest = self.parameterAsAreaOfInterest(parameters, context, raster_1_possibility)
+
+        output_dps, output_bands, output_results = self.createPossibilisticOutputs(
+            outputs,
+            raster_1_possibility,
+            output_data_type,
+            creation_options,
+            output_nodata,
+            output_window=area_of_interest.output_window,
+        )
+
+        windows, threads = self.parameterAsTilePlan(
+            parameters,
+            context,
+            raster_1_possibility,
+            streams=len(raster_bands) + len(output_dps),
+            feedback=feedback,
+            area_of_interest=area_of_interest,
+        )
+
+        # both bands of two-band raster are read through the same data providers
+        raster_parts: Dict[int, RasterPart] = {}
+        inputs = []
+
+        for raster, raster_band in raster_bands:
+            if id(raster) in raster_parts:
+                inputs.append(raster_parts[id(raster)].with_band(raster_band))
+            else:
+                raster_parts[id(raster)] = RasterPart(raster, raster_band, threads)
+                inputs.append(raster_parts[id(raster)])
+
+        processor = TileProcessor(
+            inputs,
+            output_dps,
+            partial(possibilistic_aggregation_tile, operation, operation_type, weights),
+            output_nodata,
+            threads,
+            output_data_type=output_data_type,
+            output_bands=output_bands,
+            area_of_interest=area_of_interest,
+            output_results=output_results,
+        )
+
+        completed = processor.run(windows, feedback)
+
+        statistics = self.reportTileStatistics(processor.statistics, feedback)
+
+        del processor, output_dps
+
+        # partial outputs of canceled run are not finalized
+        if completed:
+            self.finalizePossibilisticOutputs(outputs, output_data_type, output_options)
+
+        return {**outputs, self.OUTPUT_STATISTICS: statistics}
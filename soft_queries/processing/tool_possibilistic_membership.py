@@ -1,22 +1,31 @@
-from FuzzyMath import FuzzyNumberFactory, exceedance, undervaluation
+from functools import partial
+from typing import Callable, List, Tuple
+
+import numpy as np
 from qgis.core import (
-    QgsProcessingAlgorithm,
-    QgsProcessingException,
     QgsProcessingFeedback,
     QgsProcessingParameterEnum,
-    QgsProcessingParameterRasterDestination,
     QgsProcessingParameterRasterLayer,
 )
 
+from .fuzzy_arrays import CompiledFuzzyNumber
 from .parameter_fuzzy_number import ParameterFuzzyNumber
-from .utils import RasterPart, create_raster, create_raster_writer, verify_one_band, writeBlock
+from .raster_algorithm import SoftQueriesRasterAlgorithm
+from .tile_processor import ConstantTileFunction, LookupTableFunction
+from .utils import RasterPart, integer_value_range, verify_one_band
+
 
+def possibilistic_membership_tile(
+    operation_function: Callable[[CompiledFuzzyNumber, np.ndarray], Tuple[np.ndarray, np.ndarray]],
+    fuzzy_number: CompiledFuzzyNumber,
+    values: List[np.ndarray],
+) -> List[np.ndarray]:
+    return list(operation_function(fuzzy_number, values[0]))
 
-class PossibilisticMembershipAlgorithm(QgsProcessingAlgorithm):
+
+class PossibilisticMembershipAlgorithm(SoftQueriesRasterAlgorithm):
     FUZZYNUMBER = "FUZZY_NUMBER"
     RASTER = "RASTER"
-    OUTPUT_POSSIBILITY = "OUTPUT_POSSIBILITY"
-    OUTPUT_NECESSITY = "OUTPUT_NECESSITY"
     OPERATION = "OPERATION"
 
     operation_enum = [
@@ -25,8 +34,8 @@ class PossibilisticMembershipAlgorithm(QgsProcessingAlgorithm):
     ]
 
     functions_operation_enum = [
-        undervaluation,
-        exceedance,
+        CompiledFuzzyNumber.undervaluation,
+        CompiledFuzzyNumber.exceedance,
     ]
 
     def name(self):
@@ -47,13 +56,12 @@ class PossibilisticMembershipAlgorithm(QgsProcessingAlgorithm):
             QgsProcessingParameterEnum(self.OPERATION, "Operation to use", self.operation_enum, defaultValue=0)
         )
 
-        self.addParameter(
-            QgsProcessingParameterRasterDestination(self.OUTPUT_POSSIBILITY, "Output raster layer - possibility")
-        )
+        self.addPossibilisticOutputParameters()
 
-        self.addParameter(
-            QgsProcessingParameterRasterDestination(self.OUTPUT_NECESSITY, "Output raster layer - necessity")
-        )
+        self.addAreaOfInterestParameters()
+        self.addRasterProcessingParameters()
+        self.addBackendParameter()
+        self.addTileJournalParameters()
 
     def checkParameterValues(self, parameters, context):
         input_raster = self.parameterAsRasterLayer(parameters, self.RASTER, context)
@@ -65,12 +73,17 @@ class PossibilisticMembershipAlgorithm(QgsProcessingAlgorithm):
 
             return False, msg
 
+        if not self.parameterAsPossibilisticOutputs(parameters, context):
+            msg = "At least one output has to be specified."
+
+            return False, msg
+
         return super().checkParameterValues(parameters, context)
 
     def processAlgorithm(self, parameters, context, feedback: QgsProcessingFeedback):
         raster_band = 1
 
-        fuzzy_number = ParameterFuzzyNumber.valueToFuzzyNumber(parameters[self.FUZZYNUMBER])
+        fuzzy_number = ParameterFuzzyNumber.valueToCompiledFuzzyNumber(parameters[self.FUZZYNUMBER])
 
         operation_type = self.parameterAsEnum(parameters, self.OPERATION, context)
 
@@ -82,74 +95,80 @@ class PossibilisticMembershipAlgorithm(QgsProcessingAlgorithm):
 
         input_raster_nodata = input_raster_dp.sourceNoDataValue(raster_band)
 
-        path_possibility_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_POSSIBILITY, context)
-
-        path_necessity_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_NECESSITY, context)
-
-        possibility_raster_writer = create_raster_writer(path_possibility_raster)
+        output_data_type = self.parameterAsOutputDataType(parameters, context)
 
-        possibility_raster_dp = create_raster(possibility_raster_writer, input_raster)
+        output_options = self.parameterAsRasterOutputOptions(parameters, context)
 
-        if not possibility_raster_dp:
-            raise QgsProcessingException("Data provider for possibility not created.")
+        creation_options = output_options.creation_options(output_data_type.data_type)
 
-        if not possibility_raster_dp.isValid():
-            raise QgsProcessingException("Data provider for possibility not valid.")
+        output_nodata = output_data_type.nodata_value(input_raster_nodata)
 
-        necessity_raster_writer = create_raster_writer(path_necessity_raster)
+        outputs = self.parameterAsPossibilisticOutputs(parameters, context)
 
-        necessity_raster_dp = create_raster(necessity_raster_writer, input_raster)
+        area_of_interest = self.parameterAsAreaOfInterest(parameters, context, input_raster)
 
-        if not necessity_raster_dp:
-            raise QgsProcessingException("Data provider for necessity not created.")
+        journal = self.parameterAsTileJournal(parameters, context, list(outputs.values()), [input_raster])
 
-        if not necessity_raster_dp.isValid():
-            raise QgsProcessingException("Data provider for necessity not valid.")
+        output_dps, output_bands, output_results = self.createPossibilisticOutputs(
+            outputs,
+            input_raster,
+            output_data_type,
+            creation_options,
+            output_nodata,
+            journal,
+            area_of_interest.output_window,
+        )
 
-        possibility_raster_dp.setNoDataValue(raster_band, input_raster_nodata)
-        necessity_raster_dp.setNoDataValue(raster_band, input_raster_nodata)
+        windows, threads = self.parameterAsTilePlan(
+            parameters,
+            context,
+            input_raster,
+            streams=1 + len(output_dps),
+            feedback=feedback,
+            area_of_interest=area_of_interest,
+            journal=journal,
+        )
 
-        total = 100.0 / (input_raster.height()) if input_raster.height() else 0
+        windows = self.journalRasterWindows(journal, windows, feedback)
 
-        r_input_data = RasterPart(input_raster, raster_band)
+        tile_function = partial(possibilistic_membership_tile, operation_function, fuzzy_number)
 
-        new_block_possibility = r_input_data.create_empty_block()
-        new_block_necessity = r_input_data.create_empty_block()
+        value_range = integer_value_range(input_raster, raster_band)
 
-        count = 0
+        # without analytic evaluation every distinct value of tile is evaluated by FuzzyMath, which is cheaper than
+        # evaluating the whole range
+        if value_range and fuzzy_number.analytic_possibilistic:
+            feedback.pushInfo("Using lookup table for integer values from {} to {}.".format(*value_range))
 
-        while r_input_data.correct:
-            if feedback.isCanceled():
-                break
+            tile_function = LookupTableFunction(tile_function, *value_range)
 
-            for i in range(r_input_data.data_range):
-                if r_input_data.isNoData(i):
-                    new_block_possibility.setIsNoData(i)
-                    new_block_necessity.setIsNoData(i)
+        else:
+            tile_function = ConstantTileFunction(tile_function, fuzzy_number, input_raster_nodata)
 
-                else:
-                    pm = operation_function(
-                        fuzzy_number,
-                        FuzzyNumberFactory.crisp_number(r_input_data.value(i)),
-                    )
+        tile_processor_class = self.parameterAsTileProcessorClass(parameters, context)
 
-                    new_block_possibility.setValue(i, pm.possibility)
-                    new_block_necessity.setValue(i, pm.necessity)
+        processor = tile_processor_class(
+            [RasterPart(input_raster, raster_band, threads)],
+            output_dps,
+            tile_function,
+            output_nodata,
+            threads,
+            output_data_type=output_data_type,
+            output_bands=output_bands,
+            journal=journal,
+            area_of_interest=area_of_interest,
+            output_results=output_results,
+        )
 
-            writeBlock(possibility_raster_dp, new_block_possibility, r_input_data)
-            writeBlock(necessity_raster_dp, new_block_necessity, r_input_data)
+        completed = processor.run(windows, feedback)
 
-            r_input_data.nextData()
+        processor.checkpoint()
 
-            if r_input_data.correct:
-                new_block_possibility = r_input_data.create_empty_block()
-                new_block_necessity = r_input_data.create_empty_block()
+        statistics = self.reportTileStatistics(processor.statistics, feedback)
 
-            feedback.setProgress(int(count * total))
+        del processor, output_dps
 
-            count += 1
+        if self.finishTileJournal(journal, completed, feedback):
+            self.finalizePossibilisticOutputs(outputs, output_data_type, output_options, journal)
 
-        return {
-            self.OUTPUT_POSSIBILITY: path_possibility_raster,
-            self.OUTPUT_NECESSITY: path_necessity_raster,
-        }
+        return {**outputs, self.OUTPUT_STATISTICS: statistics}
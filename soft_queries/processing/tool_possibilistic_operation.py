@@ -1,39 +1,27 @@
-from FuzzyMath.class_membership_operations import PossibilisticAnd, PossibilisticMembership, PossibilisticOr
+import numpy as np
 from qgis.core import (
-    QgsProcessingAlgorithm,
-    QgsProcessingException,
     QgsProcessingFeedback,
     QgsProcessingParameterEnum,
-    QgsProcessingParameterRasterDestination,
 )
 
+from .fuzzy_arrays import possibilistic_and_array, possibilistic_or_array
 from .parameter_possibilistic_element import ParameterPossibilisticElement
-from .utils import (
-    RasterPart,
-    create_raster,
-    create_raster_writer,
-    verify_crs_equal,
-    verify_extent_equal,
-    verify_one_band,
-    verify_size_equal,
-    writeBlock,
-)
+from .raster_algorithm import SoftQueriesRasterAlgorithm
+from .tile_processor import TileProcessor
+from .utils import RasterPart, verify_grid_equal
 
 
-class PossibilisticOperationAlgorithm(QgsProcessingAlgorithm):
+class PossibilisticOperationAlgorithm(SoftQueriesRasterAlgorithm):
     POSSIBILISTIC_RASTER_1 = "POSSIBILISTIC_RASTER_1"
     POSSIBILISTIC_RASTER_2 = "POSSIBILISTIC_RASTER_2"
     OPERATION = "OPERATION"
     OPERATION_TYPE = "OPERATION_TYPE"
 
-    OUTPUT_POSSIBILITY = "OUTPUT_POSSIBILITY"
-    OUTPUT_NECESSITY = "OUTPUT_NECESSITY"
-
     operations_enum = ["And", "Or"]
 
     operations = {
-        "And": PossibilisticAnd.possibilisticAnd,
-        "Or": PossibilisticOr.possibilisticOr,
+        "And": possibilistic_and_array,
+        "Or": possibilistic_or_array,
     }
 
     operations_types_enum = [
@@ -77,69 +65,41 @@ class PossibilisticOperationAlgorithm(QgsProcessingAlgorithm):
             )
         )
 
-        self.addParameter(
-            QgsProcessingParameterRasterDestination(self.OUTPUT_POSSIBILITY, "Output raster layer - possibility")
-        )
+        self.addPossibilisticOutputParameters()
 
-        self.addParameter(
-            QgsProcessingParameterRasterDestination(self.OUTPUT_NECESSITY, "Output raster layer - necessity")
-        )
+        self.addAreaOfInterestParameters()
+        self.addRasterProcessingParameters()
+        self.addResamplingParameter()
+        self.addTileJournalParameters()
 
     def checkParameterValues(self, parameters, context):
-        (
-            raster_1_possibility,
-            raster_1_necessity,
-        ) = ParameterPossibilisticElement.valueToRasters(parameters[self.POSSIBILISTIC_RASTER_1])
-
-        (
-            raster_2_possibility,
-            raster_2_necessity,
-        ) = ParameterPossibilisticElement.valueToRasters(parameters[self.POSSIBILISTIC_RASTER_2])
-
-        rasters = [
-            raster_1_possibility,
-            raster_1_necessity,
-            raster_2_possibility,
-            raster_2_necessity,
-        ]
-
-        if not verify_one_band(rasters):
-            msg = "Input rasters can have only one band. One of them has other band number."
-
-            return False, msg
-
-        if not verify_crs_equal(rasters):
-            msg = "CRS of input rasters have to be equal. Right now they are not."
+        for name in [self.POSSIBILISTIC_RASTER_1, self.POSSIBILISTIC_RASTER_2]:
+            if not ParameterPossibilisticElement.verifyRasters(parameters[name]):
+                msg = (
+                    "Possibilistic input has to be either two rasters with one band "
+                    "or one raster with two bands (possibility, necessity)."
+                )
 
-            return False, msg
-
-        if not verify_size_equal(rasters):
-            msg = "Sizes of input rasters have to be equal. Right now they are not."
-
-            return False, msg
+                return False, msg
 
-        if not verify_extent_equal(rasters):
-            msg = "Extents of input rasters have to be equal. Right now they are not."
+        if not self.parameterAsPossibilisticOutputs(parameters, context):
+            msg = "At least one output has to be specified."
 
             return False, msg
 
         return super().checkParameterValues(parameters, context)
 
     def processAlgorithm(self, parameters, context, feedback: QgsProcessingFeedback):
-        raster_band = 1
+        # pairs of raster and band, possibility and necessity of the first input followed by the second one
+        raster_bands = []
 
-        (
-            raster_1_possibility,
-            raster_1_necessity,
-        ) = ParameterPossibilisticElement.valueToRasters(parameters[self.POSSIBILISTIC_RASTER_1])
+        for name in [self.POSSIBILISTIC_RASTER_1, self.POSSIBILISTIC_RASTER_2]:
+            raster_bands += ParameterPossibilisticElement.valueToRasterBands(parameters[name])
 
-        (
-            raster_2_possibility,
-            raster_2_necessity,
-        ) = ParameterPossibilisticElement.valueToRasters(parameters[self.POSSIBILISTIC_RASTER_2])
+        raster_1_possibility, raster_1_possibility_band = raster_bands[0]
 
-        operation = self.parameterAsEnumString(parameters, self.OPERATION, context)
-        operation = self.operations[operation]
+        operation_name = self.parameterAsEnumString(parameters, self.OPERATION, context)
+        operation = self.operations[operation_name]
 
         operation_type = self.parameterAsEnumString(parameters, self.OPERATION_TYPE, context)
 
@@ -150,94 +110,94 @@ class PossibilisticOperationAlgorithm(QgsProcessingAlgorithm):
                 operation_type = operation_type.split("/")[1]
 
         feedback.pushInfo(
-            "Processing operation `{}` with type of operation `{}`.".format(operation.__name__, operation_type)
+            "Processing operation `{}` with type of operation `{}`.".format(operation_name, operation_type)
         )
 
         raster_1_possibility_dp = raster_1_possibility.dataProvider()
 
-        fuzzy_input_nodata = raster_1_possibility_dp.sourceNoDataValue(raster_band)
-
-        path_possibility_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_POSSIBILITY, context)
-
-        path_necessity_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_NECESSITY, context)
+        fuzzy_input_nodata = raster_1_possibility_dp.sourceNoDataValue(raster_1_possibility_band)
 
-        possibility_raster_writer = create_raster_writer(path_possibility_raster)
+        output_data_type = self.parameterAsOutputDataType(parameters, context)
 
-        possibility_raster_dp = create_raster(possibility_raster_writer, raster_1_possibility)
+        output_options = self.parameterAsRasterOutputOptions(parameters, context)
 
-        if not possibility_raster_dp:
-            raise QgsProcessingException("Data provider for possibility not created.")
+        creation_options = output_options.creation_options(output_data_type.data_type)
 
-        if not possibility_raster_dp.isValid():
-            raise QgsProcessingException("Data provider for possibility not valid.")
+        output_nodata = output_data_type.nodata_value(fuzzy_input_nodata)
 
-        necessity_raster_writer = create_raster_writer(path_necessity_raster)
+        outputs = self.parameterAsPossibilisticOutputs(parameters, context)
 
-        necessity_raster_dp = create_raster(necessity_raster_writer, raster_1_possibility)
+        rasters = [raster for raster, _ in raster_bands]
 
-        if not necessity_raster_dp:
-            raise QgsProcessingException("Data provider for necessity not created.")
+        area_of_interest = self.parameterAsAreaOfInterest(parameters, context, raster_1_possibility)
 
-        if not necessity_raster_dp.isValid():
-            raise QgsProcessingException("Data provider for necessity not valid.")
+        journal = self.parameterAsTileJournal(parameters, context, list(outputs.values()), rasters)
 
-        possibility_raster_dp.setNoDataValue(raster_band, fuzzy_input_nodata)
-        necessity_raster_dp.setNoDataValue(raster_band, fuzzy_input_nodata)
-
-        total = 100.0 / (raster_1_possibility.height()) if raster_1_possibility.height() else 0
+        output_dps, output_bands, output_results = self.createPossibilisticOutputs(
+            outputs,
+            raster_1_possibility,
+            output_data_type,
+            creation_options,
+            output_nodata,
+            journal,
+            area_of_interest.output_window,
+        )
 
-        r_1_poss_data = RasterPart(raster_1_possibility, raster_band)
-        r_1_nec_data = RasterPart(raster_1_necessity, raster_band)
+        resampling_method = self.parameterAsResamplingMethod(parameters, context)
 
-        r_2_poss_data = RasterPart(raster_2_possibility, raster_band)
-        r_2_nec_data = RasterPart(raster_2_necessity, raster_band)
+        transform_context = context.transformContext()
 
-        possibility_new_block = r_1_poss_data.create_empty_block()
-        necessity_new_block = r_1_poss_data.create_empty_block()
+        if not verify_grid_equal(rasters):
+            feedback.pushInfo("Inputs are read into the grid of the first raster, reprojected and resampled.")
 
-        count = 0
+        windows, threads = self.parameterAsTilePlan(
+            parameters,
+            context,
+            raster_1_possibility,
+            streams=len(raster_bands) + len(output_dps),
+            feedback=feedback,
+            area_of_interest=area_of_interest,
+            journal=journal,
+        )
 
-        while r_1_poss_data.correct and r_1_nec_data.correct and r_2_poss_data.correct and r_2_nec_data.correct:
-            if feedback.isCanceled():
-                break
+        windows = self.journalRasterWindows(journal, windows, feedback)
 
-            for i in range(r_1_poss_data.data_range):
-                if (
-                    r_1_poss_data.isNoData(i)
-                    or r_1_nec_data.isNoData(i)
-                    or r_2_poss_data.isNoData(i)
-                    or r_2_poss_data.isNoData(i)
-                ):
-                    possibility_new_block.setIsNoData(i)
-                    necessity_new_block.setIsNoData(i)
+        def possibilistic_operation(values):
+            return list(operation(*[part_values.astype(np.float64) for part_values in values], operation_type))
 
-                else:
-                    pm = operation(
-                        PossibilisticMembership(r_1_poss_data.value(i), r_1_nec_data.value(i)),
-                        PossibilisticMembership(r_2_poss_data.value(i), r_2_nec_data.value(i)),
-                        operation_type,
-                    )
+        inputs = []
 
-                    possibility_new_block.setValue(i, pm.possibility)
-                    necessity_new_block.setValue(i, pm.necessity)
+        for raster, raster_band in raster_bands:
+            # necessity band of two-band raster is read through the same data providers as its possibility band
+            if inputs and inputs[-1].input_raster is raster:
+                inputs.append(inputs[-1].with_band(raster_band))
+            else:
+                inputs.append(
+                    RasterPart(raster, raster_band, threads, raster_1_possibility, resampling_method, transform_context)
+                )
+
+        processor = TileProcessor(
+            inputs,
+            output_dps,
+            possibilistic_operation,
+            output_nodata,
+            threads,
+            output_data_type=output_data_type,
+            output_bands=output_bands,
+            journal=journal,
+            area_of_interest=area_of_interest,
+            output_results=output_results,
+        )
 
-            writeBlock(possibility_raster_dp, possibility_new_block, r_1_poss_data)
-            writeBlock(necessity_raster_dp, necessity_new_block, r_1_poss_data)
+        completed = processor.run(windows, feedback)
 
-            r_1_poss_data.nextData()
-            r_1_nec_data.nextData()
-            r_2_poss_data.nextData()
-            r_2_nec_data.nextData()
+        processor.checkpoint()
 
-            if r_1_poss_data.correct and r_1_nec_data.correct and r_2_poss_data.correct and r_2_nec_data.correct:
-                possibility_new_block = r_1_poss_data.create_empty_block()
-                necessity_new_block = r_1_poss_data.create_empty_block()
+        statistics = self.reportTileStatistics(processor.statistics, feedback)
 
-            feedback.setProgress(int(count * total))
+        del processor, output_dps
 
-            count += 1
+        if self.finishTileJournal(journal, completed, feedback):
+            self.finalizePossibilisticOutputs(outputs, output_data_type, output_options, journal)
 
-        return {
-            self.OUTPUT_POSSIBILITY: path_possibility_raster,
-            self.OUTPUT_NECESSITY: path_necessity_raster,
-        }
+        return {**outputs, self.OUTPUT_STATISTICS: statistics}
@@ -0,0 +1,204 @@
+from typing import List
+
+from qgis.core import (
+    QgsProcessing,
+    QgsProcessingException,
+    QgsProcessingFeedback,
+    QgsProcessingParameterMultipleLayers,
+    QgsProcessingParameterRasterDestination,
+    QgsProcessingParameterString,
+    QgsRasterLayer,
+)
+
+from .raster_algorithm import SoftQueriesRasterAlgorithm
+from .raster_expression import POSSIBILISTIC, VALUES, RasterExpression
+from .tile_processor import TileProcessor
+from .utils import RasterPart, verify_grid_equal, verify_one_band
+
+
+class RasterExpressionAlgorithm(SoftQueriesRasterAlgorithm):
+
+    EXPRESSION = "EXPRESSION"
+    RASTERS = "RASTERS"
+    OUTPUT = "OUTPUT"
+    OUTPUT_NECESSITY = "OUTPUT_NECESSITY"
+
+    def name(self):
+        return "rasterexpression"
+
+    def displayName(self):
+        return "Soft Query Raster Expression"
+
+    def createInstance(self):
+        return RasterExpressionAlgorithm()
+
+    def initAlgorithm(self, config=None):
+
+        self.addParameter(QgsProcessingParameterString(self.EXPRESSION, "Soft query expression", multiLine=True))
+
+        self.addParameter(
+            QgsProcessingParameterMultipleLayers(
+                self.RASTERS, "Raster Layers (referenced by name in expression)", QgsProcessing.TypeRaster
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterDestination(
+                self.OUTPUT, "Output raster layer - fuzzy membership or possibility"
+            )
+        )
+
+        self.addParameter(
+            QgsProcessingParameterRasterDestination(
+                self.OUTPUT_NECESSITY,
+                "Output raster layer - necessity (for possibilistic results)",
+                optional=True,
+                createByDefault=False,
+            )
+        )
+
+        self.addAreaOfInterestParameters()
+        self.addResamplingParameter()
+        self.addRasterProcessingParameters()
+
+    def parameterAsRasterExpression(self, parameters, context) -> RasterExpression:
+
+        rasters = self.parameterAsLayerList(parameters, self.RASTERS, context)
+
+        expression = self.parameterAsString(parameters, self.EXPRESSION, context)
+
+        try:
+            return RasterExpression(expression, [raster.name() for raster in rasters])
+        except ValueError as e:
+            raise QgsProcessingException(str(e))
+
+    def parameterAsExpressionRasters(
+        self, parameters, context, raster_expression: RasterExpression
+    ) -> List[QgsRasterLayer]:
+
+        rasters = {raster.name(): raster for raster in self.parameterAsLayerList(parameters, self.RASTERS, context)}
+
+        return [rasters[name] for name in raster_expression.variables]
+
+    def checkParameterValues(self, parameters, context):
+
+        try:
+            raster_expression = self.parameterAsRasterExpression(parameters, context)
+        except QgsProcessingException as e:
+            return False, str(e)
+
+        rasters = self.parameterAsExpressionRasters(parameters, context, raster_expression)
+
+        if not verify_one_band(rasters):
+
+            msg = "Input rasters can have only one band. One of them has other band number."
+
+            return False, msg
+
+        output_data_type = self.parameterAsOutputDataType(parameters, context)
+
+        # quantized encoders clip values into [0, 1], raw values would be silently cut
+        if raster_expression.root.result_type == VALUES and output_data_type.quantized:
+
+            msg = (
+                "Expression results in raw values, which cannot be stored in output data type `{}`. "
+                "Use fuzzy membership in expression or floating point output data type."
+            ).format(output_data_type.name)
+
+            return False, msg
+
+        return super().checkParameterValues(parameters, context)
+
+    def processAlgorithm(self, parameters, context, feedback: QgsProcessingFeedback):
+
+        raster_band = 1
+
+        raster_expression = self.parameterAsRasterExpression(parameters, context)
+
+        rasters = self.parameterAsExpressionRasters(parameters, context, raster_expression)
+
+        feedback.pushInfo(
+            "Evaluating expression resulting in {} on rasters: {}.".format(
+                raster_expression.root.result_type, ", ".join(raster_expression.variables)
+            )
+        )
+
+        input_raster = rasters[0]
+
+        input_raster_nodata = input_raster.dataProvider().sourceNoDataValue(raster_band)
+
+        output_data_type = self.parameterAsOutputDataType(parameters, context)
+
+        output_options = self.parameterAsRasterOutputOptions(parameters, context)
+
+        creation_options = output_options.creation_options(output_data_type.data_type)
+
+        output_nodata = output_data_type.nodata_value(input_raster_nodata)
+
+        outputs = {self.OUTPUT: self.parameterAsOutputLayer(parameters, self.OUTPUT, context)}
+
+        if raster_expression.root.result_type == POSSIBILISTIC:
+
+            path_necessity_raster = self.parameterAsOutputLayer(parameters, self.OUTPUT_NECESSITY, context)
+
+            # results without matching output are not written
+            if path_necessity_raster:
+                outputs[self.OUTPUT_NECESSITY] = path_necessity_raster
+            else:
+                feedback.pushWarning("Output for necessity not specified, only possibility is written.")
+
+        area_of_interest = self.parameterAsAreaOfInterest(parameters, context, input_raster)
+
+        output_dps = [
+            self.createOutputRaster(
+                path,
+                input_raster,
+                output_data_type,
+                creation_options,
+                output_nodata,
+                output_window=area_of_interest.output_window,
+            )
+            for path in outputs.values()
+        ]
+
+        resampling_method = self.parameterAsResamplingMethod(parameters, context)
+
+        transform_context = context.transformContext()
+
+        if not verify_grid_equal(rasters):
+            feedback.pushInfo("Inputs are read into the grid of the first raster, reprojected and resampled.")
+
+        windows, threads = self.parameterAsTilePlan(
+            parameters,
+            context,
+            input_raster,
+            streams=len(rasters) + len(output_dps),
+            feedback=feedback,
+            area_of_interest=area_of_interest,
+        )
+
+        processor = TileProcessor(
+            [
+                RasterPart(raster, raster_band, threads, input_raster, resampling_method, transform_context)
+                for raster in rasters
+            ],
+            output_dps,
+            raster_expression,
+            output_nodata,
+            threads,
+            output_data_type=output_data_type,
+            area_of_interest=area_of_interest,
+        )
+
+        completed = processor.run(windows, feedback)
+
+        statistics = self.reportTileStatistics(processor.statistics, feedback)
+
+        del processor, output_dps
+
+        # partial outputs of canceled run are not finalized
+        if completed:
+            for path in outputs.values():
+                self.finalizeOutputRaster(path, output_data_type, output_options)
+
+        return {**outputs, self.OUTPUT_STATISTICS: statistics}
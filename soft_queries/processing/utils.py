@@ -1,20 +1,192 @@
 from __future__ import annotations
 
+import math
+import os
 from dataclasses import dataclass
 from pathlib import Path
-from typing import List
+from queue import Queue
+from typing import List, Optional, Tuple
 
+import numpy as np
+from osgeo import gdal
 from qgis.core import (
     Qgis,
+    QgsCoordinateTransformContext,
+    QgsDataProvider,
+    QgsProject,
+    QgsProviderRegistry,
+    QgsRasterBandStats,
     QgsRasterBlock,
+    QgsRasterBlockFeedback,
     QgsRasterDataProvider,
     QgsRasterFileWriter,
-    QgsRasterIterator,
+    QgsRasterInterface,
     QgsRasterLayer,
+    QgsRasterNuller,
+    QgsRasterProjector,
+    QgsRectangle,
+    QgsSettings,
 )
+from qgis.PyQt.QtCore import QByteArray
 
+NUMPY_DATA_TYPES = {
+    Qgis.Byte: np.uint8,
+    Qgis.UInt16: np.uint16,
+    Qgis.Int16: np.int16,
+    Qgis.UInt32: np.uint32,
+    Qgis.Int32: np.int32,
+    Qgis.Float32: np.float32,
+    Qgis.Float64: np.float64,
+}
 
-def create_raster_writer(path_raster: str) -> QgsRasterFileWriter:
+# memory budget for all tiles held at once during processing
+DEFAULT_MEMORY_BUDGET_MB = 1024
+
+# QGIS settings with global defaults of memory budget (MB) and number of threads (0 - number of CPUs)
+SETTINGS_MEMORY_BUDGET_MB = "SoftQueries/memoryBudgetMB"
+SETTINGS_THREADS = "SoftQueries/threads"
+
+# tiles queued for computation per thread when processing in parallel
+TILES_IN_FLIGHT_PER_THREAD = 2
+
+# largest number of distinct integer values that are evaluated into lookup table
+LOOKUP_TABLE_MAX_SIZE = 2**16
+
+# number of pixels sampled for statistics of integer rasters with wider data types
+LOOKUP_TABLE_STATISTICS_SAMPLE_SIZE = 250000
+
+# bytes held per pixel of every input/output stream during tile computation (float64 value plus temporaries)
+BYTES_PER_PIXEL_STREAM = 16
+
+
+@dataclass(frozen=True)
+class OutputDataType:
+    """
+    Data type of output rasters. Quantized types store values from [0, 1] as integers multiplied by `1 / scale`,
+    the scale is stored in the raster metadata and the highest value of the type is reserved for no data.
+    """
+
+    name: str
+    data_type: Qgis.DataType
+    scale: float = 1.0
+    quantized_nodata: Optional[int] = None
+
+    @property
+    def quantized(self) -> bool:
+        return self.quantized_nodata is not None
+
+    def nodata_value(self, input_nodata_value: float) -> float:
+
+        if self.quantized:
+            return self.quantized_nodata
+
+        return input_nodata_value
+
+    def encode(self, values: np.ndarray, nodata_mask: np.ndarray) -> np.ndarray:
+
+        if not self.quantized:
+            return values
+
+        return np.rint(np.clip(np.where(nodata_mask, 0.0, values), 0.0, 1.0) / self.scale)
+
+
+OUTPUT_DATA_TYPES = [
+    OutputDataType("Float64", Qgis.Float64),
+    OutputDataType("Float32", Qgis.Float32),
+    OutputDataType("UInt16 (quantized)", Qgis.UInt16, 1 / 65534, 65535),
+    OutputDataType("UInt8 (quantized)", Qgis.Byte, 1 / 254, 255),
+]
+
+
+COMPRESSIONS = ["NONE", "DEFLATE", "ZSTD", "LZW"]
+
+BIGTIFF_MODES = ["IF_SAFER", "YES", "NO"]
+
+# width and height of blocks of tiled outputs
+OUTPUT_BLOCK_SIZE = 256
+
+# working copies of incremental runs are not compressed, so rewritten tiles keep their place in the file
+WORKING_COPY_CREATION_OPTIONS = [
+    "BIGTIFF=IF_SAFER",
+    "TILED=YES",
+    "BLOCKXSIZE={}".format(OUTPUT_BLOCK_SIZE),
+    "BLOCKYSIZE={}".format(OUTPUT_BLOCK_SIZE),
+]
+
+# overviews are added until the smaller side of the last one is less than this
+OVERVIEW_MIN_SIZE = 256
+
+# bands of two-band possibilistic rasters, GTiff stores bands of a pixel next to each other (INTERLEAVE=PIXEL)
+POSSIBILITY_BAND = 1
+NECESSITY_BAND = 2
+
+POSSIBILISTIC_BAND_DESCRIPTIONS = ["possibility", "necessity"]
+
+# resampling of inputs read into grid of reference raster
+RESAMPLING_METHODS = {
+    "Nearest neighbour": QgsRasterDataProvider.ResamplingMethod.Nearest,
+    "Bilinear": QgsRasterDataProvider.ResamplingMethod.Bilinear,
+    "Cubic": QgsRasterDataProvider.ResamplingMethod.Cubic,
+}
+
+
+@dataclass(frozen=True)
+class RasterOutputOptions:
+    """Layout of output GeoTIFF files, options are ignored for other formats."""
+
+    compression: str = "DEFLATE"
+    tiled: bool = True
+    bigtiff: str = "IF_SAFER"
+    cog: bool = False
+    overviews: bool = True
+
+    def predictor(self, data_type: Qgis.DataType) -> str:
+
+        if data_type in [Qgis.Float32, Qgis.Float64]:
+            return "3"
+
+        return "2"
+
+    def creation_options(self, data_type: Qgis.DataType) -> List[str]:
+
+        options = ["BIGTIFF={}".format(self.bigtiff)]
+
+        if self.tiled:
+            options += [
+                "TILED=YES",
+                "BLOCKXSIZE={}".format(OUTPUT_BLOCK_SIZE),
+                "BLOCKYSIZE={}".format(OUTPUT_BLOCK_SIZE),
+            ]
+
+        if self.compression != "NONE":
+            options += ["COMPRESS={}".format(self.compression), "PREDICTOR={}".format(self.predictor(data_type))]
+
+        return options
+
+    @property
+    def updatable_in_place(self) -> bool:
+        """Rewritten tiles of uncompressed GeoTIFF keep their place in the file, compressed ones are appended."""
+
+        return self.compression == "NONE" and not self.cog
+
+    def cog_creation_options(self, data_type: Qgis.DataType) -> List[str]:
+
+        options = ["BIGTIFF={}".format(self.bigtiff), "COMPRESS={}".format(self.compression), "RESAMPLING=AVERAGE"]
+
+        if self.compression != "NONE":
+            options.append("PREDICTOR={}".format(self.predictor(data_type)))
+
+        if not self.overviews:
+            options.append("OVERVIEWS=NONE")
+
+        return options
+
+
+def is_geotiff(path_raster: str) -> bool:
+    return Path(path_raster).suffix.lower() in [".tif", ".tiff"]
+
+
+def create_raster_writer(path_raster: str, creation_options: Optional[List[str]] = None) -> QgsRasterFileWriter:
 
     raster_writer = QgsRasterFileWriter(path_raster)
 
@@ -26,19 +198,211 @@ def create_raster_writer(path_raster: str) -> QgsRasterFileWriter:
 
     raster_writer.setOutputFormat(driver)
 
+    if creation_options and driver == "GTiff":
+        raster_writer.setCreateOptions(creation_options)
+
     return raster_writer
 
 
-def create_raster(raster_writer: QgsRasterFileWriter, template_raster: QgsRasterLayer) -> QgsRasterDataProvider:
+def create_raster(
+    raster_writer: QgsRasterFileWriter,
+    template_raster: QgsRasterLayer,
+    data_type: Qgis.DataType = Qgis.Float64,
+    window: Optional[RasterWindow] = None,
+) -> QgsRasterDataProvider:
+    """Raster on the grid of `template_raster`, covering only its `window` if specified."""
+
+    if window is None:
+        return raster_writer.createOneBandRaster(
+            data_type,
+            template_raster.width(),
+            template_raster.height(),
+            template_raster.extent(),
+            template_raster.crs(),
+        )
 
     return raster_writer.createOneBandRaster(
-        Qgis.Float64,
-        template_raster.width(),
-        template_raster.height(),
-        template_raster.extent(),
+        data_type,
+        window.width,
+        window.height,
+        window_extent(template_raster, window),
+        template_raster.crs(),
+    )
+
+
+def open_raster_for_update(path: str) -> Optional[QgsRasterDataProvider]:
+    """Existing raster opened for writing, e.g. to continue writing into partial output."""
+
+    raster_dp = QgsProviderRegistry.instance().createProvider("gdal", path, QgsDataProvider.ProviderOptions())
+
+    if raster_dp is None or not raster_dp.isValid():
+        return None
+
+    if not raster_dp.isEditable() and not raster_dp.setEditable(True):
+        return None
+
+    return raster_dp
+
+
+def flush_raster_provider(raster_dp: QgsRasterDataProvider) -> None:
+    """Writes cached blocks of raster to disk, GDAL closes the dataset when switched to read only and reopens it."""
+
+    if raster_dp.isEditable():
+        raster_dp.setEditable(False)
+        raster_dp.setEditable(True)
+
+
+def create_multiband_raster(
+    raster_writer: QgsRasterFileWriter,
+    template_raster: QgsRasterLayer,
+    band_count: int,
+    data_type: Qgis.DataType = Qgis.Float64,
+    window: Optional[RasterWindow] = None,
+) -> QgsRasterDataProvider:
+
+    if window is None:
+        return raster_writer.createMultiBandRaster(
+            data_type,
+            template_raster.width(),
+            template_raster.height(),
+            template_raster.extent(),
+            template_raster.crs(),
+            band_count,
+        )
+
+    return raster_writer.createMultiBandRaster(
+        data_type,
+        window.width,
+        window.height,
+        window_extent(template_raster, window),
         template_raster.crs(),
+        band_count,
+    )
+
+
+def set_raster_scale_offset(path_raster: str, scale: float, offset: float = 0.0) -> None:
+
+    dataset = gdal.Open(path_raster, gdal.GA_Update)
+
+    if dataset is None:
+        raise ValueError("Raster `{}` cannot be opened for update.".format(path_raster))
+
+    for i in range(1, dataset.RasterCount + 1):
+        band = dataset.GetRasterBand(i)
+
+        band.SetScale(scale)
+        band.SetOffset(offset)
+
+    dataset.FlushCache()
+
+    del dataset
+
+
+def set_raster_band_descriptions(path_raster: str, descriptions: List[str]) -> None:
+
+    dataset = gdal.Open(path_raster, gdal.GA_Update)
+
+    if dataset is None:
+        raise ValueError("Raster `{}` cannot be opened for update.".format(path_raster))
+
+    for i, description in enumerate(descriptions):
+        dataset.GetRasterBand(i + 1).SetDescription(description)
+
+    dataset.FlushCache()
+
+    del dataset
+
+
+def overview_levels(width: int, height: int, min_size: int = OVERVIEW_MIN_SIZE) -> List[int]:
+
+    levels = []
+    level = 2
+
+    while min_size <= min(width, height) / level * 2:
+        levels.append(level)
+        level *= 2
+
+    return levels
+
+
+def build_overviews(path_raster: str) -> None:
+
+    dataset = gdal.Open(path_raster, gdal.GA_Update)
+
+    if dataset is None:
+        raise ValueError("Raster `{}` cannot be opened for update.".format(path_raster))
+
+    levels = overview_levels(dataset.RasterXSize, dataset.RasterYSize)
+
+    if levels:
+        dataset.BuildOverviews("AVERAGE", levels)
+
+    del dataset
+
+
+def convert_to_cog(path_raster: str, creation_options: List[str]) -> None:
+
+    path_cog = "{}.cog{}".format(*os.path.splitext(path_raster))
+
+    dataset = gdal.Translate(path_cog, path_raster, format="COG", creationOptions=creation_options)
+
+    if dataset is None:
+        raise ValueError("Raster `{}` cannot be converted to Cloud Optimized GeoTIFF.".format(path_raster))
+
+    del dataset
+
+    os.replace(path_cog, path_raster)
+
+
+def copy_raster(path_source: str, path_raster: str, creation_options: List[str]) -> None:
+    """Replaces `path_raster` by copy of `path_source`, through temporary file so failed copy keeps the raster."""
+
+    path_copy = "{}.copy{}".format(*os.path.splitext(path_raster))
+
+    driver = QgsRasterFileWriter.driverForExtension(Path(path_raster).suffix.replace(".", ""))
+
+    dataset = gdal.Translate(
+        path_copy, path_source, format=driver, creationOptions=creation_options if driver == "GTiff" else []
     )
 
+    if dataset is None:
+        raise ValueError("Raster `{}` cannot be copied into `{}`.".format(path_source, path_raster))
+
+    del dataset
+
+    os.replace(path_copy, path_raster)
+
+
+def apply_scale_offset(values: np.ndarray, scale: Optional[float], offset: Optional[float]) -> np.ndarray:
+
+    scale = 1.0 if scale is None else scale
+    offset = 0.0 if offset is None else offset
+
+    if scale == 1.0 and offset == 0.0:
+        return values
+
+    return values * scale + offset
+
+
+def parse_weights(value: str, count: int) -> Optional[List[float]]:
+    """Weights separated by comma, one for each of `count` inputs, from [0, 1]. None if `value` is empty."""
+
+    if not value or not value.strip():
+        return None
+
+    try:
+        weights = [float(weight) for weight in value.split(",")]
+    except ValueError:
+        raise ValueError("Weights `{}` are not numbers separated by comma.".format(value))
+
+    if len(weights) != count:
+        raise ValueError("Number of weights ({}) does not match number of inputs ({}).".format(len(weights), count))
+
+    if not all(0 <= weight <= 1 for weight in weights):
+        raise ValueError("Weights have to be from interval [0, 1].")
+
+    return weights
+
 
 def verify_crs_equal(rasters: List[QgsRasterLayer]) -> bool:
 
@@ -91,6 +455,11 @@ def verify_extent_equal(rasters: List[QgsRasterLayer]) -> bool:
     return True
 
 
+def verify_grid_equal(rasters: List[QgsRasterLayer]) -> bool:
+
+    return verify_crs_equal(rasters) and verify_size_equal(rasters) and verify_extent_equal(rasters)
+
+
 def verify_one_band(rasters: List[QgsRasterLayer]) -> bool:
 
     for raster in rasters:
@@ -106,103 +475,445 @@ def feedback_total(data_block: QgsRasterBlock):
     return 100.0 / (data_block.height() * data_block.width()) if data_block.height() and data_block.width() else 0
 
 
-def create_raster_iterator(input_raster: QgsRasterLayer, raster_band: int = 1) -> QgsRasterIterator:
+def raster_file_path(input_raster: QgsRasterLayer) -> Optional[str]:
+
+    if input_raster.providerType() != "gdal":
+        return None
+
+    return QgsProviderRegistry.instance().decodeUri("gdal", input_raster.source()).get("path")
+
+
+def raster_block_size(input_raster: QgsRasterLayer, raster_band: int = 1) -> Optional[Tuple[int, int]]:
+
+    path = raster_file_path(input_raster)
+
+    if not path:
+        return None
+
+    dataset = gdal.Open(path)
+
+    if dataset is None or raster_band > dataset.RasterCount:
+        return None
+
+    block_width, block_height = dataset.GetRasterBand(raster_band).GetBlockSize()
+
+    return block_width, block_height
+
+
+def settings_int_value(key: str, default: int) -> int:
+
+    try:
+        return int(QgsSettings().value(key, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def settings_memory_budget_mb() -> int:
+    return settings_int_value(SETTINGS_MEMORY_BUDGET_MB, DEFAULT_MEMORY_BUDGET_MB)
+
+
+def settings_threads() -> int:
+    return settings_int_value(SETTINGS_THREADS, 0)
+
+
+def tiles_in_flight(threads: int) -> int:
+    """Number of tiles held in memory at once, queued tiles of all threads plus the tile being written."""
+
+    if threads <= 1:
+        return 1
+
+    return TILES_IN_FLIGHT_PER_THREAD * threads + 1
+
+
+def plan_threads(
+    input_raster: QgsRasterLayer,
+    streams: int = 2,
+    memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB,
+    threads: int = 1,
+    tile_width: int = 0,
+    tile_height: int = 0,
+    raster_band: int = 1,
+) -> int:
+    """
+    Highest number of threads up to `threads` whose tiles in flight fit into `memory_budget_mb`, with tiles of the
+    given size or at least one block of the raster.
+    """
+
+    width = input_raster.width()
+    height = input_raster.height()
+
+    if 0 < tile_width and 0 < tile_height:
+        tile_pixels = min(tile_width, width) * min(tile_height, height)
+
+    else:
+        block_width, block_height = raster_block_size(input_raster, raster_band) or (width, 1)
+
+        tile_pixels = min(block_width, width) * min(block_height, height)
+
+    budget_tiles = memory_budget_mb * 1024 * 1024 / (BYTES_PER_PIXEL_STREAM * max(1, streams) * max(1, tile_pixels))
+
+    while threads > 1 and tiles_in_flight(threads) > budget_tiles:
+        threads -= 1
+
+    return max(1, threads)
 
-    input_raster_dp = input_raster.dataProvider()
 
-    raster_iter = QgsRasterIterator(input_raster_dp)
+def plan_tile_size(
+    input_raster: QgsRasterLayer,
+    streams: int = 2,
+    memory_budget_mb: int = DEFAULT_MEMORY_BUDGET_MB,
+    tile_width: int = 0,
+    tile_height: int = 0,
+    raster_band: int = 1,
+    threads: int = 1,
+    output_block_size: Optional[Tuple[int, int]] = None,
+) -> Tuple[int, int]:
+    """
+    Tile size for which all tiles in flight of `threads` threads fit into `memory_budget_mb`. Planned tiles are aligned
+    to blocks of the source and to blocks of tiled output of `output_block_size`, if specified.
+    """
 
-    raster_iter.startRasterRead(
+    width = input_raster.width()
+    height = input_raster.height()
+
+    if 0 < tile_width and 0 < tile_height:
+        return min(tile_width, width), min(tile_height, height)
+
+    block_size = raster_block_size(input_raster, raster_band)
+
+    if block_size is None:
+        block_size = (width, 1)
+
+    max_pixels = max(
+        1,
+        int(memory_budget_mb * 1024 * 1024 / (BYTES_PER_PIXEL_STREAM * max(1, streams) * tiles_in_flight(threads))),
+    )
+
+    # every block of compressed output is written by exactly one tile, block written by two tiles would be compressed
+    # and appended to the file twice, tiles are aligned to blocks of the source too if such tiles fit into the budget
+    if output_block_size is not None:
+        common_block_size = tuple(
+            block * output_block // math.gcd(block, output_block)
+            for block, output_block in zip(block_size, output_block_size)
+        )
+
+        if common_block_size[0] * common_block_size[1] <= max_pixels:
+            block_size = common_block_size
+        else:
+            block_size = output_block_size
+
+    block_width, block_height = block_size
+
+    if tile_width <= 0:
+        if width * block_height <= max_pixels:
+            # whole rows of blocks, every block of the source is decoded exactly once
+            tile_width = width
+
+        else:
+            tile_width = max(1, max_pixels // (block_height * block_width)) * block_width
+
+    if tile_height <= 0:
+        tile_height = max(1, max_pixels // (tile_width * block_height)) * block_height
+
+    return min(tile_width, width), min(tile_height, height)
+
+
+def integer_value_range(input_raster: QgsRasterLayer, raster_band: int = 1) -> Optional[Tuple[int, int]]:
+    """
+    Range of values of integer raster for lookup table, from the data type for 8 and 16 bit types and from sampled
+    statistics for wider ones. None if raster is not integer or range is too wide.
+    """
+
+    raster_dp = input_raster.dataProvider()
+
+    numpy_type = NUMPY_DATA_TYPES.get(raster_dp.dataType(raster_band))
+
+    # scaled integer rasters are read as floats
+    if numpy_type is None or np.dtype(numpy_type).kind not in "iu":
+        return None
+
+    type_info = np.iinfo(numpy_type)
+
+    if int(type_info.max) - int(type_info.min) < LOOKUP_TABLE_MAX_SIZE:
+        return int(type_info.min), int(type_info.max)
+
+    stats = raster_dp.bandStatistics(
         raster_band,
-        input_raster_dp.xSize(),
-        input_raster_dp.ySize(),
-        input_raster_dp.extent(),
+        QgsRasterBandStats.Min | QgsRasterBandStats.Max,
+        QgsRectangle(),
+        LOOKUP_TABLE_STATISTICS_SAMPLE_SIZE,
     )
 
-    raster_iter.setMaximumTileHeight(1)
-    raster_iter.setMaximumTileHeight(1)
+    value_min = int(np.floor(stats.minimumValue))
+    value_max = int(np.ceil(stats.maximumValue))
+
+    if LOOKUP_TABLE_MAX_SIZE <= value_max - value_min:
+        return None
+
+    return value_min, value_max
+
+
+def block_to_array(raster_block: QgsRasterBlock) -> np.ndarray:
+
+    data_type = raster_block.dataType()
+
+    if data_type not in NUMPY_DATA_TYPES:
+        raise ValueError("Raster data type `{}` is not supported.".format(data_type))
+
+    values = np.frombuffer(bytes(raster_block.data()), dtype=NUMPY_DATA_TYPES[data_type])
+
+    return values.reshape(raster_block.height(), raster_block.width())
+
 
-    return raster_iter
+def array_nodata_mask(values: np.ndarray, nodata_value: Optional[float]) -> np.ndarray:
 
+    if values.dtype.kind == "f":
+        mask = np.isnan(values)
+    else:
+        mask = np.zeros(values.shape, dtype=bool)
 
-def create_empty_block(input_block: QgsRasterBlock) -> QgsRasterBlock:
+    if nodata_value is not None:
+        if values.dtype.kind == "f":
+            # compare in precision of the data, so that Float32 no data values match
+            nodata_value = values.dtype.type(nodata_value)
 
-    new_block = QgsRasterBlock(Qgis.Float64, input_block.width(), input_block.height())
+        mask |= values == nodata_value
 
-    new_block.setNoDataValue(input_block.noDataValue())
+    return mask
 
-    return new_block
+
+def block_nodata_mask(raster_block: QgsRasterBlock, values: np.ndarray) -> np.ndarray:
+
+    if raster_block.hasNoDataValue():
+        return array_nodata_mask(values, raster_block.noDataValue())
+
+    mask = array_nodata_mask(values, None)
+
+    if raster_block.hasNoData():
+        # no data value is not set but block still contains no data pixels (bitmap), slow path, blocks that can have
+        # the bitmap are read by `read_nulled_block` instead
+        width = raster_block.width()
+
+        for i in range(values.size):
+            if raster_block.isNoData(i):
+                mask[i // width, i % width] = True
+
+    return mask
+
+
+def nodata_sentinels(data_type: Qgis.DataType) -> Tuple[float, float]:
+    """
+    No data values written into blocks of `data_type` by `read_nulled_block`. NaN of floating point types is always no
+    data, integer value is no data only if it reads as the first sentinel and as the second one.
+    """
+
+    numpy_type = NUMPY_DATA_TYPES.get(data_type)
+
+    if numpy_type is None or np.issubdtype(numpy_type, np.floating):
+        return np.nan, np.nan
+
+    info = np.iinfo(numpy_type)
+
+    return float(info.max), float(info.min)
+
+
+def read_nulled_block(
+    nuller: QgsRasterNuller,
+    band: int,
+    extent: QgsRectangle,
+    width: int,
+    height: int,
+    feedback: Optional[QgsRasterBlockFeedback] = None,
+) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Values and no data mask of block read through `nuller`. Blocks without no data value mark no data pixels in bitmap
+    that can only be read pixel by pixel, nuller writes sentinel no data value into such pixels instead. Integer block
+    with pixels equal to the sentinel is read once more with the second sentinel. Returns None for invalid block.
+    """
+
+    first_sentinel, second_sentinel = nodata_sentinels(nuller.dataType(band))
+
+    nuller.setOutputNoDataValue(band, first_sentinel)
+
+    block = nuller.block(band, extent, width, height, feedback)
+
+    if not block.isValid() or block.isEmpty():
+        return None
+
+    values = block_to_array(block)
+
+    mask = array_nodata_mask(values, first_sentinel)
+
+    if not np.isnan(first_sentinel) and mask.any():
+        nuller.setOutputNoDataValue(band, second_sentinel)
+
+        second_values = block_to_array(nuller.block(band, extent, width, height, feedback))
+
+        mask &= second_values == second_values.dtype.type(second_sentinel)
+
+    return values, mask
+
+
+def array_to_block(
+    values: np.ndarray, nodata_mask: np.ndarray, nodata_value: float, data_type: Qgis.DataType = Qgis.Float64
+) -> QgsRasterBlock:
+
+    height, width = values.shape
+
+    values = values.astype(NUMPY_DATA_TYPES[data_type], copy=True)
+    values[nodata_mask] = nodata_value
+
+    raster_block = QgsRasterBlock(data_type, width, height)
+
+    raster_block.setNoDataValue(nodata_value)
+
+    raster_block.setData(QByteArray(values.tobytes()))
+
+    return raster_block
 
 
 def writeBlock(
     raster_dp: QgsRasterDataProvider,
-    raster_block: QgsRasterDataProvider,
-    raster_part: RasterPart,
+    raster_block: QgsRasterBlock,
+    window: RasterWindow,
+    raster_band: int = 1,
 ) -> None:
 
     raster_dp.writeBlock(
         raster_block,
-        raster_part.raster_band,
-        raster_part.top_left_col,
-        raster_part.top_left_row,
+        raster_band,
+        window.col,
+        window.row,
     )
 
 
 @dataclass
-class RasterPart:
+class RasterWindow:
+
+    __slots__ = ("col", "row", "width", "height")
+
+    col: int
+    row: int
+    width: int
+    height: int
+
+    @property
+    def size(self) -> int:
+        return self.width * self.height
 
-    __slots__ = (
-        "input_raster",
-        "raster_band",
-        "raster_it",
-        "correct",
-        "n_cols",
-        "n_rows",
-        "data_block",
-        "top_left_col",
-        "top_left_row",
-    )
 
-    input_raster: QgsRasterLayer
-    raster_band: int
+def raster_windows(width: int, height: int, tile_width: int, tile_height: int) -> List[RasterWindow]:
 
-    raster_it: QgsRasterIterator
+    windows = []
 
-    correct: bool
-    n_cols: int
-    n_rows: int
-    data_block: QgsRasterBlock
-    top_left_col: int
-    top_left_row: int
+    for row in range(0, height, tile_height):
+        for col in range(0, width, tile_width):
+            windows.append(RasterWindow(col, row, min(tile_width, width - col), min(tile_height, height - row)))
 
-    def __init__(self, input_raster: QgsRasterLayer, raster_band: int = 1) -> None:
+    return windows
+
+
+def window_extent(input_raster: QgsRasterLayer, window: RasterWindow) -> QgsRectangle:
+
+    extent = input_raster.extent()
+
+    pixel_width = input_raster.rasterUnitsPerPixelX()
+    pixel_height = input_raster.rasterUnitsPerPixelY()
+
+    x_min = extent.xMinimum() + window.col * pixel_width
+    y_max = extent.yMaximum() - window.row * pixel_height
+
+    return QgsRectangle(x_min, y_max - window.height * pixel_height, x_min + window.width * pixel_width, y_max)
+
+
+class RasterPart:
+    """
+    Reads windows of `raster_band` of `input_raster`. Windows are in the grid of `reference_raster` (the input raster
+    itself by default), input on another grid is reprojected and resampled by `resampling_method` block by block.
+    """
+
+    __slots__ = ("input_raster", "raster_band", "reference_raster", "readers")
+
+    def __init__(
+        self,
+        input_raster: QgsRasterLayer,
+        raster_band: int = 1,
+        threads: int = 1,
+        reference_raster: Optional[QgsRasterLayer] = None,
+        resampling_method: QgsRasterDataProvider.ResamplingMethod = QgsRasterDataProvider.ResamplingMethod.Nearest,
+        transform_context: Optional[QgsCoordinateTransformContext] = None,
+    ) -> None:
 
         self.input_raster = input_raster
         self.raster_band = int(raster_band)
-        self.raster_it = create_raster_iterator(input_raster, self.raster_band)
+        self.reference_raster = reference_raster or input_raster
 
-        self.nextData()
+        aligned = verify_grid_equal([self.input_raster, self.reference_raster])
+        reproject = not verify_crs_equal([self.input_raster, self.reference_raster])
 
-    def nextData(self):
+        # every thread reads through its own clone of the data provider, clones are created here in the calling thread
+        # readers are pairs of interface to read from and interfaces it reads through, kept so they are not deleted
+        self.readers: "Queue[Tuple[QgsRasterInterface, List[QgsRasterInterface]]]" = Queue()
 
-        (
-            self.correct,
-            self.n_cols,
-            self.n_rows,
-            self.data_block,
-            self.top_left_col,
-            self.top_left_row,
-        ) = self.raster_it.readNextRasterPart(self.raster_band)
+        for _ in range(max(1, threads)):
+            provider = input_raster.dataProvider().clone()
+            reader = provider
+            interfaces = [provider]
 
-    @property
-    def data_range(self):
-        return self.data_block.height() * self.data_block.width()
+            if not aligned:
+                provider.enableProviderResampling(True)
+                provider.setZoomedInResamplingMethod(resampling_method)
+                provider.setZoomedOutResamplingMethod(resampling_method)
+
+            if reproject:
+                reader = QgsRasterProjector()
+                reader.setInput(provider)
+                reader.setCrs(
+                    self.input_raster.crs(),
+                    self.reference_raster.crs(),
+                    transform_context or QgsProject.instance().transformContext(),
+                )
+                interfaces.append(reader)
+
+            if not aligned:
+                # windows reaching out of the input have no data pixels, marked in bitmap if input has no no data value
+                reader = QgsRasterNuller()
+                reader.setInput(interfaces[-1])
+                interfaces.append(reader)
+
+            self.readers.put((reader, interfaces))
+
+    def with_band(self, raster_band: int) -> "RasterPart":
+        """Part reading another band of the same raster through the same data providers."""
+
+        part = RasterPart.__new__(RasterPart)
+
+        part.input_raster = self.input_raster
+        part.raster_band = int(raster_band)
+        part.reference_raster = self.reference_raster
+        part.readers = self.readers
+
+        return part
+
+    def read(self, window: RasterWindow) -> Tuple[np.ndarray, np.ndarray]:
+
+        reader, interfaces = self.readers.get()
+
+        extent = window_extent(self.reference_raster, window)
+
+        try:
+            if isinstance(reader, QgsRasterNuller):
+                result = read_nulled_block(reader, self.raster_band, extent, window.width, window.height)
+
+                if result is None:
+                    raise ValueError("Window {} of `{}` cannot be read.".format(window, self.input_raster.name()))
+
+                return result
 
-    def isNoData(self, index: int) -> bool:
-        return self.data_block.isNoData(index)
+            block = reader.block(self.raster_band, extent, window.width, window.height)
+        finally:
+            self.readers.put((reader, interfaces))
 
-    def value(self, index: int) -> float:
-        return self.data_block.value(index)
+        values = block_to_array(block)
 
-    def create_empty_block(self) -> QgsRasterBlock:
-        return create_empty_block(self.data_block)
+        return values, block_nodata_mask(block, values)
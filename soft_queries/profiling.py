@@ -0,0 +1,300 @@
+import cProfile
+import functools
+import inspect
+import io
+import os
+import pstats
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from qgis.core import QgsExpressionFunction
+
+from .text_constants import TextConstants
+from .utils import PROFILE_DEV, PROFILE_EXPRESSIONS_DEV, log
+
+# number of functions and allocation sites listed in profile summaries
+PROFILE_SUMMARY_LINES = 25
+
+
+def profile_folder() -> Path:
+    """Folder for profiles from `SOFTQUERIES_PROFILE_DIR`, by default `soft_queries_profiles` in temp folder."""
+
+    folder = os.environ.get(TextConstants.plugin_profile_dir_env_var)
+
+    if folder:
+        path = Path(folder)
+    else:
+        path = Path(tempfile.gettempdir()) / "soft_queries_profiles"
+
+    path.mkdir(parents=True, exist_ok=True)
+
+    return path
+
+
+def profile_name(name: str) -> str:
+    return "{}_{}_{}".format(name, datetime.now().strftime("%Y%m%d_%H%M%S_%f"), os.getpid())
+
+
+def start_tracemalloc() -> bool:
+    """Returns True if tracing was started by this call and should be stopped by the caller."""
+
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+        return False
+
+    tracemalloc.start()
+
+    return True
+
+
+def enable_profiler(profiler: cProfile.Profile) -> bool:
+
+    try:
+        profiler.enable()
+    except ValueError:
+        # other profiler is already active in this thread, e.g. expression function called in profiled algorithm
+        return False
+
+    return True
+
+
+def write_profile(
+    name: str,
+    stats: Optional[pstats.Stats],
+    wall_time: float,
+    peak_memory: int,
+    snapshot: Optional[tracemalloc.Snapshot],
+) -> Path:
+    """Dumps `stats` into `<name>.prof` and summary of time and memory into `<name>.txt`, returns path of summary."""
+
+    folder = profile_folder()
+
+    summary = io.StringIO()
+
+    summary.write("Wall time: {:.3f} s\n".format(wall_time))
+    summary.write("Peak traced memory: {:.1f} MB\n\n".format(peak_memory / 1024**2))
+
+    if stats is not None:
+        stats.dump_stats((folder / "{}.prof".format(name)).as_posix())
+
+        stats.stream = summary
+        stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(PROFILE_SUMMARY_LINES)
+
+    if snapshot is not None:
+        summary.write("Largest allocations by line:\n")
+
+        for statistic in snapshot.statistics("lineno")[:PROFILE_SUMMARY_LINES]:
+            summary.write("{}\n".format(statistic))
+
+    summary_path = folder / "{}.txt".format(name)
+
+    summary_path.write_text(summary.getvalue(), encoding="utf-8")
+
+    log("Profile written to `{}`.".format(summary_path))
+
+    return summary_path
+
+
+def single_thread_parameters(algorithm, parameters: Dict) -> Dict:
+    """
+    Copy of `parameters` running tiles of the algorithm in the calling thread, cProfile does not see work done by
+    worker threads or processes.
+    """
+
+    parameters = dict(parameters)
+
+    for name, value in [("THREADS", 1), ("BACKEND", 0)]:
+        parameter = getattr(algorithm, name, None)
+
+        if parameter and algorithm.parameterDefinition(parameter) is not None:
+            parameters[parameter] = value
+
+    return parameters
+
+
+def profiled_process_algorithm(process_algorithm: Callable) -> Callable:
+    """
+    Runs `processAlgorithm` under cProfile and tracemalloc. Tiles are processed in the thread running the algorithm,
+    so that the profile covers them, wall time is therefore that of a single thread run.
+    """
+
+    @functools.wraps(process_algorithm)
+    def wrapper(self, parameters, context, feedback):
+
+        parameters = single_thread_parameters(self, parameters)
+
+        feedback.pushInfo("Profiling, tiles are processed in a single thread.")
+
+        profiler = cProfile.Profile()
+
+        stop_tracing = start_tracemalloc()
+        profiling = enable_profiler(profiler)
+
+        start = time.perf_counter()
+
+        try:
+            return process_algorithm(self, parameters, context, feedback)
+
+        finally:
+            wall_time = time.perf_counter() - start
+
+            if profiling:
+                profiler.disable()
+
+            peak_memory = tracemalloc.get_traced_memory()[1]
+            snapshot = tracemalloc.take_snapshot()
+
+            if stop_tracing:
+                tracemalloc.stop()
+
+            summary_path = write_profile(
+                profile_name(self.name()),
+                pstats.Stats(profiler) if profiling else None,
+                wall_time,
+                peak_memory,
+                snapshot,
+            )
+
+            feedback.pushInfo("Profile of the run written to `{}`.".format(summary_path))
+
+    wrapper.profiled = True
+
+    return wrapper
+
+
+def profile_algorithm(algorithm_class: type) -> type:
+    """Wraps `processAlgorithm` of the algorithm class by profiler, if profiling is on (`SOFTQUERIES_DEV=profile`)."""
+
+    if PROFILE_DEV and not getattr(algorithm_class.processAlgorithm, "profiled", False):
+        algorithm_class.processAlgorithm = profiled_process_algorithm(algorithm_class.processAlgorithm)
+
+    return algorithm_class
+
+
+class ExpressionProfiler:
+    """
+    Accumulates profiles of expression function calls over the session, per function and thread, until `write` is
+    called. Memory is traced from `start`.
+    """
+
+    def __init__(self) -> None:
+
+        self.profilers: Dict[Tuple[str, int], cProfile.Profile] = {}
+        self.calls: Dict[str, int] = {}
+        self.times: Dict[str, float] = {}
+        self.lock = threading.Lock()
+
+        self.started: Optional[float] = None
+        self.stop_tracing = False
+
+    def start(self) -> None:
+
+        if self.started is None:
+            self.started = time.perf_counter()
+            self.stop_tracing = start_tracemalloc()
+
+    def profiler(self, name: str) -> cProfile.Profile:
+
+        with self.lock:
+            return self.profilers.setdefault((name, threading.get_ident()), cProfile.Profile())
+
+    def wrap(self, function: Callable) -> Callable:
+
+        name = function.__name__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+
+            profiler = self.profiler(name)
+
+            profiling = enable_profiler(profiler)
+
+            start = time.perf_counter()
+
+            try:
+                return function(*args, **kwargs)
+
+            finally:
+                elapsed = time.perf_counter() - start
+
+                if profiling:
+                    profiler.disable()
+
+                with self.lock:
+                    self.calls[name] = self.calls.get(name, 0) + 1
+                    self.times[name] = self.times.get(name, 0.0) + elapsed
+
+        # QGIS inspects arguments of the function to decide if it takes context
+        wrapper.__signature__ = inspect.signature(function)
+        wrapper.profiled = True
+
+        return wrapper
+
+    def write(self) -> List[Path]:
+        """Writes profiles of functions called since the last write, returns paths of summaries."""
+
+        if self.started is None:
+            return []
+
+        with self.lock:
+            profilers = self.profilers
+            calls = self.calls
+            times = self.times
+
+            self.profilers, self.calls, self.times = {}, {}, {}
+
+        wall_time = time.perf_counter() - self.started
+        peak_memory = tracemalloc.get_traced_memory()[1]
+
+        summary_paths = []
+
+        for name in sorted(calls):
+            stats = None
+
+            for (profiler_name, _), profiler in profilers.items():
+                if profiler_name != name or not profiler.getstats():
+                    continue
+
+                if stats is None:
+                    stats = pstats.Stats(profiler)
+                else:
+                    stats.add(profiler)
+
+            log("Expression function `{}` called {} times, {:.3f} s in total.".format(name, calls[name], times[name]))
+
+            summary_paths.append(write_profile(profile_name(name), stats, wall_time, peak_memory, None))
+
+        return summary_paths
+
+    def stop(self) -> List[Path]:
+
+        summary_paths = self.write()
+
+        if self.stop_tracing:
+            tracemalloc.stop()
+
+        self.started = None
+        self.stop_tracing = False
+
+        return summary_paths
+
+
+EXPRESSION_PROFILER = ExpressionProfiler()
+
+
+def profile_expression_functions(functions: List[QgsExpressionFunction]) -> None:
+    """Wraps Python functions of expression functions by profiler, if profiling of expressions is on."""
+
+    if not PROFILE_EXPRESSIONS_DEV:
+        return
+
+    EXPRESSION_PROFILER.start()
+
+    for function in functions:
+        if not getattr(function.function, "profiled", False):
+            function.function = EXPRESSION_PROFILER.wrap(function.function)
@@ -1,13 +1,19 @@
 import configparser
 from pathlib import Path
 
-from qgis.core import QgsProcessingProvider
+from qgis.core import QgsProcessingAlgorithm, QgsProcessingProvider
 from qgis.PyQt.QtGui import QIcon
 
+from .processing.tool_fuzzy_aggregation import FuzzyAggregationAlgorithm
 from .processing.tool_fuzzy_membership import FuzzyMembershipAlgorithm
+from .processing.tool_fuzzy_membership_layer import FuzzyMembershipLayerAlgorithm
+from .processing.tool_fuzzy_membership_multiple import FuzzyMembershipMultipleAlgorithm
 from .processing.tool_fuzzy_operation import FuzzyOperationAlgorithm
+from .processing.tool_possibilistic_aggregation import PossibilisticAggregationAlgorithm
 from .processing.tool_possibilistic_membership import PossibilisticMembershipAlgorithm
 from .processing.tool_possibilistic_operation import PossibilisticOperationAlgorithm
+from .processing.tool_raster_expression import RasterExpressionAlgorithm
+from .profiling import profile_algorithm
 from .text_constants import TextConstants
 from .utils import get_icon_path
 
@@ -29,14 +35,26 @@ class SoftQueriesProvider(QgsProcessingProvider):
 
         return True
 
+    def addAlgorithm(self, algorithm: QgsProcessingAlgorithm) -> bool:
+
+        # with `SOFTQUERIES_DEV=profile` every run of the algorithm is profiled
+        profile_algorithm(type(algorithm))
+
+        return super().addAlgorithm(algorithm)
+
     def versionInfo(self):
         return self.version
 
     def loadAlgorithms(self):
         self.addAlgorithm(PossibilisticMembershipAlgorithm())
         self.addAlgorithm(FuzzyMembershipAlgorithm())
+        self.addAlgorithm(FuzzyMembershipMultipleAlgorithm())
         self.addAlgorithm(FuzzyOperationAlgorithm())
         self.addAlgorithm(PossibilisticOperationAlgorithm())
+        self.addAlgorithm(FuzzyAggregationAlgorithm())
+        self.addAlgorithm(PossibilisticAggregationAlgorithm())
+        self.addAlgorithm(RasterExpressionAlgorithm())
+        self.addAlgorithm(FuzzyMembershipLayerAlgorithm())
 
     def id(self):
         return TextConstants.plugin_id
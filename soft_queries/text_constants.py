@@ -2,6 +2,8 @@ class TextConstants:
 
     plugin_dev_env_var = "SOFTQUERIES_DEV"
 
+    plugin_profile_dir_env_var = "SOFTQUERIES_PROFILE_DIR"
+
     plugin_id = "softqueries"
 
     plugin_name = "Soft Queries"
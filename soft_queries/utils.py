@@ -11,10 +11,22 @@ from .text_constants import TextConstants
 
 LOG_DEV = False
 
+# profiling of algorithms, with `profile-expressions` also of expression functions
+PROFILE_DEV = False
+PROFILE_EXPRESSIONS_DEV = False
+
 if os.environ.get(TextConstants.plugin_dev_env_var):
-    if os.environ.get(TextConstants.plugin_dev_env_var).lower() == "true":
+    dev_mode = os.environ.get(TextConstants.plugin_dev_env_var).lower()
+
+    if dev_mode in ["true", "profile", "profile-expressions"]:
         LOG_DEV = True
 
+    if dev_mode in ["profile", "profile-expressions"]:
+        PROFILE_DEV = True
+
+    if dev_mode == "profile-expressions":
+        PROFILE_EXPRESSIONS_DEV = True
+
 
 def get_icons_folder() -> Path:
     return Path(__file__).parent / "icons"
@@ -0,0 +1,121 @@
+import json
+import os
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+import pytest
+from osgeo import gdal
+
+from tests.benchmarks.utils import (
+    BENCHMARK_BASELINE_ENV,
+    BENCHMARK_ENV,
+    BENCHMARK_TOLERANCE_ENV,
+    BENCHMARK_UPDATE_ENV,
+    generate_raster,
+)
+
+SyntheticRaster = Callable[..., str]
+
+
+def pytest_collection_modifyitems(config, items):
+
+    if os.environ.get(BENCHMARK_ENV):
+        return
+
+    skip = pytest.mark.skip(reason="Benchmarks run only with `{}` environment variable set.".format(BENCHMARK_ENV))
+
+    benchmarks_folder = Path(__file__).parent
+
+    for item in items:
+        if benchmarks_folder in Path(item.fspath).parents:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope="session")
+def synthetic_raster(tmp_path_factory) -> SyntheticRaster:
+    """Creates synthetic rasters once per session."""
+
+    folder = tmp_path_factory.mktemp("benchmark_rasters")
+
+    rasters: Dict[tuple, str] = {}
+
+    def raster(
+        size: int,
+        data_type: int = gdal.GDT_Float32,
+        nodata_density: float = 0.0,
+        tiled: bool = True,
+        value_range: Tuple[float, float] = (0.0, 1000.0),
+        seed: int = 0,
+    ) -> str:
+
+        key = (size, data_type, nodata_density, tiled, value_range, seed)
+
+        if key not in rasters:
+            path = (folder / "raster_{}.tif".format(len(rasters))).as_posix()
+
+            generate_raster(path, size, data_type, nodata_density, tiled, value_range, seed)
+
+            rasters[key] = path
+
+        return rasters[key]
+
+    return raster
+
+
+@pytest.fixture(scope="session")
+def benchmark_baseline():
+    """
+    Path of the baseline file and throughput of benchmarks in pixels per second from it. Measured values are written
+    into the file at the end of session if `SOFT_QUERIES_BENCHMARK_UPDATE` is set.
+    """
+
+    path = Path(os.environ.get(BENCHMARK_BASELINE_ENV, Path(__file__).parent / "baseline.json"))
+
+    baseline = json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+    measured: Dict[str, float] = {}
+
+    yield path, baseline, measured
+
+    if os.environ.get(BENCHMARK_UPDATE_ENV) and measured:
+        baseline.update(measured)
+        path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+@pytest.fixture
+def check_throughput(request, benchmark_baseline):
+    """
+    Records throughput of the benchmark and fails if it dropped below the baseline by more than the tolerance. Skips
+    the benchmark if there is no baseline to compare to, so that missing baseline is not mistaken for a pass.
+    """
+
+    baseline_path, baseline, measured = benchmark_baseline
+
+    tolerance = float(os.environ.get(BENCHMARK_TOLERANCE_ENV, 0.2))
+
+    def check(pixels_per_second: float) -> None:
+
+        name = request.node.name
+
+        measured[name] = round(pixels_per_second, 1)
+
+        print("{}: {:.0f} pixels/s".format(name, pixels_per_second))
+
+        if os.environ.get(BENCHMARK_UPDATE_ENV):
+            return
+
+        if name not in baseline:
+            pytest.skip(
+                "No baseline throughput for `{}` in `{}`, measured {:.0f} pixels/s. "
+                "Run benchmarks with `{}` set to record it.".format(
+                    name, baseline_path, pixels_per_second, BENCHMARK_UPDATE_ENV
+                )
+            )
+
+        minimal = baseline[name] * (1 - tolerance)
+
+        assert pixels_per_second >= minimal, "Throughput {:.0f} pixels/s is below baseline {:.0f} pixels/s.".format(
+            pixels_per_second, baseline[name]
+        )
+
+    return check
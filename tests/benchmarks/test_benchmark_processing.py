@@ -0,0 +1,107 @@
+import json
+import time
+
+import pytest
+from osgeo import gdal
+from qgis.core import QgsProcessingAlgorithm, QgsProcessingContext, QgsProcessingFeedback
+
+from soft_queries.processing.tool_fuzzy_membership import FuzzyMembershipAlgorithm
+from soft_queries.processing.tool_fuzzy_operation import FuzzyOperationAlgorithm
+from soft_queries.processing.tool_possibilistic_membership import PossibilisticMembershipAlgorithm
+from soft_queries.processing.tool_possibilistic_operation import PossibilisticOperationAlgorithm
+from tests.benchmarks.utils import benchmark_sizes
+
+FUZZY_NUMBERS = {
+    "triangular": "triangular;200.0|500.0|800.0",
+    "trapezoidal": "trapezoidal;200.0|400.0|600.0|800.0",
+}
+
+DATA_TYPES = {"Int16": gdal.GDT_Int16, "Float32": gdal.GDT_Float32}
+
+OPERATION_TYPES = range(len(FuzzyOperationAlgorithm.operations_types_enum))
+
+FUZZY_RANGE = (0.0, 1.0)
+
+
+def run_benchmark(alg: QgsProcessingAlgorithm, params: dict, size: int) -> float:
+    """Runs the algorithm, returns throughput in pixels per second of the whole run including output finalization."""
+
+    alg.initAlgorithm()
+
+    start = time.perf_counter()
+
+    result, success = alg.run(parameters=params, context=QgsProcessingContext(), feedback=QgsProcessingFeedback())
+
+    elapsed = time.perf_counter() - start
+
+    assert success
+    assert json.loads(result["OUTPUT_STATISTICS"])["pixels"] == size * size
+
+    return size * size / elapsed
+
+
+@pytest.mark.parametrize("size", benchmark_sizes())
+@pytest.mark.parametrize("data_type", DATA_TYPES.keys())
+@pytest.mark.parametrize("nodata_density", [0.0, 0.5])
+@pytest.mark.parametrize("tiled", [True, False], ids=["tiled", "striped"])
+@pytest.mark.parametrize("shape", FUZZY_NUMBERS.keys())
+def test_fuzzy_membership(size, data_type, nodata_density, tiled, shape, synthetic_raster, check_throughput, tmp_path):
+
+    params = {
+        "FUZZY_NUMBER": FUZZY_NUMBERS[shape],
+        "RASTER": synthetic_raster(size, DATA_TYPES[data_type], nodata_density, tiled),
+        "OUTPUT_FUZZY_MEMBERSHIP": (tmp_path / "membership.tif").as_posix(),
+    }
+
+    check_throughput(run_benchmark(FuzzyMembershipAlgorithm(), params, size))
+
+
+@pytest.mark.parametrize("size", benchmark_sizes())
+@pytest.mark.parametrize("data_type", DATA_TYPES.keys())
+@pytest.mark.parametrize("nodata_density", [0.0, 0.5])
+@pytest.mark.parametrize("shape", FUZZY_NUMBERS.keys())
+def test_possibilistic_membership(size, data_type, nodata_density, shape, synthetic_raster, check_throughput, tmp_path):
+
+    params = {
+        "FUZZY_NUMBER": FUZZY_NUMBERS[shape],
+        "RASTER": synthetic_raster(size, DATA_TYPES[data_type], nodata_density),
+        "OUTPUT_POSSIBILITY": (tmp_path / "possibility.tif").as_posix(),
+        "OUTPUT_NECESSITY": (tmp_path / "necessity.tif").as_posix(),
+    }
+
+    check_throughput(run_benchmark(PossibilisticMembershipAlgorithm(), params, size))
+
+
+@pytest.mark.parametrize("size", benchmark_sizes())
+@pytest.mark.parametrize("operation", [0, 1], ids=FuzzyOperationAlgorithm.operations_enum)
+@pytest.mark.parametrize("operation_type", OPERATION_TYPES)
+def test_fuzzy_operation(size, operation, operation_type, synthetic_raster, check_throughput, tmp_path):
+
+    params = {
+        "FUZZY_RASTER_1": synthetic_raster(size, value_range=FUZZY_RANGE, seed=1),
+        "FUZZY_RASTER_2": synthetic_raster(size, value_range=FUZZY_RANGE, seed=2),
+        "OPERATION": operation,
+        "OPERATION_TYPE": operation_type,
+        "OUTPUT_FUZZY_MEMBERSHIP": (tmp_path / "membership.tif").as_posix(),
+    }
+
+    check_throughput(run_benchmark(FuzzyOperationAlgorithm(), params, size))
+
+
+@pytest.mark.parametrize("size", benchmark_sizes())
+@pytest.mark.parametrize("operation", [0, 1], ids=PossibilisticOperationAlgorithm.operations_enum)
+@pytest.mark.parametrize("operation_type", OPERATION_TYPES)
+def test_possibilistic_operation(size, operation, operation_type, synthetic_raster, check_throughput, tmp_path):
+
+    rasters = [synthetic_raster(size, value_range=FUZZY_RANGE, seed=seed) for seed in range(1, 5)]
+
+    params = {
+        "POSSIBILISTIC_RASTER_1": "{}::~::{}".format(rasters[0], rasters[1]),
+        "POSSIBILISTIC_RASTER_2": "{}::~::{}".format(rasters[2], rasters[3]),
+        "OPERATION": operation,
+        "OPERATION_TYPE": operation_type,
+        "OUTPUT_POSSIBILITY": (tmp_path / "possibility.tif").as_posix(),
+        "OUTPUT_NECESSITY": (tmp_path / "necessity.tif").as_posix(),
+    }
+
+    check_throughput(run_benchmark(PossibilisticOperationAlgorithm(), params, size))
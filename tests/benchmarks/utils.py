@@ -0,0 +1,73 @@
+import os
+from typing import Tuple
+
+import numpy as np
+from osgeo import gdal
+
+# benchmarks run only if this environment variable is set
+BENCHMARK_ENV = "SOFT_QUERIES_BENCHMARK"
+
+# largest synthetic raster size in pixels per side
+BENCHMARK_MAX_SIZE_ENV = "SOFT_QUERIES_BENCHMARK_MAX_SIZE"
+
+# if set, measured throughput is stored as the new baseline instead of being compared to it
+BENCHMARK_UPDATE_ENV = "SOFT_QUERIES_BENCHMARK_UPDATE"
+
+# path of baseline file, defaults to `baseline.json` next to benchmarks
+BENCHMARK_BASELINE_ENV = "SOFT_QUERIES_BENCHMARK_BASELINE"
+
+# allowed relative drop of throughput against the baseline
+BENCHMARK_TOLERANCE_ENV = "SOFT_QUERIES_BENCHMARK_TOLERANCE"
+
+BENCHMARK_SIZES = [1024, 2048, 4096, 8192, 16384]
+
+# rows of synthetic raster written at once
+GENERATED_ROWS = 256
+
+NODATA_VALUE = -9999
+
+
+def benchmark_sizes():
+    max_size = int(os.environ.get(BENCHMARK_MAX_SIZE_ENV, BENCHMARK_SIZES[-1]))
+
+    return [size for size in BENCHMARK_SIZES if size <= max_size]
+
+
+def generate_raster(
+    path: str,
+    size: int,
+    data_type: int,
+    nodata_density: float,
+    tiled: bool,
+    value_range: Tuple[float, float],
+    seed: int,
+) -> None:
+    """Square raster of smooth random values in `value_range`, `nodata_density` of pixels is no data."""
+
+    options = ["TILED=YES", "BLOCKXSIZE=256", "BLOCKYSIZE=256"] if tiled else []
+
+    dataset = gdal.GetDriverByName("GTiff").Create(path, size, size, 1, data_type, options)
+    dataset.SetGeoTransform([0, 1, 0, size, 0, -1])
+
+    band = dataset.GetRasterBand(1)
+    band.SetNoDataValue(NODATA_VALUE)
+
+    generator = np.random.default_rng(seed)
+
+    cols = np.arange(size)
+    value_min, value_max = value_range
+
+    for row in range(0, size, GENERATED_ROWS):
+        rows = np.arange(row, min(row + GENERATED_ROWS, size))[:, np.newaxis]
+
+        # waves plus noise, so tiles differ in their value ranges
+        values = 0.5 + 0.25 * np.sin(cols / 97.0) * np.cos(rows / 89.0)
+        values = values + generator.uniform(-0.25, 0.25, (rows.size, size))
+        values = value_min + values * (value_max - value_min)
+
+        values[generator.random(values.shape) < nodata_density] = NODATA_VALUE
+
+        band.WriteArray(values, 0, row)
+
+    band.FlushCache()
+    dataset = band = None
@@ -1,5 +1,5 @@
 import pytest
-from FuzzyMath import PossibilisticMembership
+from FuzzyMath import FuzzyNumberFactory, PossibilisticMembership
 from qgis.core import QgsExpression
 
 from tests.assert_helpers import assert_has_error, assert_is_correct
@@ -57,3 +57,15 @@ def test_comparisons(params, exp):
     exp = QgsExpression(f"{exp}({params})")
 
     assert_is_correct(exp, PossibilisticMembership)
+
+
+@pytest.mark.parametrize("value", [0.5, 1.5, 2, 2.5, 4])
+@pytest.mark.parametrize("function", ["exceedance", "undervaluation"])
+def test_comparisons_with_value(value, function):
+    exp = QgsExpression(f"possibilistic_{function}(fuzzy_number_triangular(1,2,3), {value})")
+
+    fn = FuzzyNumberFactory.triangular(1, 2, 3)
+
+    expected = getattr(fn, function)(FuzzyNumberFactory.crisp_number(value))
+
+    assert_is_correct(exp, PossibilisticMembership, expected)
@@ -0,0 +1,251 @@
+import numpy as np
+import pytest
+from FuzzyMath import FuzzyNumber, FuzzyNumberFactory, Interval, exceedance, undervaluation
+
+from soft_queries.processing.fuzzy_arrays import (
+    compile_fuzzy_number,
+    exceedance_array,
+    fuzzy_and_array,
+    fuzzy_and_arrays,
+    fuzzy_or_array,
+    fuzzy_or_arrays,
+    membership_array,
+    possibilistic_and_array,
+    possibilistic_or_array,
+    undervaluation_array,
+)
+
+
+@pytest.mark.parametrize(
+    "fuzzy_number",
+    [
+        FuzzyNumberFactory.triangular(1005, 1015, 1025),
+        FuzzyNumberFactory.trapezoidal(1, 2, 4, 8),
+        FuzzyNumberFactory.trapezoidal(1, 1, 4, 8),
+        FuzzyNumberFactory.crisp_number(3),
+        FuzzyNumber([0, 0.5, 1], [Interval(5, 11), Interval(5, 9), Interval(7, 8)]),
+    ],
+)
+def test_membership_array(fuzzy_number: FuzzyNumber):
+
+    values = np.linspace(float(fuzzy_number.min) - 2, float(fuzzy_number.max) + 2, 301)
+
+    expected = [float(fuzzy_number.membership(float(value)).membership) for value in values]
+
+    assert np.allclose(membership_array(values, fuzzy_number), expected)
+
+
+A = np.array([0.0, 0.0, 1.0, 0.3, 0.6, 0.5])
+B = np.array([0.0, 0.4, 0.7, 0.6, 0.8, 0.5])
+
+
+@pytest.mark.parametrize(
+    "operation_type, expected",
+    [
+        ("min", [0.0, 0.0, 0.7, 0.3, 0.6, 0.5]),
+        ("product", [0.0, 0.0, 0.7, 0.18, 0.48, 0.25]),
+        ("drastic", [0.0, 0.0, 0.7, 0.0, 0.0, 0.0]),
+        ("Lukasiewicz", [0.0, 0.0, 0.7, 0.0, 0.4, 0.0]),
+        ("Nilpotent", [0.0, 0.0, 0.7, 0.0, 0.6, 0.0]),
+        ("Hamacher", [0.0, 0.0, 0.7, 0.18 / 0.72, 0.48 / 0.92, 0.25 / 0.75]),
+    ],
+)
+def test_fuzzy_and_array(operation_type: str, expected):
+
+    assert np.allclose(fuzzy_and_array(A, B, operation_type), expected)
+
+
+@pytest.mark.parametrize(
+    "operation_type, expected",
+    [
+        ("max", [0.0, 0.4, 1.0, 0.6, 0.8, 0.5]),
+        ("product", [0.0, 0.4, 1.0, 0.72, 0.92, 0.75]),
+        ("drastic", [0.0, 0.4, 0.0, 0.0, 0.0, 0.0]),
+        ("Lukasiewicz", [0.0, 0.4, 1.0, 0.9, 1.0, 1.0]),
+        ("Nilpotent", [0.0, 0.4, 1.0, 0.6, 1.0, 1.0]),
+        ("Hamacher", [0.0, 0.4, 1.7 / 1.7, 0.9 / 1.18, 1.4 / 1.48, 1.0 / 1.25]),
+    ],
+)
+def test_fuzzy_or_array(operation_type: str, expected):
+
+    assert np.allclose(fuzzy_or_array(A, B, operation_type), expected)
+
+
+def test_fuzzy_operation_array_unknown_type():
+
+    with pytest.raises(ValueError, match="Unknown fuzzy and type"):
+        fuzzy_and_array(A, B, "max")
+
+    with pytest.raises(ValueError, match="Unknown fuzzy or type"):
+        fuzzy_or_array(A, B, "min")
+
+
+@pytest.mark.parametrize(
+    "fuzzy_number",
+    [
+        FuzzyNumberFactory.triangular(1005, 1015, 1025),
+        FuzzyNumberFactory.triangular(0, 1, 3),
+    ],
+)
+def test_possibilistic_arrays(fuzzy_number: FuzzyNumber):
+
+    values = np.linspace(float(fuzzy_number.min) - 2, float(fuzzy_number.max) + 2, 101)
+
+    for array_function, function in [(exceedance_array, exceedance), (undervaluation_array, undervaluation)]:
+
+        possibility, necessity = array_function(values, fuzzy_number)
+
+        expected = [function(fuzzy_number, FuzzyNumberFactory.crisp_number(float(value))) for value in values]
+
+        assert np.allclose(possibility, [float(pm.possibility) for pm in expected])
+        assert np.allclose(necessity, [float(pm.necessity) for pm in expected])
+
+
+def test_possibilistic_arrays_trapezoidal():
+
+    fuzzy_number = FuzzyNumberFactory.trapezoidal(1, 2, 4, 8)
+
+    values = np.array([0, 1, 1.5, 2, 3, 4, 6, 8, 9])
+
+    possibility, necessity = exceedance_array(values, fuzzy_number)
+
+    assert np.allclose(possibility, [1, 1, 1, 1, 1, 1, 0.5, 0, 0])
+    assert np.allclose(necessity, [1, 1, 0.5, 0, 0, 0, 0, 0, 0])
+
+    possibility, necessity = undervaluation_array(values, fuzzy_number)
+
+    assert np.allclose(possibility, [0, 0, 0.5, 1, 1, 1, 1, 1, 1])
+    assert np.allclose(necessity, [0, 0, 0, 0, 0, 0, 0.5, 1, 1])
+
+
+def test_possibilistic_arrays_general():
+
+    fuzzy_number = FuzzyNumber([0, 0.5, 1], [Interval(5, 11), Interval(6, 9), Interval(7, 8)])
+
+    values = np.array([[4.0, 5.5], [np.nan, 10.0]])
+
+    possibility, necessity = exceedance_array(values, fuzzy_number)
+
+    assert possibility.shape == values.shape
+    assert np.allclose(possibility, [[1, 1], [0, 0.25]])
+    assert np.allclose(necessity, [[1, 0.75], [0, 0]])
+
+
+@pytest.mark.parametrize(
+    "fuzzy_number",
+    [
+        FuzzyNumberFactory.triangular(1005, 1015, 1025),
+        FuzzyNumberFactory.trapezoidal(1, 2, 4, 8),
+        FuzzyNumberFactory.trapezoidal(1, 1, 4, 8),
+    ],
+)
+def test_crisp_possibilistic_arrays(fuzzy_number: FuzzyNumber):
+
+    values = np.linspace(float(fuzzy_number.min) - 2, float(fuzzy_number.max) + 2, 101)
+
+    compiled = compile_fuzzy_number(fuzzy_number)
+
+    for array_function, function in [
+        (compiled.crisp_exceedance, exceedance),
+        (compiled.crisp_undervaluation, undervaluation),
+    ]:
+
+        possibility, necessity = array_function(values)
+
+        for value, value_possibility, value_necessity in zip(values, possibility, necessity):
+
+            # FuzzyMath rejects its result with necessity above possibility, capped necessity is not comparable
+            try:
+                pm = function(FuzzyNumberFactory.crisp_number(float(value)), fuzzy_number)
+            except ValueError:
+                assert value_necessity <= value_possibility
+                continue
+
+            assert np.isclose(value_possibility, float(pm.possibility))
+            assert np.isclose(value_necessity, float(pm.necessity))
+
+
+def test_crisp_possibilistic_arrays_not_swapped():
+
+    compiled = compile_fuzzy_number(FuzzyNumberFactory.triangular(1, 2, 3))
+
+    # necessity differs from the swapped comparison of fuzzy number with values
+    assert np.allclose(compiled.crisp_exceedance(np.array([1.1])), [[0.1], [0.1]])
+    assert np.allclose(compiled.undervaluation(np.array([1.1])), [[0.1], [0.0]])
+
+    assert np.allclose(compiled.crisp_undervaluation(np.array([1.1])), [[1], [1]])
+    assert np.allclose(compiled.exceedance(np.array([1.1])), [[1], [0.9]])
+
+
+def test_crisp_possibilistic_arrays_general():
+
+    fuzzy_number = FuzzyNumber([0, 0.5, 1], [Interval(1, 5), Interval(2, 4), Interval(2.5, 3)])
+
+    possibility, necessity = compile_fuzzy_number(fuzzy_number).crisp_exceedance(np.array([[0.5, 1.5], [2.7, 6.0]]))
+
+    assert possibility.shape == (2, 2)
+    assert np.all(necessity <= possibility)
+    assert np.allclose(possibility, [[0, 0.25], [1, 1]])
+
+
+def test_possibilistic_operation_arrays():
+
+    possibility_a = np.array([1.0, 0.8, 0.5])
+    necessity_a = np.array([0.6, 0.2, 0.0])
+    possibility_b = np.array([0.7, 1.0, 0.4])
+    necessity_b = np.array([0.5, 0.0, 0.4])
+
+    possibility, necessity = possibilistic_and_array(possibility_a, necessity_a, possibility_b, necessity_b, "min")
+
+    assert np.allclose(possibility, [0.7, 0.8, 0.4])
+    assert np.allclose(necessity, [0.5, 0.0, 0.0])
+
+    possibility, necessity = possibilistic_or_array(possibility_a, necessity_a, possibility_b, necessity_b, "product")
+
+    assert np.allclose(possibility, [1.0, 1.0, 0.7])
+    assert np.allclose(necessity, [0.8, 0.2, 0.4])
+
+
+def test_compiled_fuzzy_number():
+
+    fuzzy_number = FuzzyNumberFactory.triangular(1, 2, 3)
+
+    compiled_fuzzy_number = compile_fuzzy_number(fuzzy_number)
+
+    assert compiled_fuzzy_number is compile_fuzzy_number(FuzzyNumberFactory.triangular(1, 2, 3))
+    assert compiled_fuzzy_number.analytic_possibilistic
+
+    assert float(compiled_fuzzy_number.membership(1.5)) == 0.5
+    assert float(compiled_fuzzy_number.membership(2)) == 1
+
+    possibility, necessity = compiled_fuzzy_number.exceedance(1.5)
+
+    assert float(possibility) == 1
+    assert float(necessity) == 0.5
+
+
+def test_compiled_fuzzy_number_constant_between():
+
+    compiled_fuzzy_number = compile_fuzzy_number(FuzzyNumberFactory.trapezoidal(1, 2, 4, 5))
+
+    assert compiled_fuzzy_number.constant_between(-10, 0.5)
+    assert compiled_fuzzy_number.constant_between(5.5, 10)
+    assert compiled_fuzzy_number.constant_between(2.5, 3.5)
+
+    assert not compiled_fuzzy_number.constant_between(0, 1.5)
+    assert not compiled_fuzzy_number.constant_between(2, 3)
+    assert not compiled_fuzzy_number.constant_between(0, 10)
+
+
+def test_fuzzy_operation_arrays_fold():
+
+    a = np.array([0.2, 0.5, 1.0])
+    b = np.array([0.4, 0.5, 0.0])
+    c = np.array([0.6, 0.1, 1.0])
+
+    assert np.allclose(fuzzy_and_arrays([a, b, c], "product"), a * b * c)
+    assert np.allclose(fuzzy_or_arrays([a, b, c], "max"), np.maximum(np.maximum(a, b), c))
+
+    # zero weight removes input from the aggregation
+    assert np.allclose(fuzzy_and_arrays([a, b, c], "min", [1, 0, 1]), np.minimum(a, c))
+    assert np.allclose(fuzzy_or_arrays([a, b, c], "max", [1, 0, 1]), np.maximum(a, c))
@@ -0,0 +1,165 @@
+from pathlib import Path
+
+import numpy as np
+
+from soft_queries.processing.tile_journal import (
+    JOURNAL_SUFFIX,
+    WORKING_COPY_SUFFIX,
+    TileJournal,
+    fingerprint,
+    tile_hash,
+)
+from soft_queries.processing.utils import RasterWindow
+
+
+def test_resume(tmp_path: Path):
+
+    output_path = (tmp_path / "output.tif").as_posix()
+
+    Path(output_path).touch()
+
+    windows = [RasterWindow(0, 0, 10, 10), RasterWindow(10, 0, 10, 10), RasterWindow(0, 10, 10, 10)]
+
+    journal = TileJournal([output_path], fingerprint("algorithm", {"A": 1}))
+
+    assert journal.resumed is False
+    assert journal.path == output_path + JOURNAL_SUFFIX
+
+    journal.add(windows[0])
+    journal.add(windows[1])
+
+    # only committed windows are considered written
+    journal.commit()
+
+    journal.add(windows[2])
+
+    journal = TileJournal([output_path], fingerprint("algorithm", {"A": 1}))
+
+    assert journal.resumed
+    assert journal.remaining(windows) == [windows[2]]
+
+    # incomplete last line after crash is ignored
+    with open(journal.path, "a", encoding="utf-8") as file:
+        file.write('{"window": [0, 10,')
+
+    journal = TileJournal([output_path], fingerprint("algorithm", {"A": 1}))
+
+    assert journal.remaining(windows) == [windows[2]]
+
+    journal.remove()
+
+    assert not Path(journal.path).exists()
+
+
+def test_fingerprint_changed(tmp_path: Path):
+
+    output_path = (tmp_path / "output.tif").as_posix()
+
+    Path(output_path).touch()
+
+    journal = TileJournal([output_path], fingerprint("algorithm", {"A": 1}))
+    journal.add(RasterWindow(0, 0, 10, 10))
+    journal.commit()
+
+    journal = TileJournal([output_path], fingerprint("algorithm", {"A": 2}))
+
+    assert journal.resumed is False
+    assert journal.remaining([RasterWindow(0, 0, 10, 10)]) == [RasterWindow(0, 0, 10, 10)]
+
+
+def test_tile_size(tmp_path: Path):
+
+    output_path = (tmp_path / "output.tif").as_posix()
+
+    Path(output_path).touch()
+
+    journal = TileJournal([output_path], fingerprint("algorithm"))
+    journal.record_tile_size((100, 20))
+    journal.add(RasterWindow(0, 0, 100, 20))
+    journal.commit()
+
+    # resumed journal keeps tile size of the run that started it, its windows are keyed by it
+    journal = TileJournal([output_path], fingerprint("algorithm"))
+
+    assert journal.resumed
+    assert journal.tile_size == (100, 20)
+    assert journal.remaining([RasterWindow(0, 0, 100, 20), RasterWindow(0, 20, 100, 20)]) == [
+        RasterWindow(0, 20, 100, 20)
+    ]
+
+
+def test_missing_output(tmp_path: Path):
+
+    output_path = (tmp_path / "output.tif").as_posix()
+
+    Path(output_path).touch()
+
+    journal = TileJournal([output_path, (tmp_path / "other.tif").as_posix()], fingerprint("algorithm"))
+    journal.commit()
+
+    journal = TileJournal([output_path, (tmp_path / "other.tif").as_posix()], fingerprint("algorithm"))
+
+    assert journal.resumed is False
+
+
+def test_incremental(tmp_path: Path):
+
+    output_path = (tmp_path / "output.tif").as_posix()
+
+    windows = [RasterWindow(0, 0, 10, 10), RasterWindow(10, 0, 10, 10)]
+
+    values = [np.arange(100).reshape(10, 10)]
+
+    journal = TileJournal([output_path], fingerprint("algorithm"), incremental=True)
+
+    # tiles of incremental run are written into working copy of the output
+    assert journal.raster_path(output_path) == output_path + WORKING_COPY_SUFFIX
+
+    Path(journal.raster_path(output_path)).touch()
+
+    for window in windows:
+        journal.add(window, tile_hash(values))
+
+    journal.commit()
+    journal.finish()
+
+    # journal of incremental run is kept
+    journal = TileJournal([output_path], fingerprint("algorithm"), incremental=True)
+
+    assert journal.resumed
+    assert journal.remaining(windows) == windows
+
+    assert journal.unchanged(windows[0], tile_hash(values))
+    assert not journal.unchanged(windows[0], tile_hash([values[0] + 1]))
+    assert not journal.unchanged(RasterWindow(0, 10, 10, 10), tile_hash(values))
+
+    # the same values in other data type are a change
+    assert not journal.unchanged(windows[0], tile_hash([values[0].astype(np.float32)]))
+
+
+def test_incremental_in_place(tmp_path: Path):
+
+    output_path = (tmp_path / "output.tif").as_posix()
+
+    journal = TileJournal([output_path], fingerprint("algorithm"), incremental=True, in_place=True)
+
+    # tiles are rewritten directly in the output
+    assert journal.raster_path(output_path) == output_path
+
+    Path(output_path).touch()
+
+    journal.add(RasterWindow(0, 0, 10, 10), tile_hash([np.zeros((10, 10))]))
+    journal.commit()
+    journal.finish()
+
+    assert journal.changed
+
+    journal = TileJournal([output_path], fingerprint("algorithm"), incremental=True, in_place=True)
+
+    # resumed run without rewritten tiles did not change the output
+    assert journal.resumed
+    assert not journal.changed
+
+    journal.add(RasterWindow(0, 0, 10, 10), tile_hash([np.ones((10, 10))]))
+
+    assert journal.changed
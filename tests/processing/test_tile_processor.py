@@ -0,0 +1,104 @@
+import json
+
+import numpy as np
+from FuzzyMath import FuzzyNumberFactory
+
+from soft_queries.processing.fuzzy_arrays import compile_fuzzy_number
+from soft_queries.processing.tile_processor import ConstantTileFunction, LookupTableFunction
+from soft_queries.processing.tile_statistics import TileStatistics
+from soft_queries.processing.utils import RasterWindow
+
+
+def function(values):
+    return [values[0] * 2.0, values[0] + 0.5]
+
+
+def test_lookup_table_function():
+
+    lookup_table = LookupTableFunction(function, -3, 10)
+
+    assert len(lookup_table.tables) == 2
+    assert lookup_table.tables[0].size == 14
+
+    values = np.array([[-5, -3, 0], [10, 11, 4]], dtype=np.int16)
+
+    for result, expected in zip(lookup_table([values]), function([values.astype(np.float64)])):
+        assert np.array_equal(result, expected)
+
+    values = values.astype(np.float32)
+
+    for result, expected in zip(lookup_table([values]), function([values])):
+        assert np.array_equal(result, expected)
+
+
+def test_constant_tile_function():
+
+    fuzzy_number = compile_fuzzy_number(FuzzyNumberFactory.trapezoidal(1, 2, 4, 5))
+
+    def membership_function(values):
+        return [fuzzy_number.membership(values[0])]
+
+    constant_function = ConstantTileFunction(membership_function, fuzzy_number, -9999)
+
+    for values in [
+        np.array([[-3.0, 0.5], [-9999, 0.0]]),
+        np.array([[2.5, 3.0], [-9999, 3.5]]),
+        np.array([[0.5, 1.5], [3.0, 6.0]]),
+    ]:
+        result = constant_function([values])[0]
+        expected = membership_function([values])[0]
+
+        valid = values != -9999
+
+        assert np.array_equal(result[valid], expected[valid])
+
+    assert constant_function([np.full((2, 2), -9999.0)])[0].shape == (2, 2)
+
+
+def test_constant_tile_function_integer_values():
+
+    fuzzy_number = compile_fuzzy_number(FuzzyNumberFactory.trapezoidal(1, 2, 4, 5))
+
+    def membership_function(values):
+        return [fuzzy_number.membership(values[0])]
+
+    constant_function = ConstantTileFunction(membership_function, fuzzy_number, 65535)
+
+    for data_type in [np.int32, np.uint32]:
+        for values in [
+            np.array([[100000, 200000], [65535, 300000]]),
+            np.array([[3, 3], [65535, 4]]),
+            np.array([[0, 1], [3, 100000]]),
+        ]:
+            values = values.astype(data_type)
+
+            result = constant_function([values])[0]
+            expected = membership_function([values.astype(np.float64)])[0]
+
+            valid = values != 65535
+
+            assert np.allclose(result[valid], expected[valid])
+
+
+def test_tile_statistics():
+
+    statistics = TileStatistics(threads=2)
+
+    statistics.start()
+    statistics.add_compute(0.5, 1.5)
+    statistics.add_compute(0.5, 0.5)
+    statistics.add_write(RasterWindow(0, 0, 10, 20), 0.25)
+    statistics.add_write(RasterWindow(10, 0, 10, 20), 0.0, written=False)
+    statistics.stop()
+
+    report = json.loads(statistics.to_json())
+
+    assert report["tiles"] == 2
+    assert report["unchanged_tiles"] == 1
+    assert report["pixels"] == 400
+    assert report["read_time"] == 1.0
+    assert report["compute_time"] == 2.0
+    assert report["write_time"] == 0.25
+    assert report["wall_time"] > 0
+
+    assert len(statistics.summary()) == 2
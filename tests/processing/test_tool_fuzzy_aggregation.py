@@ -0,0 +1,100 @@
+import numpy as np
+from osgeo import gdal
+
+from soft_queries.processing.tool_fuzzy_aggregation import FuzzyAggregationAlgorithm
+from soft_queries.processing.tool_fuzzy_operation import FuzzyOperationAlgorithm
+from tests.utils import CancelingFeedback, raster_to_array
+
+
+def test_run(raster_fuzzy_1_path: str, raster_fuzzy_2_path: str, context, feedback):
+
+    alg = FuzzyAggregationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_RASTERS": [raster_fuzzy_1_path, raster_fuzzy_2_path],
+        "OPERATION": 1,
+        "OPERATION_TYPE": 1,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, _ = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    alg_operation = FuzzyOperationAlgorithm()
+    alg_operation.initAlgorithm()
+
+    params_operation = {
+        "FUZZY_RASTER_1": raster_fuzzy_1_path,
+        "FUZZY_RASTER_2": raster_fuzzy_2_path,
+        "OPERATION": 1,
+        "OPERATION_TYPE": 1,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result_operation = alg_operation.run(parameters=params_operation, context=context, feedback=feedback)
+
+    values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+    values_operation = raster_to_array(result_operation[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values.mask, values_operation.mask)
+    assert np.allclose(values.compressed(), values_operation.compressed())
+
+
+def test_weights(raster_fuzzy_1_path: str, raster_fuzzy_2_path: str, context, feedback):
+
+    alg = FuzzyAggregationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_RASTERS": [raster_fuzzy_1_path, raster_fuzzy_2_path, raster_fuzzy_1_path],
+        "OPERATION": 0,
+        "OPERATION_TYPE": 0,
+        "WEIGHTS": "1,0",
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run is False
+    assert "Number of weights" in msg
+
+    # second raster with zero weight does not influence result
+    params.update({"WEIGHTS": "1,0,1"})
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+    values_input = raster_to_array(raster_fuzzy_1_path)
+
+    valid = ~values.mask & ~values_input.mask
+
+    assert np.allclose(values.data[valid], values_input.data[valid])
+
+
+def test_canceled_not_finalized(raster_fuzzy_1_path: str, raster_fuzzy_2_path: str, context, tmp_path):
+
+    alg = FuzzyAggregationAlgorithm()
+    alg.initAlgorithm()
+
+    output_path = (tmp_path / "aggregation.tif").as_posix()
+
+    params = {
+        "FUZZY_RASTERS": [raster_fuzzy_1_path, raster_fuzzy_2_path],
+        "OPERATION": 0,
+        "OPERATION_TYPE": 0,
+        "OUTPUT_FUZZY_MEMBERSHIP": output_path,
+        "TILE_WIDTH": 16,
+        "TILE_HEIGHT": 16,
+        "COG": True,
+    }
+
+    alg.run(parameters=params, context=context, feedback=CancelingFeedback())
+
+    dataset = gdal.Open(output_path)
+
+    # partial output is not converted to COG
+    assert dataset.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") != "COG"
@@ -1,6 +1,25 @@
-from qgis.core import QgsRasterLayer
+import json
+import math
+import re
+
+import numpy as np
+import pytest
+from FuzzyMath import FuzzyNumberFactory
+from osgeo import gdal
+from qgis.core import (
+    QgsFeature,
+    QgsGeometry,
+    QgsProcessingFeatureSourceDefinition,
+    QgsProcessingFeedback,
+    QgsRasterLayer,
+    QgsRectangle,
+    QgsSettings,
+    QgsVectorLayer,
+)
 
 from soft_queries.processing.tool_fuzzy_membership import FuzzyMembershipAlgorithm
+from soft_queries.processing.utils import SETTINGS_MEMORY_BUDGET_MB, SETTINGS_THREADS
+from tests.utils import CancelingFeedback, raster_to_array
 
 
 def test_run(raster_layer_path: str, context, feedback):
@@ -22,3 +41,561 @@ def test_run(raster_layer_path: str, context, feedback):
     assert isinstance(result[0], dict)
     assert isinstance(result[0]["OUTPUT_FUZZY_MEMBERSHIP"], str)
     assert isinstance(QgsRasterLayer(result[0]["OUTPUT_FUZZY_MEMBERSHIP"]), QgsRasterLayer)
+
+
+def test_values(raster_layer_path: str, context, feedback):
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    fuzzy_number = FuzzyNumberFactory.triangular(1005.0, 1015.0, 1025.0)
+
+    input_values = raster_to_array(raster_layer_path)
+    output_values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(input_values.mask, output_values.mask)
+
+    expected = [float(fuzzy_number.membership(float(value)).membership) for value in input_values.compressed()]
+
+    assert np.allclose(output_values.compressed(), expected)
+
+
+def test_tile_size(raster_layer_path: str, context, feedback):
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result_default = alg.run(parameters=params, context=context, feedback=feedback)
+
+    params.update({"TILE_WIDTH": 7, "TILE_HEIGHT": 5})
+
+    result_tiles = alg.run(parameters=params, context=context, feedback=feedback)
+
+    values_default = raster_to_array(result_default[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+    values_tiles = raster_to_array(result_tiles[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values_default.mask, values_tiles.mask)
+    assert np.array_equal(values_default.compressed(), values_tiles.compressed())
+
+
+def test_process_backend(raster_layer_path: str, context, feedback):
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result_threads = alg.run(parameters=params, context=context, feedback=feedback)
+
+    params.update({"BACKEND": 1, "THREADS": 2, "TILE_WIDTH": 16, "TILE_HEIGHT": 16})
+
+    result_processes = alg.run(parameters=params, context=context, feedback=feedback)
+
+    values_threads = raster_to_array(result_threads[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+    values_processes = raster_to_array(result_processes[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values_threads.mask, values_processes.mask)
+    assert np.allclose(values_threads.compressed(), values_processes.compressed())
+
+
+@pytest.mark.parametrize("output_data_type, tolerance", [(1, 1e-6), (2, 1 / 65534), (3, 1 / 254)])
+def test_output_data_type(raster_layer_path: str, output_data_type: int, tolerance: float, context, feedback):
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result_default = alg.run(parameters=params, context=context, feedback=feedback)
+
+    params.update({"OUTPUT_DATA_TYPE": output_data_type})
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    values_default = raster_to_array(result_default[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+    values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values_default.mask, values.mask)
+    assert np.allclose(values_default.compressed(), values.compressed(), atol=tolerance)
+
+
+def test_output_options(raster_layer_path: str, context, feedback):
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result_default = alg.run(parameters=params, context=context, feedback=feedback)
+
+    dataset = gdal.Open(result_default[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert dataset.GetMetadataItem("COMPRESSION", "IMAGE_STRUCTURE") == "DEFLATE"
+    assert dataset.GetRasterBand(1).GetBlockSize() == [256, 256]
+
+    params.update({"COMPRESSION": 2, "COG": True})
+
+    result_cog = alg.run(parameters=params, context=context, feedback=feedback)
+
+    dataset = gdal.Open(result_cog[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert dataset.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") == "COG"
+    assert dataset.GetMetadataItem("COMPRESSION", "IMAGE_STRUCTURE") == "ZSTD"
+
+    values_default = raster_to_array(result_default[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+    values_cog = raster_to_array(result_cog[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values_default.mask, values_cog.mask)
+    assert np.array_equal(values_default.compressed(), values_cog.compressed())
+
+
+def test_integer_raster_lookup_table(raster_layer_path: str, tmp_path, context, feedback):
+
+    integer_raster_path = (tmp_path / "dsm_int16.tif").as_posix()
+
+    gdal.Translate(integer_raster_path, raster_layer_path, outputType=gdal.GDT_Int16, noData=-32768)
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": integer_raster_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    fuzzy_number = FuzzyNumberFactory.triangular(1005.0, 1015.0, 1025.0)
+
+    input_values = raster_to_array(integer_raster_path)
+    output_values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(input_values.mask, output_values.mask)
+
+    expected = [float(fuzzy_number.membership(float(value)).membership) for value in input_values.compressed()]
+
+    assert np.allclose(output_values.compressed(), expected)
+
+
+def test_wide_range_integer_raster(tmp_path, context, feedback):
+
+    integer_raster_path = (tmp_path / "wide_int32.tif").as_posix()
+
+    # range too wide for lookup table, tiles are evaluated by constant tile function on Int32 values
+    values = np.linspace(-200000, 200000, 64 * 48).astype(np.int32).reshape(48, 64)
+    values[0, 0] = -99999
+
+    dataset = gdal.GetDriverByName("GTiff").Create(integer_raster_path, 64, 48, 1, gdal.GDT_Int32)
+    dataset.SetGeoTransform([0, 1, 0, 48, 0, -1])
+    dataset.GetRasterBand(1).SetNoDataValue(-99999)
+    dataset.GetRasterBand(1).WriteArray(values)
+    del dataset
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;-5000.0|0.0|5000.0",
+        "RASTER": integer_raster_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+        "TILE_WIDTH": 16,
+        "TILE_HEIGHT": 16,
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    assert result[1]
+
+    fuzzy_number = FuzzyNumberFactory.triangular(-5000.0, 0.0, 5000.0)
+
+    input_values = raster_to_array(integer_raster_path)
+    output_values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(input_values.mask, output_values.mask)
+
+    expected = [float(fuzzy_number.membership(float(value)).membership) for value in input_values.compressed()]
+
+    assert np.allclose(output_values.compressed(), expected)
+
+
+class InfoFeedback(QgsProcessingFeedback):
+    def __init__(self):
+        super().__init__()
+        self.infos = []
+
+    def pushInfo(self, info: str) -> None:
+        super().pushInfo(info)
+        self.infos.append(info)
+
+
+def test_incremental(raster_layer_path: str, context, feedback, tmp_path):
+
+    input_path = (tmp_path / "dsm.tif").as_posix()
+
+    gdal.Translate(input_path, raster_layer_path)
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": input_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": (tmp_path / "membership.tif").as_posix(),
+        "TILE_WIDTH": 32,
+        "TILE_HEIGHT": 32,
+        "INCREMENTAL": True,
+        "COG": True,
+    }
+
+    alg.run(parameters=params, context=context, feedback=feedback)
+
+    assert (tmp_path / "membership.tif.journal").exists()
+    assert (tmp_path / "membership.tif.incremental.tif").exists()
+
+    # update of a region of the input, only the first tile changes
+    dataset = gdal.Open(input_path, gdal.GA_Update)
+    band = dataset.GetRasterBand(1)
+    band.WriteArray(band.ReadAsArray(0, 0, 10, 10) + 5, 0, 0)
+    dataset = band = None
+
+    feedback_incremental = InfoFeedback()
+
+    result = alg.run(parameters=params, context=context, feedback=feedback_incremental)
+
+    assert any("tiles with unchanged inputs were not rewritten" in info for info in feedback_incremental.infos)
+
+    # output is recreated from the working copy, not updated in place
+    dataset = gdal.Open(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert dataset.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") == "COG"
+
+    del dataset
+
+    params.update({"OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT", "INCREMENTAL": False})
+
+    result_full = alg.run(parameters=params, context=context, feedback=feedback)
+
+    values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+    values_full = raster_to_array(result_full[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values.mask, values_full.mask)
+    assert np.allclose(values.compressed(), values_full.compressed())
+
+
+def test_incremental_unchanged(raster_layer_path: str, context, feedback, tmp_path):
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    output_path = tmp_path / "membership.tif"
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": output_path.as_posix(),
+        "TILE_WIDTH": 32,
+        "TILE_HEIGHT": 32,
+        "INCREMENTAL": True,
+    }
+
+    alg.run(parameters=params, context=context, feedback=feedback)
+
+    stat = output_path.stat()
+
+    feedback_incremental = InfoFeedback()
+
+    alg.run(parameters=params, context=context, feedback=feedback_incremental)
+
+    assert "No tile was rewritten, outputs are kept as they are." in feedback_incremental.infos
+
+    # output is not recreated from the working copy
+    assert output_path.stat().st_mtime_ns == stat.st_mtime_ns
+    assert output_path.stat().st_size == stat.st_size
+
+
+def test_incremental_in_place(raster_layer_path: str, context, feedback, tmp_path):
+
+    input_path = (tmp_path / "dsm.tif").as_posix()
+
+    gdal.Translate(input_path, raster_layer_path)
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": input_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": (tmp_path / "membership.tif").as_posix(),
+        "TILE_WIDTH": 32,
+        "TILE_HEIGHT": 32,
+        "INCREMENTAL": True,
+        "COMPRESSION": 0,
+    }
+
+    alg.run(parameters=params, context=context, feedback=feedback)
+
+    dataset = gdal.Open(input_path, gdal.GA_Update)
+    band = dataset.GetRasterBand(1)
+    band.WriteArray(band.ReadAsArray(0, 0, 10, 10) + 5, 0, 0)
+    dataset = band = None
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    # uncompressed output is updated in place, without working copy
+    assert not (tmp_path / "membership.tif.incremental.tif").exists()
+
+    params.update({"OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT", "INCREMENTAL": False})
+
+    result_full = alg.run(parameters=params, context=context, feedback=feedback)
+
+    values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+    values_full = raster_to_array(result_full[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values.mask, values_full.mask)
+    assert np.allclose(values.compressed(), values_full.compressed())
+
+
+def test_resume_other_threads(raster_layer_path: str, context, feedback, tmp_path):
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    output_path = (tmp_path / "membership.tif").as_posix()
+
+    # tile size planned from memory budget depends on the number of threads, striped output keeps tiles smaller than
+    # output blocks
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": output_path,
+        "MEMORY_BUDGET": 1,
+        "THREADS": 4,
+        "TILED": False,
+        "CHECKPOINT": True,
+    }
+
+    alg.run(parameters=params, context=context, feedback=CancelingFeedback())
+
+    params.update({"THREADS": 1})
+
+    feedback_resume = InfoFeedback()
+
+    result = alg.run(parameters=params, context=context, feedback=feedback_resume)
+
+    resumed = [info for info in feedback_resume.infos if info.startswith("Continuing previous run")]
+
+    assert len(resumed) == 1
+
+    # windows of the first run are found in the journal
+    written_tiles = int(re.match(r"Continuing previous run, (\d+) of", resumed[0]).group(1))
+
+    assert written_tiles > 0
+
+    params.update({"OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT", "CHECKPOINT": False})
+
+    result_full = alg.run(parameters=params, context=context, feedback=feedback)
+
+    values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+    values_full = raster_to_array(result_full[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values.mask, values_full.mask)
+    assert np.allclose(values.compressed(), values_full.compressed())
+
+
+def test_journal_fingerprint_object_values(raster_layer_path: str, context, tmp_path):
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    raster = QgsRasterLayer(raster_layer_path)
+
+    output_path = (tmp_path / "membership.tif").as_posix()
+
+    fingerprints = []
+
+    # new objects as values of parameters in every run, same as processing dialog creates them
+    for _ in range(2):
+        params = {
+            "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+            "RASTER": QgsRasterLayer(raster_layer_path),
+            "OUTPUT_FUZZY_MEMBERSHIP": output_path,
+            "MASK": QgsProcessingFeatureSourceDefinition((tmp_path / "mask.gpkg").as_posix()),
+            "CHECKPOINT": True,
+        }
+
+        journal = alg.parameterAsTileJournal(params, context, [output_path], [raster])
+
+        fingerprints.append(journal.fingerprint)
+
+    assert fingerprints[0] == fingerprints[1]
+
+
+def test_statistics(raster_layer_path: str, context, feedback):
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+        "TILE_WIDTH": 7,
+        "TILE_HEIGHT": 5,
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    statistics = json.loads(result[0]["OUTPUT_STATISTICS"])
+
+    raster = QgsRasterLayer(raster_layer_path)
+
+    assert statistics["tiles"] == math.ceil(raster.width() / 7) * math.ceil(raster.height() / 5)
+    assert statistics["pixels"] == raster.width() * raster.height()
+    assert statistics["pixels_per_second"] > 0
+    assert statistics["compute_time"] > 0
+
+
+def test_settings_defaults():
+
+    settings = QgsSettings()
+    settings.setValue(SETTINGS_MEMORY_BUDGET_MB, 64)
+    settings.setValue(SETTINGS_THREADS, 2)
+
+    try:
+        alg = FuzzyMembershipAlgorithm()
+        alg.initAlgorithm()
+
+        assert alg.parameterDefinition("MEMORY_BUDGET").defaultValue() == 64
+        assert alg.parameterDefinition("THREADS").defaultValue() == 2
+
+    finally:
+        settings.remove(SETTINGS_MEMORY_BUDGET_MB)
+        settings.remove(SETTINGS_THREADS)
+
+
+def test_extent_crop(raster_layer_path: str, context, feedback):
+
+    raster = QgsRasterLayer(raster_layer_path)
+
+    extent = raster.extent()
+    pixel_width = raster.rasterUnitsPerPixelX()
+    pixel_height = raster.rasterUnitsPerPixelY()
+
+    # pixels from 2nd to 11th column and from 3rd to 8th row
+    area_extent = "{},{},{},{} [{}]".format(
+        extent.xMinimum() + 2 * pixel_width,
+        extent.xMinimum() + 12 * pixel_width,
+        extent.yMaximum() - 9 * pixel_height,
+        extent.yMaximum() - 3 * pixel_height,
+        raster.crs().authid(),
+    )
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+        "EXTENT": area_extent,
+        "CROP": True,
+        "TILE_WIDTH": 4,
+        "TILE_HEIGHT": 4,
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    assert result[1]
+
+    output_raster = QgsRasterLayer(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert output_raster.width() == 10
+    assert output_raster.height() == 6
+
+    params_full = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result_full = alg.run(parameters=params_full, context=context, feedback=feedback)
+
+    values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+    values_full = raster_to_array(result_full[0]["OUTPUT_FUZZY_MEMBERSHIP"])[3:9, 2:12]
+
+    assert np.array_equal(values.mask, values_full.mask)
+    assert np.allclose(values.compressed(), values_full.compressed())
+
+
+def test_mask(raster_layer_path: str, context, feedback):
+
+    raster = QgsRasterLayer(raster_layer_path)
+
+    extent = raster.extent()
+
+    # polygon covering left half of the raster
+    mask_layer = QgsVectorLayer("Polygon?crs={}".format(raster.crs().authid()), "mask", "memory")
+
+    feature = QgsFeature()
+    feature.setGeometry(
+        QgsGeometry.fromRect(QgsRectangle(extent.xMinimum(), extent.yMinimum(), extent.center().x(), extent.yMaximum()))
+    )
+
+    mask_layer.dataProvider().addFeatures([feature])
+
+    alg = FuzzyMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+        "MASK": mask_layer,
+        "TILE_WIDTH": 4,
+        "TILE_HEIGHT": 4,
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    assert result[1]
+
+    values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    columns = np.arange(raster.width()) + 0.5
+
+    outside = columns * raster.rasterUnitsPerPixelX() > extent.width() / 2
+
+    assert values.shape == (raster.height(), raster.width())
+    assert np.all(values.mask[:, outside])
+    assert not np.all(values.mask[:, ~outside])
+
+    statistics = json.loads(result[0]["OUTPUT_STATISTICS"])
+
+    assert statistics["pixels"] < raster.width() * raster.height()
@@ -0,0 +1,96 @@
+import numpy as np
+from qgis.core import QgsRasterLayer
+
+from soft_queries.processing.raster_interface import TileFunctionRasterInterface
+from soft_queries.processing.tool_fuzzy_membership import FuzzyMembershipAlgorithm
+from soft_queries.processing.tool_fuzzy_membership_layer import FuzzyMembershipLayerAlgorithm
+from soft_queries.processing.utils import block_nodata_mask, block_to_array
+from tests.utils import raster_to_array
+
+
+def layer_values(layer: QgsRasterLayer, band: int = 1) -> np.ma.MaskedArray:
+
+    interface = layer.renderer().input()
+
+    assert isinstance(interface, TileFunctionRasterInterface)
+
+    block = interface.block(band, layer.extent(), layer.width(), layer.height())
+
+    values = block_to_array(block)
+
+    return np.ma.masked_array(values, block_nodata_mask(block, values))
+
+
+def test_values(raster_layer_path: str, context, feedback):
+
+    alg = FuzzyMembershipLayerAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, _ = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    layer = context.getMapLayer(result[0]["OUTPUT"])
+
+    assert isinstance(layer, QgsRasterLayer)
+    assert layer.renderer().input().bandCount() == 1
+
+    alg_membership = FuzzyMembershipAlgorithm()
+    alg_membership.initAlgorithm()
+
+    params_membership = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result_membership = alg_membership.run(parameters=params_membership, context=context, feedback=feedback)
+
+    values = layer_values(layer)
+    values_membership = raster_to_array(result_membership[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values.mask, values_membership.mask)
+    assert np.allclose(values.compressed(), values_membership.compressed())
+
+
+def test_possibilistic_bands(raster_layer_path: str, context, feedback):
+
+    alg = FuzzyMembershipLayerAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OPERATION": 1,
+        "LAYER_NAME": "exceedance",
+        "OUTPUT": "TEMPORARY_OUTPUT",
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    layer = context.getMapLayer(result[0]["OUTPUT"])
+
+    assert layer.name() == "exceedance"
+
+    interface = layer.renderer().input()
+
+    assert interface.bandCount() == 2
+    assert interface.generateBandName(2) == "Necessity"
+
+    possibility = layer_values(layer, 1)
+    necessity = layer_values(layer, 2)
+
+    assert np.all(possibility.compressed() >= necessity.compressed())
+
+    # half of resolution, evaluated only for requested block
+    block = interface.block(1, layer.extent(), layer.width() // 2, layer.height() // 2)
+
+    assert block.width() == layer.width() // 2
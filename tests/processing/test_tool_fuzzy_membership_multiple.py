@@ -0,0 +1,103 @@
+import numpy as np
+from osgeo import gdal
+
+from soft_queries.processing.tool_fuzzy_membership import FuzzyMembershipAlgorithm
+from soft_queries.processing.tool_fuzzy_membership_multiple import FuzzyMembershipMultipleAlgorithm
+from tests.utils import CancelingFeedback, raster_to_array
+
+FUZZY_NUMBERS = ["triangular;995.0|1005.0|1015.0", "triangular;1005.0|1015.0|1025.0"]
+
+
+def test_run(raster_layer_path: str, context, feedback):
+
+    alg = FuzzyMembershipMultipleAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "RASTER": raster_layer_path,
+        "FUZZY_NUMBERS": "\n".join(FUZZY_NUMBERS),
+        "OUTPUT_FUZZY_MEMBERSHIPS": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, _ = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    assert result[1]
+
+    path_output = result[0]["OUTPUT_FUZZY_MEMBERSHIPS"]
+
+    dataset = gdal.Open(path_output)
+
+    assert dataset.RasterCount == 2
+    assert dataset.GetRasterBand(1).GetDescription() == FUZZY_NUMBERS[0]
+
+    alg_single = FuzzyMembershipAlgorithm()
+    alg_single.initAlgorithm()
+
+    for band, fuzzy_number in enumerate(FUZZY_NUMBERS, start=1):
+
+        params_single = {
+            "FUZZY_NUMBER": fuzzy_number,
+            "RASTER": raster_layer_path,
+            "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+        }
+
+        result_single = alg_single.run(parameters=params_single, context=context, feedback=feedback)
+
+        values = raster_to_array(path_output, band)
+        values_single = raster_to_array(result_single[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+        assert np.array_equal(values.mask, values_single.mask)
+        assert np.allclose(values.compressed(), values_single.compressed())
+
+
+def test_no_terms(raster_layer_path: str, context):
+
+    alg = FuzzyMembershipMultipleAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIPS": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run is False
+    assert "At least one Fuzzy Number" in msg
+
+    params.update({"FUZZY_VARIABLES": "variable_that_does_not_exist"})
+
+    can_run, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run is False
+    assert "does not exist" in msg
+
+
+def test_canceled_not_finalized(raster_layer_path: str, context, tmp_path):
+
+    alg = FuzzyMembershipMultipleAlgorithm()
+    alg.initAlgorithm()
+
+    output_path = (tmp_path / "memberships.tif").as_posix()
+
+    params = {
+        "RASTER": raster_layer_path,
+        "FUZZY_NUMBERS": "\n".join(FUZZY_NUMBERS),
+        "OUTPUT_FUZZY_MEMBERSHIPS": output_path,
+        "TILE_WIDTH": 16,
+        "TILE_HEIGHT": 16,
+        "COG": True,
+    }
+
+    alg.run(parameters=params, context=context, feedback=CancelingFeedback())
+
+    dataset = gdal.Open(output_path)
+
+    assert dataset.RasterCount == len(FUZZY_NUMBERS)
+
+    # partial output is not converted to COG
+    assert dataset.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") != "COG"
@@ -1,6 +1,10 @@
+import numpy as np
+from osgeo import gdal
 from qgis.core import QgsRasterLayer
 
+from soft_queries.processing.tool_fuzzy_membership import FuzzyMembershipAlgorithm
 from soft_queries.processing.tool_fuzzy_operation import FuzzyOperationAlgorithm
+from tests.utils import raster_to_array
 
 
 def test_run(raster_fuzzy_1_path: str, raster_fuzzy_2_path: str, context, feedback):
@@ -26,3 +30,81 @@ def test_run(raster_fuzzy_1_path: str, raster_fuzzy_2_path: str, context, feedba
     assert isinstance(result[0], dict)
     assert isinstance(result[0]["OUTPUT_FUZZY_MEMBERSHIP"], str)
     assert isinstance(QgsRasterLayer(result[0]["OUTPUT_FUZZY_MEMBERSHIP"]), QgsRasterLayer)
+
+
+def test_quantized_inputs(raster_layer_path: str, context, feedback):
+
+    alg_membership = FuzzyMembershipAlgorithm()
+    alg_membership.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_DATA_TYPE": 3,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result_membership = alg_membership.run(parameters=params, context=context, feedback=feedback)
+
+    quantized_path = result_membership[0]["OUTPUT_FUZZY_MEMBERSHIP"]
+
+    alg = FuzzyOperationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_RASTER_1": quantized_path,
+        "FUZZY_RASTER_2": quantized_path,
+        "OPERATION": 0,
+        "OPERATION_TYPE": 0,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    # min of the same raster are the values of the raster, read back from quantized integers
+    values_input = raster_to_array(quantized_path)
+    values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values_input.mask, values.mask)
+    assert np.allclose(values_input.compressed(), values.compressed(), atol=1e-6)
+    assert 0 <= values.min() and values.max() <= 1
+
+
+def test_inputs_not_aligned(raster_fuzzy_1_path: str, context, feedback, tmp_path):
+
+    raster = QgsRasterLayer(raster_fuzzy_1_path)
+
+    # same values on a grid with twice the resolution, read back into grid of the first raster
+    fine_raster_path = (tmp_path / "fuzzy_1_fine.tif").as_posix()
+
+    gdal.Warp(
+        fine_raster_path,
+        raster_fuzzy_1_path,
+        xRes=raster.rasterUnitsPerPixelX() / 2,
+        yRes=raster.rasterUnitsPerPixelY() / 2,
+        resampleAlg="near",
+    )
+
+    alg = FuzzyOperationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_RASTER_1": raster_fuzzy_1_path,
+        "FUZZY_RASTER_2": fine_raster_path,
+        "OPERATION": 0,
+        "OPERATION_TYPE": 0,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, _ = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    values_input = raster_to_array(raster_fuzzy_1_path)
+    values = raster_to_array(result[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert values.shape == values_input.shape
+    assert np.array_equal(values_input.mask, values.mask)
+    assert np.allclose(values_input.compressed(), values.compressed())
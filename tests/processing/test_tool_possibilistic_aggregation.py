@@ -0,0 +1,141 @@
+from pathlib import Path
+
+import numpy as np
+from osgeo import gdal
+
+from soft_queries.processing.tool_possibilistic_aggregation import PossibilisticAggregationAlgorithm
+from soft_queries.processing.tool_possibilistic_operation import PossibilisticOperationAlgorithm
+from tests.utils import raster_to_array
+
+path_folder = Path(__file__).parent.parent / "_data"
+
+path_r_1_poss = (path_folder / "r_1_poss.tif").as_posix()
+path_r_1_nec = (path_folder / "r_1_nec.tif").as_posix()
+path_r_2_poss = (path_folder / "r_2_poss.tif").as_posix()
+path_r_2_nec = (path_folder / "r_2_nec.tif").as_posix()
+
+
+def test_run(context, feedback):
+
+    alg = PossibilisticAggregationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "POSSIBILITY_RASTERS": [path_r_1_poss, path_r_2_poss],
+        "NECESSITY_RASTERS": [path_r_1_nec, path_r_2_nec],
+        "OPERATION": 0,
+        "OPERATION_TYPE": 3,
+        "OUTPUT_POSSIBILITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, _ = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    alg_operation = PossibilisticOperationAlgorithm()
+    alg_operation.initAlgorithm()
+
+    params_operation = {
+        "POSSIBILISTIC_RASTER_1": f"{path_r_1_poss}::~::{path_r_1_nec}",
+        "POSSIBILISTIC_RASTER_2": f"{path_r_2_poss}::~::{path_r_2_nec}",
+        "OPERATION": 0,
+        "OPERATION_TYPE": 3,
+        "OUTPUT_POSSIBILITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+    }
+
+    result_operation = alg_operation.run(parameters=params_operation, context=context, feedback=feedback)
+
+    for output in ["OUTPUT_POSSIBILITY", "OUTPUT_NECESSITY"]:
+        values = raster_to_array(result[0][output])
+        values_operation = raster_to_array(result_operation[0][output])
+
+        assert np.array_equal(values.mask, values_operation.mask)
+        assert np.allclose(values.compressed(), values_operation.compressed())
+
+
+def test_unequal_inputs(context):
+
+    alg = PossibilisticAggregationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "POSSIBILITY_RASTERS": [path_r_1_poss, path_r_2_poss],
+        "NECESSITY_RASTERS": [path_r_1_nec],
+        "OUTPUT_POSSIBILITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run is False
+    assert "has to be equal" in msg
+
+
+def test_two_band_inputs(context, feedback, tmp_path: Path):
+
+    alg = PossibilisticAggregationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "POSSIBILITY_RASTERS": [path_r_1_poss, path_r_2_poss],
+        "NECESSITY_RASTERS": [path_r_1_nec, path_r_2_nec],
+        "OPERATION": 1,
+        "OPERATION_TYPE": 1,
+        "OUTPUT_POSSIBILITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+    }
+
+    result_expected = alg.run(parameters=params, context=context, feedback=feedback)
+
+    two_band_paths = []
+
+    for name, path_possibility, path_necessity in [
+        ("r_1.tif", path_r_1_poss, path_r_1_nec),
+        ("r_2.tif", path_r_2_poss, path_r_2_nec),
+    ]:
+        vrt = gdal.BuildVRT("", [path_possibility, path_necessity], separate=True)
+        gdal.Translate((tmp_path / name).as_posix(), vrt, format="GTiff")
+        del vrt
+
+        two_band_paths.append((tmp_path / name).as_posix())
+
+    params_two_band = {
+        "POSSIBILITY_RASTERS": two_band_paths,
+        "OPERATION": 1,
+        "OPERATION_TYPE": 1,
+        "OUTPUT_POSSIBILISTIC": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, _ = alg.checkParameterValues(parameters=params_two_band, context=context)
+
+    assert can_run
+
+    result = alg.run(parameters=params_two_band, context=context, feedback=feedback)
+
+    for output, band in [("OUTPUT_POSSIBILITY", 1), ("OUTPUT_NECESSITY", 2)]:
+        values_expected = raster_to_array(result_expected[0][output])
+        values = raster_to_array(result[0]["OUTPUT_POSSIBILISTIC"], band)
+
+        assert np.array_equal(values_expected.mask, values.mask)
+        assert np.allclose(values_expected.compressed(), values.compressed())
+
+
+def test_one_band_inputs_without_necessity(context):
+
+    alg = PossibilisticAggregationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "POSSIBILITY_RASTERS": [path_r_1_poss, path_r_2_poss],
+        "OUTPUT_POSSIBILITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run is False
+    assert "two-band rasters" in msg
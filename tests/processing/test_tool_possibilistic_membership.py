@@ -1,6 +1,9 @@
+import numpy as np
+from osgeo import gdal
 from qgis.core import QgsRasterLayer
 
 from soft_queries.processing.tool_possibilistic_membership import PossibilisticMembershipAlgorithm
+from tests.utils import raster_to_array
 
 
 def test_run(raster_layer_path: str, context, feedback):
@@ -28,3 +31,60 @@ def test_run(raster_layer_path: str, context, feedback):
 
     assert isinstance(result[0]["OUTPUT_NECESSITY"], str)
     assert isinstance(QgsRasterLayer(result[0]["OUTPUT_NECESSITY"]), QgsRasterLayer)
+
+
+def test_possibilistic_output(raster_layer_path: str, context, feedback):
+
+    alg = PossibilisticMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_POSSIBILITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_POSSIBILISTIC": "TEMPORARY_OUTPUT",
+        "OPERATION": 0,
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    assert result[1]
+
+    raster = QgsRasterLayer(result[0]["OUTPUT_POSSIBILISTIC"])
+
+    assert raster.bandCount() == 2
+
+    dataset = gdal.Open(result[0]["OUTPUT_POSSIBILISTIC"])
+
+    assert dataset.GetRasterBand(1).GetDescription() == "possibility"
+    assert dataset.GetRasterBand(2).GetDescription() == "necessity"
+
+    del dataset
+
+    for output, band in [("OUTPUT_POSSIBILITY", 1), ("OUTPUT_NECESSITY", 2)]:
+
+        values = raster_to_array(result[0][output])
+        values_band = raster_to_array(result[0]["OUTPUT_POSSIBILISTIC"], band)
+
+        assert np.array_equal(values.mask, values_band.mask)
+        assert np.array_equal(values.compressed(), values_band.compressed())
+
+
+def test_no_output(raster_layer_path: str, context):
+
+    alg = PossibilisticMembershipAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_POSSIBILITY": None,
+        "OUTPUT_NECESSITY": None,
+        "OPERATION": 0,
+    }
+
+    ok, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert not ok
+    assert "At least one output" in msg
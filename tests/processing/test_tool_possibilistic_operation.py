@@ -1,8 +1,11 @@
 from pathlib import Path
 
+import numpy as np
+from osgeo import gdal
 from qgis.core import QgsRasterLayer
 
 from soft_queries.processing.tool_possibilistic_operation import PossibilisticOperationAlgorithm
+from tests.utils import CancelingFeedback, raster_to_array
 
 path_folder = Path(__file__).parent.parent / "_data"
 
@@ -38,3 +41,161 @@ def test_run(context, feedback):
 
     assert isinstance(result[0]["OUTPUT_NECESSITY"], str)
     assert isinstance(QgsRasterLayer(result[0]["OUTPUT_NECESSITY"]), QgsRasterLayer)
+
+
+def test_threads(context, feedback):
+
+    alg = PossibilisticOperationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "POSSIBILISTIC_RASTER_1": f"{path_r_1_poss.as_posix()}::~::{path_r_1_nec.as_posix()}",
+        "POSSIBILISTIC_RASTER_2": f"{path_r_2_poss.as_posix()}::~::{path_r_2_nec.as_posix()}",
+        "OPERATION": 1,
+        "OPERATION_TYPE": 5,
+        "OUTPUT_POSSIBILITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+        "TILE_WIDTH": 16,
+        "TILE_HEIGHT": 16,
+        "THREADS": 1,
+    }
+
+    result_serial = alg.run(parameters=params, context=context, feedback=feedback)
+
+    params.update({"THREADS": 4})
+
+    result_threads = alg.run(parameters=params, context=context, feedback=feedback)
+
+    for output in ["OUTPUT_POSSIBILITY", "OUTPUT_NECESSITY"]:
+
+        values_serial = raster_to_array(result_serial[0][output])
+        values_threads = raster_to_array(result_threads[0][output])
+
+        assert np.array_equal(values_serial.mask, values_threads.mask)
+        assert np.array_equal(values_serial.compressed(), values_threads.compressed())
+
+
+def test_resume(context, feedback, tmp_path: Path):
+
+    alg = PossibilisticOperationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "POSSIBILISTIC_RASTER_1": f"{path_r_1_poss.as_posix()}::~::{path_r_1_nec.as_posix()}",
+        "POSSIBILISTIC_RASTER_2": f"{path_r_2_poss.as_posix()}::~::{path_r_2_nec.as_posix()}",
+        "OPERATION": 0,
+        "OPERATION_TYPE": 1,
+        "OUTPUT_POSSIBILITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+        "TILE_WIDTH": 16,
+        "TILE_HEIGHT": 16,
+    }
+
+    result_expected = alg.run(parameters=params, context=context, feedback=feedback)
+
+    params.update(
+        {
+            "OUTPUT_POSSIBILITY": (tmp_path / "possibility.tif").as_posix(),
+            "OUTPUT_NECESSITY": (tmp_path / "necessity.tif").as_posix(),
+            "CHECKPOINT": True,
+        }
+    )
+
+    alg.run(parameters=params, context=context, feedback=CancelingFeedback())
+
+    journal_path = tmp_path / "possibility.tif.journal"
+
+    assert journal_path.exists()
+
+    # journal header plus written tiles
+    assert len(journal_path.read_text().splitlines()) > 1
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    assert not journal_path.exists()
+
+    for output in ["OUTPUT_POSSIBILITY", "OUTPUT_NECESSITY"]:
+
+        values_expected = raster_to_array(result_expected[0][output])
+        values = raster_to_array(result[0][output])
+
+        assert np.array_equal(values_expected.mask, values.mask)
+        assert np.allclose(values_expected.compressed(), values.compressed())
+
+
+def two_band_raster(path_possibility: Path, path_necessity: Path, path: Path) -> str:
+
+    vrt = gdal.BuildVRT("", [path_possibility.as_posix(), path_necessity.as_posix()], separate=True)
+
+    gdal.Translate(path.as_posix(), vrt, format="GTiff")
+
+    del vrt
+
+    return path.as_posix()
+
+
+def test_two_band_input(context, feedback, tmp_path: Path):
+
+    alg = PossibilisticOperationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "POSSIBILISTIC_RASTER_1": f"{path_r_1_poss.as_posix()}::~::{path_r_1_nec.as_posix()}",
+        "POSSIBILISTIC_RASTER_2": f"{path_r_2_poss.as_posix()}::~::{path_r_2_nec.as_posix()}",
+        "OPERATION": 0,
+        "OPERATION_TYPE": 1,
+        "OUTPUT_POSSIBILITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+        "TILE_WIDTH": 16,
+        "TILE_HEIGHT": 16,
+        "THREADS": 2,
+    }
+
+    result_expected = alg.run(parameters=params, context=context, feedback=feedback)
+
+    params_two_band = {
+        "POSSIBILISTIC_RASTER_1": two_band_raster(path_r_1_poss, path_r_1_nec, tmp_path / "r_1.tif"),
+        "POSSIBILISTIC_RASTER_2": two_band_raster(path_r_2_poss, path_r_2_nec, tmp_path / "r_2.tif"),
+        "OPERATION": 0,
+        "OPERATION_TYPE": 1,
+        "OUTPUT_POSSIBILISTIC": "TEMPORARY_OUTPUT",
+        "TILE_WIDTH": 16,
+        "TILE_HEIGHT": 16,
+        "THREADS": 2,
+    }
+
+    ok, _ = alg.checkParameterValues(parameters=params_two_band, context=context)
+
+    assert ok
+
+    result = alg.run(parameters=params_two_band, context=context, feedback=feedback)
+
+    assert result[1]
+
+    for output, band in [("OUTPUT_POSSIBILITY", 1), ("OUTPUT_NECESSITY", 2)]:
+
+        values_expected = raster_to_array(result_expected[0][output])
+        values = raster_to_array(result[0]["OUTPUT_POSSIBILISTIC"], band)
+
+        assert np.array_equal(values_expected.mask, values.mask)
+        assert np.allclose(values_expected.compressed(), values.compressed())
+
+
+def test_two_band_input_band_count(context):
+
+    alg = PossibilisticOperationAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "POSSIBILISTIC_RASTER_1": path_r_1_poss.as_posix(),
+        "POSSIBILISTIC_RASTER_2": f"{path_r_2_poss.as_posix()}::~::{path_r_2_nec.as_posix()}",
+        "OPERATION": 0,
+        "OPERATION_TYPE": 0,
+        "OUTPUT_POSSIBILITY": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+    }
+
+    ok, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert not ok
+    assert "two bands" in msg
@@ -0,0 +1,246 @@
+import numpy as np
+import pytest
+from osgeo import gdal
+from qgis.core import QgsExpression, QgsRasterLayer
+
+from soft_queries.processing.tool_fuzzy_membership import FuzzyMembershipAlgorithm
+from soft_queries.processing.tool_raster_expression import RasterExpressionAlgorithm
+from tests.utils import CancelingFeedback, raster_to_array
+
+
+def test_fuzzy_membership(raster_layer_path: str, context, feedback):
+
+    alg = RasterExpressionAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "EXPRESSION": "calculate_fuzzy_membership(dsm_epsg_5514, fuzzy_number_triangular(1005, 1015, 1025))",
+        "RASTERS": [raster_layer_path],
+        "OUTPUT": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, _ = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    alg_membership = FuzzyMembershipAlgorithm()
+    alg_membership.initAlgorithm()
+
+    params_membership = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+    }
+
+    result_membership = alg_membership.run(parameters=params_membership, context=context, feedback=feedback)
+
+    values = raster_to_array(result[0]["OUTPUT"])
+    values_membership = raster_to_array(result_membership[0]["OUTPUT_FUZZY_MEMBERSHIP"])
+
+    assert np.array_equal(values.mask, values_membership.mask)
+    assert np.allclose(values.compressed(), values_membership.compressed())
+
+
+def test_fused_operation(raster_layer_path: str, context, feedback):
+
+    alg = RasterExpressionAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "EXPRESSION": "fuzzy_and("
+        "membership(dsm_epsg_5514, fuzzy_number_triangular(1005, 1015, 1025)), "
+        "membership(dsm_epsg_5514, fuzzy_number_trapezoidal(1000, 1010, 1020, 1030)), "
+        "'product')",
+        "RASTERS": [raster_layer_path],
+        "OUTPUT": "TEMPORARY_OUTPUT",
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    input_values = raster_to_array(raster_layer_path).astype(np.float64)
+    values = raster_to_array(result[0]["OUTPUT"])
+
+    assert np.array_equal(input_values.mask, values.mask)
+
+    x = input_values.compressed()
+
+    triangular = np.clip(np.minimum((x - 1005) / 10, (1025 - x) / 10), 0, 1)
+    trapezoidal = np.clip(np.minimum((x - 1000) / 10, (1030 - x) / 10), 0, 1)
+
+    assert np.allclose(values.compressed(), triangular * trapezoidal)
+
+
+@pytest.mark.parametrize("function", ["possibilistic_exceedance", "possibilistic_undervaluation"])
+@pytest.mark.parametrize("values_first", [True, False])
+def test_possibilistic(raster_layer_path: str, context, feedback, function: str, values_first: bool):
+
+    alg = RasterExpressionAlgorithm()
+    alg.initAlgorithm()
+
+    def call(value: str) -> str:
+        args = [value, "fuzzy_number_triangular(1005, 1015, 1025)"]
+
+        if not values_first:
+            args.reverse()
+
+        return "{}({})".format(function, ", ".join(args))
+
+    params = {
+        "EXPRESSION": call("dsm_epsg_5514"),
+        "RASTERS": [raster_layer_path],
+        "OUTPUT": "TEMPORARY_OUTPUT",
+        "OUTPUT_NECESSITY": "TEMPORARY_OUTPUT",
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    input_values = raster_to_array(raster_layer_path).astype(np.float64)
+    possibility = raster_to_array(result[0]["OUTPUT"])
+    necessity = raster_to_array(result[0]["OUTPUT_NECESSITY"])
+
+    assert np.array_equal(input_values.mask, possibility.mask)
+    assert np.array_equal(input_values.mask, necessity.mask)
+
+    values, indices = np.unique(input_values.compressed(), return_index=True)
+
+    # same result as the expression function evaluated by FuzzyMath for every distinct value
+    for value, value_possibility, value_necessity in zip(
+        values, possibility.compressed()[indices], necessity.compressed()[indices]
+    ):
+
+        exp = QgsExpression(call(repr(float(value))))
+
+        pm = exp.evaluate()
+
+        # FuzzyMath rejects its result with necessity above possibility, capped necessity is not comparable
+        if exp.hasEvalError():
+            assert value_necessity <= value_possibility
+            continue
+
+        assert np.isclose(value_possibility, float(pm.possibility))
+        assert np.isclose(value_necessity, float(pm.necessity))
+
+
+def test_invalid_expressions(raster_layer_path: str, context):
+
+    alg = RasterExpressionAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "EXPRESSION": "calculate_fuzzy_membership(slope, fuzzy_number_triangular(1, 2, 3))",
+        "RASTERS": [raster_layer_path],
+        "OUTPUT": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run is False
+    assert "is not among input rasters" in msg
+
+    params.update({"EXPRESSION": "fuzzy_and(dsm_epsg_5514, dsm_epsg_5514, 'min')"})
+
+    can_run, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run is False
+    assert "has to be fuzzy membership" in msg
+
+    params.update({"EXPRESSION": "fuzzy_number_triangular(1, 2, 3)"})
+
+    can_run, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run is False
+    assert "has to result in raster values" in msg
+
+
+def test_raw_values_quantized(raster_layer_path: str, context):
+
+    alg = RasterExpressionAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "EXPRESSION": "dsm_epsg_5514",
+        "RASTERS": [raster_layer_path],
+        "OUTPUT": "TEMPORARY_OUTPUT",
+        "OUTPUT_DATA_TYPE": 3,
+    }
+
+    can_run, msg = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run is False
+    assert "results in raw values" in msg
+
+    params.update({"OUTPUT_DATA_TYPE": 0})
+
+    can_run, _ = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run
+
+
+def test_inputs_not_aligned(raster_layer_path: str, context, feedback, tmp_path):
+
+    raster = QgsRasterLayer(raster_layer_path)
+
+    # same values on a grid with twice the resolution, read back into grid of the first raster
+    fine_raster_path = (tmp_path / "dsm_fine.tif").as_posix()
+
+    gdal.Warp(
+        fine_raster_path,
+        raster_layer_path,
+        xRes=raster.rasterUnitsPerPixelX() / 2,
+        yRes=raster.rasterUnitsPerPixelY() / 2,
+        resampleAlg="near",
+    )
+
+    alg = RasterExpressionAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "EXPRESSION": "fuzzy_and("
+        "membership(dsm_epsg_5514, fuzzy_number_triangular(1005, 1015, 1025)), "
+        "membership(dsm_fine, fuzzy_number_triangular(1005, 1015, 1025)), "
+        "'min')",
+        "RASTERS": [raster_layer_path, fine_raster_path],
+        "OUTPUT": "TEMPORARY_OUTPUT",
+    }
+
+    can_run, _ = alg.checkParameterValues(parameters=params, context=context)
+
+    assert can_run
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    input_values = raster_to_array(raster_layer_path).astype(np.float64)
+    values = raster_to_array(result[0]["OUTPUT"])
+
+    assert values.shape == input_values.shape
+    assert np.array_equal(input_values.mask, values.mask)
+
+    x = input_values.compressed()
+
+    assert np.allclose(values.compressed(), np.clip(np.minimum((x - 1005) / 10, (1025 - x) / 10), 0, 1))
+
+
+def test_canceled_not_finalized(raster_layer_path: str, context, tmp_path):
+
+    alg = RasterExpressionAlgorithm()
+    alg.initAlgorithm()
+
+    output_path = (tmp_path / "expression.tif").as_posix()
+
+    params = {
+        "EXPRESSION": "membership(dsm_epsg_5514, fuzzy_number_triangular(1005, 1015, 1025))",
+        "RASTERS": [raster_layer_path],
+        "OUTPUT": output_path,
+        "TILE_WIDTH": 16,
+        "TILE_HEIGHT": 16,
+        "COG": True,
+    }
+
+    alg.run(parameters=params, context=context, feedback=CancelingFeedback())
+
+    dataset = gdal.Open(output_path)
+
+    # partial output is not converted to COG
+    assert dataset.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") != "COG"
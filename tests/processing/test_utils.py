@@ -0,0 +1,160 @@
+import numpy as np
+from osgeo import gdal
+from qgis.core import Qgis, QgsRasterLayer
+
+from soft_queries.processing.utils import (
+    BYTES_PER_PIXEL_STREAM,
+    OUTPUT_BLOCK_SIZE,
+    OUTPUT_DATA_TYPES,
+    RasterOutputOptions,
+    RasterPart,
+    RasterWindow,
+    overview_levels,
+    plan_threads,
+    plan_tile_size,
+    raster_block_size,
+    raster_windows,
+    tiles_in_flight,
+)
+
+
+def test_plan_tile_size(raster_layer_path: str):
+
+    raster = QgsRasterLayer(raster_layer_path)
+
+    block_width, block_height = raster_block_size(raster)
+
+    assert plan_tile_size(raster, tile_width=10, tile_height=20) == (10, 20)
+
+    assert plan_tile_size(raster) == (raster.width(), raster.height())
+
+    tile_width, tile_height = plan_tile_size(raster, streams=2, memory_budget_mb=0.01)
+
+    assert tile_width <= raster.width()
+    assert tile_height % block_height == 0 or tile_height == raster.height()
+    assert tile_width % block_width == 0 or tile_width == raster.width()
+
+    tile_width_threads, tile_height_threads = plan_tile_size(raster, streams=2, memory_budget_mb=0.01, threads=4)
+
+    assert tile_width_threads * tile_height_threads <= tile_width * tile_height
+
+
+def test_plan_tile_size_output_blocks(tmp_path):
+
+    path = (tmp_path / "striped.tif").as_posix()
+
+    dataset = gdal.GetDriverByName("GTiff").Create(path, 1000, 1000, 1, gdal.GDT_Float32, ["BLOCKYSIZE=7"])
+    del dataset
+
+    raster = QgsRasterLayer(path)
+
+    output_block_size = (OUTPUT_BLOCK_SIZE, OUTPUT_BLOCK_SIZE)
+
+    # budget for less than 256 rows, which would be aligned to the source only
+    tile_width, tile_height = plan_tile_size(raster, streams=2, memory_budget_mb=8)
+
+    assert (tile_width, tile_height) == (1000, 259)
+
+    tile_width, tile_height = plan_tile_size(raster, streams=2, memory_budget_mb=8, output_block_size=output_block_size)
+
+    assert (tile_width, tile_height) == (1000, OUTPUT_BLOCK_SIZE)
+
+    tile_width, tile_height = plan_tile_size(raster, streams=2, memory_budget_mb=1, output_block_size=output_block_size)
+
+    assert tile_width % OUTPUT_BLOCK_SIZE == 0
+    assert tile_height % OUTPUT_BLOCK_SIZE == 0
+
+    # explicit tile size is kept
+    assert plan_tile_size(raster, tile_width=100, tile_height=50, output_block_size=output_block_size) == (100, 50)
+
+
+def test_raster_part_nodata_bitmap(tmp_path):
+
+    path = (tmp_path / "without_nodata.tif").as_posix()
+    reference_path = (tmp_path / "reference.tif").as_posix()
+
+    # Byte raster without no data value, with the value used as no data sentinel inside
+    dataset = gdal.GetDriverByName("GTiff").Create(path, 10, 10, 1, gdal.GDT_Byte)
+    dataset.SetGeoTransform([0, 1, 0, 10, 0, -1])
+    dataset.GetRasterBand(1).WriteArray(np.full((10, 10), 255, dtype=np.uint8))
+    del dataset
+
+    # reference grid reaches 5 pixels out of the input to the right
+    dataset = gdal.GetDriverByName("GTiff").Create(reference_path, 15, 10, 1, gdal.GDT_Byte)
+    dataset.SetGeoTransform([0, 1, 0, 10, 0, -1])
+    del dataset
+
+    part = RasterPart(QgsRasterLayer(path), reference_raster=QgsRasterLayer(reference_path))
+
+    values, nodata_mask = part.read(RasterWindow(0, 0, 15, 10))
+
+    assert values.shape == (10, 15)
+    assert not nodata_mask[:, :10].any()
+    assert nodata_mask[:, 10:].all()
+    assert (values[:, :10] == 255).all()
+
+
+def test_plan_threads(raster_layer_path: str):
+
+    raster = QgsRasterLayer(raster_layer_path)
+
+    block_width, block_height = raster_block_size(raster)
+
+    block_mb = (
+        min(block_width, raster.width()) * min(block_height, raster.height()) * BYTES_PER_PIXEL_STREAM * 2 / 1024**2
+    )
+
+    assert tiles_in_flight(1) == 1
+    assert tiles_in_flight(3) == 7
+
+    assert plan_threads(raster, streams=2, memory_budget_mb=1024, threads=8) == 8
+    assert plan_threads(raster, streams=2, memory_budget_mb=block_mb * 7.5, threads=8) == 3
+    assert plan_threads(raster, streams=2, memory_budget_mb=block_mb / 2, threads=8) == 1
+
+
+def test_raster_windows():
+
+    windows = raster_windows(10, 7, 4, 3)
+
+    assert len(windows) == 9
+
+    assert sum(window.size for window in windows) == 70
+
+    assert (windows[-1].col, windows[-1].row, windows[-1].width, windows[-1].height) == (8, 6, 2, 1)
+
+
+def test_output_data_type_encode():
+
+    values = np.array([[0.0, 0.5, 1.0, np.nan]])
+    nodata_mask = np.isnan(values)
+
+    float_type, _, uint16_type, uint8_type = OUTPUT_DATA_TYPES
+
+    assert float_type.encode(values, nodata_mask) is values
+    assert float_type.nodata_value(-9999) == -9999
+
+    assert uint8_type.nodata_value(-9999) == 255
+    assert np.array_equal(uint8_type.encode(values, nodata_mask), [[0, 127, 254, 0]])
+
+    assert uint16_type.nodata_value(-9999) == 65535
+    assert np.array_equal(uint16_type.encode(values, nodata_mask), [[0, 32767, 65534, 0]])
+
+
+def test_raster_output_options():
+
+    options = RasterOutputOptions()
+
+    assert "COMPRESS=DEFLATE" in options.creation_options(Qgis.Float64)
+    assert "PREDICTOR=3" in options.creation_options(Qgis.Float32)
+    assert "PREDICTOR=2" in options.creation_options(Qgis.Byte)
+    assert "TILED=YES" in options.creation_options(Qgis.Float64)
+
+    options = RasterOutputOptions(compression="NONE", tiled=False, bigtiff="YES")
+
+    assert options.creation_options(Qgis.Float64) == ["BIGTIFF=YES"]
+
+
+def test_overview_levels():
+
+    assert overview_levels(100, 100) == []
+    assert overview_levels(1000, 600) == [2, 4]
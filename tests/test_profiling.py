@@ -0,0 +1,73 @@
+import inspect
+import pstats
+
+from soft_queries.processing.tool_fuzzy_membership import FuzzyMembershipAlgorithm
+from soft_queries.profiling import ExpressionProfiler, profiled_process_algorithm
+
+
+def test_profiled_process_algorithm(raster_layer_path: str, context, feedback, tmp_path, monkeypatch):
+
+    monkeypatch.setenv("SOFTQUERIES_PROFILE_DIR", tmp_path.as_posix())
+
+    class ProfiledAlgorithm(FuzzyMembershipAlgorithm):
+        processAlgorithm = profiled_process_algorithm(FuzzyMembershipAlgorithm.processAlgorithm)
+
+    alg = ProfiledAlgorithm()
+    alg.initAlgorithm()
+
+    params = {
+        "FUZZY_NUMBER": "triangular;1005.0|1015.0|1025.0",
+        "RASTER": raster_layer_path,
+        "OUTPUT_FUZZY_MEMBERSHIP": "TEMPORARY_OUTPUT",
+        "THREADS": 4,
+        "BACKEND": 1,
+    }
+
+    result = alg.run(parameters=params, context=context, feedback=feedback)
+
+    assert result[1]
+
+    profiles = list(tmp_path.glob("fuzzymembership_*.prof"))
+
+    assert len(profiles) == 1
+
+    stats = pstats.Stats(profiles[0].as_posix())
+
+    assert stats.total_calls > 0
+
+    # tiles are computed in the profiled thread, not in workers
+    assert any(
+        filename.endswith("tile_processor.py") and function == "compute" for filename, _, function in stats.stats
+    )
+
+    summary = profiles[0].with_suffix(".txt").read_text(encoding="utf-8")
+
+    assert "Peak traced memory" in summary
+    assert "Largest allocations by line" in summary
+
+
+def test_expression_profiler(tmp_path, monkeypatch):
+
+    monkeypatch.setenv("SOFTQUERIES_PROFILE_DIR", tmp_path.as_posix())
+
+    def expression_function(value, feature, parent, context):
+        return value * 2
+
+    profiler = ExpressionProfiler()
+    profiler.start()
+
+    wrapped = profiler.wrap(expression_function)
+
+    assert wrapped.__name__ == "expression_function"
+    assert inspect.getfullargspec(wrapped).args[-1] == "context"
+
+    for i in range(10):
+        assert wrapped(i, None, None, None) == i * 2
+
+    assert profiler.calls["expression_function"] == 10
+
+    summary_paths = profiler.stop()
+
+    assert len(summary_paths) == 1
+    assert summary_paths[0].with_suffix(".prof").exists()
+    assert profiler.write() == []
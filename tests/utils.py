@@ -1,7 +1,34 @@
 from pathlib import Path
 
+import numpy as np
+from qgis.core import QgsProcessingFeedback, QgsRasterLayer
+
+from soft_queries.processing.utils import block_nodata_mask, block_to_array
+
 
 def data_path(file_name: str) -> str:
     path = Path(__file__).parent / "_data" / file_name
 
     return path.as_posix()
+
+
+def raster_to_array(path: str, band: int = 1) -> np.ma.MaskedArray:
+    raster = QgsRasterLayer(path)
+
+    assert raster.isValid()
+
+    block = raster.dataProvider().block(band, raster.extent(), raster.width(), raster.height())
+
+    values = block_to_array(block)
+
+    return np.ma.masked_array(values.astype(np.float64), mask=block_nodata_mask(block, values))
+
+
+class CancelingFeedback(QgsProcessingFeedback):
+    """Cancels processing in the middle."""
+
+    def setProgress(self, progress: float) -> None:
+        super().setProgress(progress)
+
+        if progress >= 50:
+            self.cancel()